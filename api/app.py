@@ -1,13 +1,26 @@
 # api/app.py
 
-from flask import Flask, jsonify, request
-from flask_httpauth import HTTPBasicAuth
+from flask import Flask, Response, g, jsonify, make_response, request
+from flask_httpauth import HTTPBasicAuth, HTTPTokenAuth, MultiAuth
 from flasgger import Swagger
-import pandas as pd
 import os
+import re
+import sys
 import secrets # Para gerar token de API ou senhas seguras
+import tempfile
+import threading
+import time
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Permite importar os módulos vizinhos tanto com 'python api/app.py' quanto com 'gunicorn api.app:app'
+# books_data e books_index (pandas, numpy, pyarrow) só são importados na carga dos dados, em build_snapshot:
+# no modo BOOKS_LOAD_MODE=background o import deste módulo não paga por eles
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pagination import TRUE_VALUES, ListArgs, get_int_arg, list_response, parse_fields, parse_list_args # noqa: E402
+from response_cache import ResponseCache, cached_response # noqa: E402
+from auth_cache import CredentialCache, TokenSigner # noqa: E402
+from metrics import PROMETHEUS_CONTENT_TYPE, Metrics, format_family, instrument, phase, start_profiler # noqa: E402
+
 app = Flask(__name__)
 
 # --- Configuração do Swagger ---
@@ -18,52 +31,206 @@ app.config['SWAGGER'] = {
     'version': '1.0.0',
     'specs_route': '/docs/' # Rota para a documentação
 }
-swagger = Swagger(app)
+# Parâmetros comuns às rotas de listagem (pagination.py), referenciados nos docstrings com $ref
+LIST_PARAMETERS = {
+    'limit': {'name': 'limit', 'in': 'query', 'type': 'integer', 'required': False,
+              'description': 'Número máximo de livros retornados.'},
+    'offset': {'name': 'offset', 'in': 'query', 'type': 'integer', 'required': False,
+               'description': 'Quantidade de livros a pular (paginação por offset).'},
+    'cursor': {'name': 'cursor', 'in': 'query', 'type': 'string', 'required': False,
+               'description': 'Cursor da próxima página, devolvido no header X-Next-Cursor (substitui offset).'},
+    'fields': {'name': 'fields', 'in': 'query', 'type': 'string', 'required': False,
+               'description': 'Campos a retornar, separados por vírgula (ex.: id,title,price).'},
+    'format': {'name': 'format', 'in': 'query', 'type': 'string', 'enum': ['json', 'ndjson'], 'required': False,
+               'description': "'json' (padrão) ou 'ndjson' (um livro por linha, sempre em streaming)."},
+    'stream': {'name': 'stream', 'in': 'query', 'type': 'boolean', 'required': False,
+               'description': 'Envia o array JSON em blocos (chunked), sem montar a resposta inteira na memória.'},
+}
+swagger = Swagger(app, template={'parameters': LIST_PARAMETERS})
 
 # --- Autenticação Básica ---
-auth = HTTPBasicAuth()
+basic_auth = HTTPBasicAuth()
+# Alternativa à Basic: token assinado obtido em /api/v1/auth/token, barato de verificar
+token_auth = HTTPTokenAuth(scheme='Bearer')
+auth = MultiAuth(basic_auth, token_auth)
+
+def password_hash(env_name, default_password):
+    # <NOME>_HASH (ex.: ADMIN_PASSWORD_HASH) traz o hash já pronto, gerado uma vez com generate_password_hash;
+    # sem ele a senha em texto de <NOME> é derivada aqui, o que custa algumas centenas de ms por usuário no start
+    return os.environ.get(f"{env_name}_HASH") or generate_password_hash(os.environ.get(env_name, default_password))
 
 # Usuários em memória (em um ambiente de produção, use um banco de dados ou serviço de autenticação)
 USERS = {
-    "admin": generate_password_hash(os.environ.get("ADMIN_PASSWORD", "adminpass")), # Use variáveis de ambiente!
-    "user": generate_password_hash(os.environ.get("USER_PASSWORD", "userpass"))
+    "admin": password_hash("ADMIN_PASSWORD", "adminpass"), # Use variáveis de ambiente!
+    "user": password_hash("USER_PASSWORD", "userpass")
 }
 
-@auth.verify_password
+# Verificações de senha bem-sucedidas ficam em cache por CREDENTIAL_CACHE_TTL segundos (0 desliga)
+CREDENTIAL_CACHE = CredentialCache(ttl_seconds=float(os.environ.get('CREDENTIAL_CACHE_TTL', '60')),
+                                   max_entries=int(os.environ.get('CREDENTIAL_CACHE_SIZE', '1024')))
+# Com vários workers, defina SECRET_KEY igual em todos para que um token valha em qualquer um deles
+SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+TOKEN_SIGNER = TokenSigner(SECRET_KEY, max_age_seconds=int(os.environ.get('TOKEN_TTL', '3600')))
+
+def authenticated(username):
+    """Retorna `username` já autenticado; se for administrador e pediu o profiler (X-Profile), liga-o agora."""
+    if username in ADMIN_USERS:
+        start_profiler()
+    return username
+
+@basic_auth.verify_password
 def verify_password(username, password):
-    if username in USERS and check_password_hash(USERS.get(username), password):
-        return username
-    return None
+    with phase('auth'):
+        cached_user = CREDENTIAL_CACHE.get(username, password)
+        if cached_user is not None:
+            return authenticated(cached_user)
+        if username in USERS and check_password_hash(USERS.get(username), password):
+            CREDENTIAL_CACHE.put(username, password)
+            return authenticated(username)
+        return None
+
+@token_auth.verify_token
+def verify_token(token):
+    with phase('auth'):
+        username = TOKEN_SIGNER.verify(token)
+        return authenticated(username) if username in USERS else None
 
 # --- Carregamento de Dados ---
-BOOKS_DATA = pd.DataFrame() # DataFrame global para armazenar os dados dos livros
-DATA_FILE_PATH = os.path.join('data', 'books.csv') # Caminho para o arquivo CSV, relativo à raiz do projeto
+# Os dados, os índices e os agregados formam um snapshot imutável (BooksIndex, ou SqliteBooks no backend SQLite). Uma recarga monta o snapshot
+# novo inteiro fora do caminho das requisições e só então troca a referência global, de uma vez; cada
+# requisição usa o snapshot vigente quando começou (g.snapshot) até o fim, inclusive nas respostas em streaming.
+BOOKS_INDEX = None # Snapshot atual; None até a primeira carga terminar (vazio se ela falhar)
+BOOKS_DATA = None # DataFrame do snapshot atual (só no backend pandas)
+DATA_DIR_PATH = 'data' # Pasta com books.csv/books.feather/books.sqlite, relativa à raiz do projeto
+# Backend: 'pandas' (catálogo inteiro em memória, padrão) ou 'sqlite' (consultas indexadas ao data/books.sqlite,
+# gerado com 'scrape_books.py --format sqlite'; a memória do worker não cresce com o catálogo)
+BACKEND = os.environ.get('BOOKS_BACKEND', 'pandas')
+SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', '4')) # Conexões por worker no backend sqlite
+# Formato a carregar: 'auto' (Feather mapeado em memória se existir e estiver atualizado), 'feather' ou 'csv'
+DATA_FORMAT = os.environ.get('BOOKS_DATA_FORMAT', 'auto')
+# Intervalo (s) para verificar se o arquivo de dados mudou e recarregá-lo sozinho; 0 desliga
+DATA_WATCH_SECONDS = float(os.environ.get('BOOKS_DATA_WATCH_SECONDS', '0'))
+# 'eager' carrega os dados durante o import (o worker só sobe com eles prontos); 'background' carrega numa thread
+# e o worker já responde: /api/v1/health informa a prontidão e as rotas de dados devolvem 503 até lá
+LOAD_MODE = os.environ.get('BOOKS_LOAD_MODE', 'eager')
+RELOAD_LOCK = threading.Lock() # Uma recarga por vez
+ADMIN_USERS = {'admin'} # Usuários que podem disparar a recarga pela API
 
-def load_books_data():
-    """Carrega os dados dos livros do CSV para a memória."""
-    global BOOKS_DATA
+# Respostas já serializadas (e comprimidas) das rotas GET, invalidadas a cada carga dos dados
+RESPONSE_CACHE = ResponseCache(max_bytes=int(os.environ.get('RESPONSE_CACHE_MB', '64')) * 2**20)
+cached = cached_response(RESPONSE_CACHE, lambda: g.snapshot.version)
+
+# Máximo de ids por requisição em /api/v1/books/batch
+BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', '10000'))
+# Livros por lote em /api/v1/books/export (Arrow/Parquet): limita a memória de cada exportação em andamento
+EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', '10000'))
+
+# Métricas em /api/v1/metrics (metrics.py). METRICS_ENABLED=0 desliga os histogramas por requisição; com
+# PROFILER_ENABLED=1, requisições de administradores com o header X-Profile: 1 rodam sob o profiler por
+# amostragem e as pilhas vão para PROFILE_DIR
+METRICS = Metrics()
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() in TRUE_VALUES
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0').lower() in TRUE_VALUES
+PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'books-api-profiles')
+if METRICS_ENABLED:
+    instrument(app, METRICS, profile_dir=PROFILE_DIR if PROFILER_ENABLED else None,
+               profile_interval=float(os.environ.get('PROFILE_INTERVAL_MS', '1')) / 1000)
+# Última carga dos dados: duração (leitura, índices e agregados), tamanho do arquivo e contagem de cargas
+DATA_LOAD_STATS = {'seconds': float('nan'), 'bytes': 0, 'finished_at': 0.0, 'success': 0, 'failure': 0}
+
+def data_file_path():
     # Navega para o diretório raiz do projeto para encontrar 'data/books.csv'
     # Isso é importante para o deploy onde o diretório de trabalho pode ser diferente
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    full_data_path = os.path.join(project_root, DATA_FILE_PATH)
+    data_dir = os.environ.get('BOOKS_DATA_DIR') or os.path.join(project_root, DATA_DIR_PATH)
+    if BACKEND == 'sqlite':
+        from books_sqlite import SQLITE_FILENAME
+        return os.path.join(data_dir, SQLITE_FILENAME)
+    from books_data import resolve_data_file
+    return resolve_data_file(data_dir, DATA_FORMAT)
 
-    if os.path.exists(full_data_path):
-        try:
-            BOOKS_DATA = pd.read_csv(full_data_path)
-            # Converte 'id' para int, se não for
-            if 'id' in BOOKS_DATA.columns:
-                BOOKS_DATA['id'] = BOOKS_DATA['id'].astype(int)
-            print(f"Dados de livros carregados com sucesso: {len(BOOKS_DATA)} registros.")
-        except Exception as e:
-            print(f"Erro ao carregar dados do CSV: {e}")
-            BOOKS_DATA = pd.DataFrame() # Garante um DataFrame vazio em caso de erro
-    else:
+def build_snapshot(full_data_path):
+    """Lê o arquivo e monta um snapshot completo (índices e agregados); None se não for possível."""
+    from books_data import dataset_version, read_books_data
+    from books_index import BooksIndex
+    if not os.path.exists(full_data_path):
         print(f"Arquivo de dados '{full_data_path}' não encontrado. Execute 'python scripts/scrape_books.py' primeiro.")
-        BOOKS_DATA = pd.DataFrame()
+        return None
+    try:
+        if BACKEND == 'sqlite':
+            from books_sqlite import SqliteBooks
+            snapshot = SqliteBooks(full_data_path, dataset_version(full_data_path), SQLITE_POOL_SIZE)
+        else:
+            snapshot = BooksIndex(read_books_data(full_data_path), dataset_version(full_data_path))
+        if not snapshot.empty:
+            snapshot.aggregates # Calcula já, para a primeira requisição após a troca não pagar por isso
+    except Exception as e:
+        print(f"Erro ao carregar dados de '{full_data_path}': {e}")
+        return None
+    print(f"Dados de livros carregados com sucesso: {len(snapshot)} registros ({os.path.basename(full_data_path)}).")
+    return snapshot
 
-# Carrega os dados na inicialização da aplicação
-with app.app_context():
-    load_books_data()
+def load_books_data():
+    """Carrega os dados dos livros (Feather mapeado em memória ou CSV) e troca o snapshot atual.
+
+    Se a leitura falhar, o snapshot anterior continua valendo (na inicialização, um snapshot vazio).
+    Retorna True se o snapshot foi trocado.
+    """
+    global BOOKS_DATA, BOOKS_INDEX
+    with RELOAD_LOCK:
+        started = time.perf_counter()
+        full_data_path = data_file_path()
+        snapshot = build_snapshot(full_data_path)
+        DATA_LOAD_STATS['seconds'] = time.perf_counter() - started
+        DATA_LOAD_STATS['success' if snapshot is not None else 'failure'] += 1
+        if snapshot is None:
+            if BOOKS_INDEX is None:
+                import pandas as pd
+                from books_index import BooksIndex
+                BOOKS_INDEX = BooksIndex(pd.DataFrame())
+                BOOKS_DATA = BOOKS_INDEX.books
+            return False
+        DATA_LOAD_STATS.update(bytes=os.path.getsize(full_data_path), finished_at=time.time())
+        BOOKS_INDEX = snapshot # Troca atômica: uma única atribuição de referência
+        BOOKS_DATA = snapshot.books
+        RESPONSE_CACHE.clear() # As chaves já incluem a versão; isto só devolve a memória das entradas antigas
+        return True
+
+def watch_data_file(interval):
+    """Recarrega os dados quando o arquivo muda (nome, tamanho ou mtime). Roda numa thread daemon por worker."""
+    while True:
+        time.sleep(interval)
+        from books_data import dataset_version
+        try:
+            version = dataset_version(data_file_path())
+        except OSError:
+            continue # Arquivo ausente no momento: mantém o snapshot atual
+        current = BOOKS_INDEX
+        if current is not None and version != current.version: # None: a primeira carga ainda não terminou
+            print("Arquivo de dados alterado; recarregando...")
+            load_books_data()
+
+# Carrega os dados na inicialização da aplicação (ou em segundo plano, com BOOKS_LOAD_MODE=background)
+if LOAD_MODE == 'background':
+    threading.Thread(target=load_books_data, daemon=True, name='books-data-load').start()
+else:
+    with app.app_context():
+        load_books_data()
+
+if DATA_WATCH_SECONDS > 0:
+    threading.Thread(target=watch_data_file, args=(DATA_WATCH_SECONDS,), daemon=True, name='books-data-watcher').start()
+
+# Rotas que respondem antes de a primeira carga dos dados terminar (modo background)
+ENDPOINTS_WITHOUT_DATA = {'home', 'issue_token', 'reload_books_data', 'health_check', 'get_metrics'}
+
+@app.before_request
+def bind_snapshot():
+    # Fixa o snapshot da requisição: uma recarga no meio dela não muda o que ela lê
+    g.snapshot = BOOKS_INDEX
+    if (g.snapshot is None and request.endpoint is not None and request.endpoint not in ENDPOINTS_WITHOUT_DATA
+            and request.blueprint != 'flasgger'):
+        return jsonify({"message": "Os dados ainda estão sendo carregados; tente novamente em instantes."}), 503, \
+            {'Retry-After': '1'}
 
 # --- Endpoints da API (conforme o código anterior) ---
 
@@ -78,11 +245,88 @@ def home():
     """
     return jsonify({"message": "Bem-vindo à API de Consulta de Livros!"})
 
+@app.route('/api/v1/auth/token', methods=['POST'])
+@basic_auth.login_required
+def issue_token():
+    """
+    Emite um token Bearer assinado para o usuário autenticado via Basic.
+    Nas próximas requisições use o header "Authorization: Bearer <token>", que é verificado sem o hash de senha.
+    ---
+    security:
+      - basicAuth: []
+    responses:
+      200:
+        description: Token emitido.
+        schema:
+          type: object
+          properties:
+            access_token: {type: string}
+            token_type: {type: string, example: Bearer}
+            expires_in: {type: integer, example: 3600}
+      401:
+        description: Não autorizado.
+    """
+    return jsonify({
+        "access_token": TOKEN_SIGNER.issue(basic_auth.current_user()),
+        "token_type": "Bearer",
+        "expires_in": TOKEN_SIGNER.max_age_seconds
+    })
+
+@app.route('/api/v1/admin/reload', methods=['POST'])
+@auth.login_required
+def reload_books_data():
+    """
+    Recarrega os dados (novo scraping) sem reiniciar o worker; exclusivo para administradores.
+    O snapshot novo é montado em segundo plano e trocado de uma vez; requisições em andamento terminam com o anterior.
+    Com vários workers do gunicorn, a chamada recarrega só o worker que a atendeu: para todos, use BOOKS_DATA_WATCH_SECONDS.
+    ---
+    security:
+      - basicAuth: []
+    parameters:
+      - name: wait
+        in: query
+        type: boolean
+        required: false
+        description: Espera a recarga terminar e responde com a nova versão dos dados.
+    responses:
+      200:
+        description: Recarga concluída (wait=true).
+      202:
+        description: Recarga iniciada em segundo plano.
+      401:
+        description: Não autorizado.
+      403:
+        description: Usuário sem permissão de administrador.
+      409:
+        description: Já existe uma recarga em andamento.
+      500:
+        description: Não foi possível ler os dados; o snapshot anterior continua valendo.
+    """
+    if auth.current_user() not in ADMIN_USERS:
+        return jsonify({"message": "Apenas administradores podem recarregar os dados."}), 403
+    if RELOAD_LOCK.locked():
+        return jsonify({"message": "Já existe uma recarga em andamento."}), 409
+
+    if request.args.get('wait', '').lower() in TRUE_VALUES:
+        if not load_books_data():
+            return jsonify({"message": "Não foi possível recarregar os dados; o snapshot anterior foi mantido."}), 500
+        return jsonify({
+            "status": "reloaded",
+            "dataset_version": BOOKS_INDEX.version,
+            "num_books": len(BOOKS_INDEX)
+        })
+
+    threading.Thread(target=load_books_data, daemon=True, name='books-data-reload').start()
+    return jsonify({"status": "reloading",
+                    "dataset_version": g.snapshot.version if g.snapshot is not None else None}), 202
+
 @app.route('/api/v1/health', methods=['GET'])
 @auth.login_required
 def health_check():
     """
     Verifica o status da API e a conectividade com os dados.
+    Também serve de readiness probe: responde 503 enquanto a primeira carga dos dados está em andamento (BOOKS_LOAD_MODE=background)
+    e enquanto não houver livros carregados (ex.: a carga falhou e o snapshot ficou vazio).
     ---
     security:
       - basicAuth: []
@@ -95,6 +339,9 @@ def health_check():
             status:
               type: string
               example: UP
+            ready:
+              type: boolean
+              example: true
             data_loaded:
               type: boolean
               example: true
@@ -103,25 +350,102 @@ def health_check():
               example: 1000
       401:
         description: Não autorizado.
+      503:
+        description: Dados ainda sendo carregados, ou nenhum livro carregado (carga com falha).
     """
-    data_loaded = not BOOKS_DATA.empty
+    if g.snapshot is None:
+        return jsonify({"status": "LOADING", "ready": False, "data_loaded": False, "num_books": 0}), 503
+    if g.snapshot.empty:
+        return jsonify({"status": "UP", "ready": False, "data_loaded": False, "num_books": 0}), 503
     return jsonify({
         "status": "UP",
-        "data_loaded": data_loaded,
-        "num_books": len(BOOKS_DATA) if data_loaded else 0
+        "ready": True,
+        "data_loaded": True,
+        "num_books": len(g.snapshot)
     })
 
+def hit_ratio(stats):
+    lookups = stats['hits'] + stats['misses']
+    return stats['hits'] / lookups if lookups else float('nan')
+
+@METRICS.add_collector
+def collect_app_metrics():
+    """Métricas lidas na hora: snapshot atual, última carga dos dados e caches de respostas e de credenciais."""
+    snapshot = BOOKS_INDEX
+    response_stats = dict(RESPONSE_CACHE.stats)
+    credential_stats = dict(CREDENTIAL_CACHE.stats)
+    return (
+        format_family('books_api_dataset_ready', 'gauge', 'Se a primeira carga dos dados já terminou.',
+                      int(snapshot is not None))
+        + format_family('books_api_dataset_info', 'gauge', 'Versão e backend do snapshot atual.',
+                        [({'version': snapshot.version if snapshot is not None else '', 'backend': BACKEND}, 1)])
+        + format_family('books_api_dataset_rows', 'gauge', 'Livros no snapshot atual.',
+                        len(snapshot) if snapshot is not None else 0)
+        + format_family('books_api_dataset_bytes', 'gauge', 'Tamanho do arquivo de dados carregado.',
+                        DATA_LOAD_STATS['bytes'])
+        + format_family('books_api_dataset_load_duration_seconds', 'gauge',
+                        'Duração da última carga dos dados (leitura, índices e agregados).', DATA_LOAD_STATS['seconds'])
+        + format_family('books_api_dataset_last_load_timestamp_seconds', 'gauge',
+                        'Fim da última carga bem-sucedida (epoch).', DATA_LOAD_STATS['finished_at'])
+        + format_family('books_api_dataset_loads_total', 'counter', 'Cargas dos dados por resultado.',
+                        [({'result': result}, DATA_LOAD_STATS[result]) for result in ('success', 'failure')])
+        + format_family('books_api_response_cache_lookups_total', 'counter',
+                        'Consultas ao cache de respostas: hit, miss ou not_modified (304 sem consultar o cache).',
+                        [({'result': 'hit'}, response_stats['hits']), ({'result': 'miss'}, response_stats['misses']),
+                         ({'result': 'not_modified'}, response_stats['not_modified'])])
+        + format_family('books_api_response_cache_hit_ratio', 'gauge', 'hits / (hits + misses) do cache de respostas.',
+                        hit_ratio(response_stats))
+        + format_family('books_api_response_cache_uncacheable_total', 'counter',
+                        'Respostas grandes demais para o cache.', response_stats['uncacheable'])
+        + format_family('books_api_response_cache_bytes', 'gauge', 'Bytes guardados no cache de respostas.',
+                        RESPONSE_CACHE.total_bytes)
+        + format_family('books_api_response_cache_entries', 'gauge', 'Entradas no cache de respostas.',
+                        len(RESPONSE_CACHE.entries))
+        + format_family('books_api_credential_cache_lookups_total', 'counter',
+                        'Consultas ao cache de credenciais verificadas.',
+                        [({'result': 'hit'}, credential_stats['hits']), ({'result': 'miss'}, credential_stats['misses'])])
+        + format_family('books_api_credential_cache_hit_ratio', 'gauge',
+                        'hits / (hits + misses) do cache de credenciais.', hit_ratio(credential_stats))
+    )
+
+@app.route('/api/v1/metrics', methods=['GET'])
+@auth.login_required
+def get_metrics():
+    """
+    Métricas do worker no formato texto do Prometheus.
+    Latência por rota e por fase (auth, query, encode), caches e carga dos dados. Cada worker do gunicorn responde pelas próprias métricas.
+    ---
+    security:
+      - basicAuth: []
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Métricas no formato de exposição do Prometheus (text/plain; version=0.0.4).
+      401:
+        description: Não autorizado.
+    """
+    return Response(METRICS.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.route('/api/v1/books', methods=['GET'])
 @auth.login_required
+@cached
 def get_all_books():
     """
-    Lista todos os livros disponíveis na base de dados.
+    Lista todos os livros disponíveis na base de dados (com paginação, projeção de campos e streaming opcionais).
     ---
     security:
       - basicAuth: []
+    parameters:
+      - $ref: '#/parameters/limit'
+      - $ref: '#/parameters/offset'
+      - $ref: '#/parameters/cursor'
+      - $ref: '#/parameters/fields'
+      - $ref: '#/parameters/format'
+      - $ref: '#/parameters/stream'
     responses:
       200:
-        description: Lista de livros.
+        description: Lista de livros. X-Total-Count traz o total; X-Next-Cursor e Link, a próxima página.
         schema:
           type: array
           items:
@@ -136,17 +460,25 @@ def get_all_books():
               image_url: {type: string, example: "http://books.toscrape.com/media/cache/fe/72/..."}
       401:
         description: Não autorizado.
+      400:
+        description: Parâmetros de paginação, campos ou formato inválidos.
       500:
         description: Erro interno do servidor se os dados não puderem ser carregados.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis ou não carregados."}), 500
 
-    books_list = BOOKS_DATA.to_dict(orient='records')
-    return jsonify(books_list)
+    try:
+        list_args = parse_list_args(snapshot.columns)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    return list_response(snapshot.records, None, list_args)
 
 @app.route('/api/v1/books/<int:book_id>', methods=['GET'])
 @auth.login_required
+@cached
 def get_book_by_id(book_id):
     """
     Retorna detalhes completos de um livro específico pelo ID.
@@ -179,16 +511,19 @@ def get_book_by_id(book_id):
       500:
         description: Erro interno do servidor.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis."}), 500
 
-    book = BOOKS_DATA[BOOKS_DATA['id'] == book_id]
-    if not book.empty:
-        return jsonify(book.iloc[0].to_dict())
+    with phase('query'):
+        book = snapshot.get_by_id(book_id)
+    if book is not None:
+        return jsonify(book)
     return jsonify({"message": "Livro não encontrado."}), 404
 
 @app.route('/api/v1/books/search', methods=['GET'])
 @auth.login_required
+@cached
 def search_books():
     """
     Busca livros por título e/ou categoria.
@@ -206,6 +541,23 @@ def search_books():
         type: string
         required: false
         description: Categoria do livro para buscar.
+      - name: match
+        in: query
+        type: string
+        enum: [substring, prefix]
+        required: false
+        description: "'substring' (padrão) busca o texto em qualquer posição do título; 'prefix' só no início."
+      - name: rank
+        in: query
+        type: boolean
+        required: false
+        description: Ordena por relevância (título começando com o texto, depois início de palavra) em vez da ordem dos dados.
+      - $ref: '#/parameters/limit'
+      - $ref: '#/parameters/offset'
+      - $ref: '#/parameters/cursor'
+      - $ref: '#/parameters/fields'
+      - $ref: '#/parameters/format'
+      - $ref: '#/parameters/stream'
     responses:
       200:
         description: Lista de livros que correspondem aos critérios de busca.
@@ -226,31 +578,34 @@ def search_books():
       500:
         description: Erro interno do servidor.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis."}), 500
 
     title_query = request.args.get('title', '').strip().lower()
     category_query = request.args.get('category', '').strip().lower()
 
-    filtered_books = BOOKS_DATA.copy()
-
-    if title_query:
-        filtered_books = filtered_books[
-            filtered_books['title'].str.lower().str.contains(title_query, na=False)
-        ]
-
-    if category_query:
-        filtered_books = filtered_books[
-            filtered_books['category'].str.lower() == category_query
-        ]
+    match_mode = request.args.get('match', 'substring')
+    if match_mode not in ('substring', 'prefix'):
+        return jsonify({"message": "O parâmetro 'match' deve ser 'substring' ou 'prefix'."}), 400
+    rank = request.args.get('rank', '').lower() in TRUE_VALUES
+    try:
+        title_pattern = compile_title_pattern(title_query, match_mode)
+        list_args = parse_list_args(snapshot.columns)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
-    if filtered_books.empty:
-        return jsonify({"message": "Nenhum livro encontrado com os critérios fornecidos."}), 200
+    # Os índices de título e categoria são construídos na carga dos dados (books_index.py)
+    with phase('query'):
+        positions = snapshot.search(title_query, category_query, prefix=match_mode == 'prefix', rank=rank,
+                                    title_pattern=title_pattern)
 
-    return jsonify(filtered_books.to_dict(orient='records'))
+    return list_response(snapshot.records, positions, list_args,
+                         empty_message="Nenhum livro encontrado com os critérios fornecidos.")
 
 @app.route('/api/v1/categories', methods=['GET'])
 @auth.login_required
+@cached
 def get_categories():
     """
     Lista todas as categorias de livros disponíveis.
@@ -270,17 +625,17 @@ def get_categories():
       500:
         description: Erro interno do servidor.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis."}), 500
 
-    categories = BOOKS_DATA['category'].dropna().unique().tolist()
-    categories.sort()
-    return jsonify(categories)
+    return jsonify(snapshot.aggregates.categories)
 
 # --- Endpoints Opcionais (Insights) ---
 
 @app.route('/api/v1/stats/overview', methods=['GET'])
 @auth.login_required
+@cached
 def get_stats_overview():
     """
     Estatísticas gerais da coleção (total de livros, preço médio, distribuição de ratings).
@@ -308,23 +663,16 @@ def get_stats_overview():
       500:
         description: Erro interno do servidor.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis."}), 500
 
-    total_books = len(BOOKS_DATA)
-    average_price = BOOKS_DATA['price'].mean()
-
-    rating_counts = BOOKS_DATA['rating'].value_counts().to_dict()
-    rating_distribution = {f"{k}_star": rating_counts.get(k, 0) for k in range(1, 6)}
-
-    return jsonify({
-        "total_books": total_books,
-        "average_price": round(average_price, 2),
-        "rating_distribution": rating_distribution
-    })
+    # Calculado uma vez por carga dos dados (books_stats.py)
+    return jsonify(snapshot.aggregates.overview)
 
 @app.route('/api/v1/stats/categories', methods=['GET'])
 @auth.login_required
+@cached
 def get_stats_categories():
     """
     Estatísticas detalhadas por categoria (quantidade de livros, preços por categoria).
@@ -348,38 +696,29 @@ def get_stats_categories():
       500:
         description: Erro interno do servidor.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis."}), 500
 
-    category_stats = []
-    for category_name, group in BOOKS_DATA.dropna(subset=['category']).groupby('category'):
-        book_count = len(group)
-        average_price = group['price'].mean()
-
-        top_rated_book = None
-        if not group.empty:
-            top_rated_book_df = group.sort_values(by=['rating', 'price'], ascending=[False, True]).iloc[0]
-            top_rated_book = top_rated_book_df['title']
-
-        category_stats.append({
-            "category_name": category_name,
-            "book_count": book_count,
-            "average_price": round(average_price, 2),
-            "top_rated_book_in_category": top_rated_book
-        })
-
-    category_stats.sort(key=lambda x: x['category_name'])
-
-    return jsonify(category_stats)
+    # Agregação vetorizada, calculada uma vez por carga dos dados (books_stats.py)
+    return jsonify(snapshot.aggregates.category_stats)
 
 @app.route('/api/v1/books/top-rated', methods=['GET'])
 @auth.login_required
+@cached
 def get_top_rated_books():
     """
-    Lista os livros com melhor avaliação (rating mais alto).
+    Lista os livros com melhor avaliação (rating mais alto), do mais barato para o mais caro.
     ---
     security:
       - basicAuth: []
+    parameters:
+      - $ref: '#/parameters/limit'
+      - $ref: '#/parameters/offset'
+      - $ref: '#/parameters/cursor'
+      - $ref: '#/parameters/fields'
+      - $ref: '#/parameters/format'
+      - $ref: '#/parameters/stream'
     responses:
       200:
         description: Lista de livros com melhor avaliação.
@@ -397,16 +736,21 @@ def get_top_rated_books():
       500:
         description: Erro interno do servidor.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis."}), 500
 
-    max_rating = BOOKS_DATA['rating'].max()
-    top_rated_books = BOOKS_DATA[BOOKS_DATA['rating'] == max_rating].sort_values(by='price', ascending=True)
+    try:
+        list_args = parse_list_args(snapshot.columns)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
-    return jsonify(top_rated_books.to_dict(orient='records'))
+    # Pré-calculado na carga a partir do índice de preço (books_index.py)
+    return list_response(snapshot.records, snapshot.top_rated_positions, list_args)
 
 @app.route('/api/v1/books/price-range', methods=['GET'])
 @auth.login_required
+@cached
 def get_books_by_price_range():
     """
     Filtra livros dentro de uma faixa de preço específica.
@@ -426,6 +770,18 @@ def get_books_by_price_range():
         format: float
         required: true
         description: Preço máximo da faixa.
+      - name: sort
+        in: query
+        type: string
+        enum: [price, -price]
+        required: false
+        description: "Ordenação por preço: 'price' (crescente) ou '-price' (decrescente). Sem ele, a ordem dos dados."
+      - $ref: '#/parameters/limit'
+      - $ref: '#/parameters/offset'
+      - $ref: '#/parameters/cursor'
+      - $ref: '#/parameters/fields'
+      - $ref: '#/parameters/format'
+      - $ref: '#/parameters/stream'
     responses:
       200:
         description: Lista de livros dentro da faixa de preço.
@@ -444,7 +800,8 @@ def get_books_by_price_range():
       500:
         description: Erro interno do servidor.
     """
-    if BOOKS_DATA.empty:
+    snapshot = g.snapshot
+    if snapshot.empty:
         return jsonify({"message": "Dados de livros não disponíveis."}), 500
 
     try:
@@ -456,15 +813,340 @@ def get_books_by_price_range():
     if min_price is None or max_price is None:
         return jsonify({"message": "Os parâmetros 'min' e 'max' são obrigatórios."}), 400
 
-    filtered_books = BOOKS_DATA[
-        (BOOKS_DATA['price'] >= min_price) & 
-        (BOOKS_DATA['price'] <= max_price)
-    ].to_dict(orient='records')
+    sort = request.args.get('sort')
+    if sort not in (None, 'price', '-price'):
+        return jsonify({"message": "O parâmetro 'sort' deve ser 'price' ou '-price'."}), 400
+    try:
+        list_args = parse_list_args(snapshot.columns)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # Duas buscas binárias no índice de preço ordenado (books_index.py) em vez de varrer a coluna
+    with phase('query'):
+        positions = snapshot.price_range(min_price, max_price, sort)
+
+    return list_response(snapshot.records, positions, list_args,
+                         empty_message="Nenhum livro encontrado na faixa de preço especificada.")
+
+
+def compile_title_pattern(title, match_mode):
+    """`title` compilado, se for uma expressão regular (modo substring com metacaracteres); senão None.
+
+    Compilado uma vez por requisição e repassado ao backend; levanta ValueError (400) se a expressão for inválida.
+    """
+    from books_index import REGEX_METACHARACTERS
+    if not title or match_mode != 'substring' or not REGEX_METACHARACTERS.intersection(title):
+        return None
+    try:
+        return re.compile(title)
+    except re.error as e:
+        raise ValueError(f"O parâmetro 'title' não é uma expressão regular válida: {e}.")
+
+def parse_book_query():
+    """Lê os filtros de /api/v1/books/query; levanta ValueError com a mensagem para o cliente (400)."""
+    from books_query import QUERY_SORTS, BookQuery
+    match_mode = request.args.get('match', 'substring')
+    if match_mode not in ('substring', 'prefix'):
+        raise ValueError("O parâmetro 'match' deve ser 'substring' ou 'prefix'.")
+    title = request.args.get('title', '').strip().lower() or None
+    title_pattern = compile_title_pattern(title, match_mode)
+    prices = {}
+    for name in ('min_price', 'max_price'):
+        if name in request.args:
+            try:
+                prices[name] = float(request.args[name])
+            except ValueError:
+                raise ValueError(f"O parâmetro '{name}' deve ser um número válido.")
+    available = request.args.get('available', '').lower()
+    if available not in ('',) + TRUE_VALUES + ('0', 'false', 'no'):
+        raise ValueError("O parâmetro 'available' deve ser 'true' ou 'false'.")
+    sort = request.args.get('sort')
+    if sort is not None and sort not in QUERY_SORTS:
+        raise ValueError(f"O parâmetro 'sort' deve ser um de: {', '.join(QUERY_SORTS)}.")
+    return BookQuery(
+        title=title,
+        prefix=match_mode == 'prefix',
+        title_pattern=title_pattern,
+        category=request.args.get('category', '').strip().lower() or None,
+        min_rating=get_int_arg('min_rating'),
+        available=available in TRUE_VALUES if available else None,
+        sort=sort,
+        **prices,
+    )
+
+@app.route('/api/v1/books/query', methods=['GET'])
+@auth.login_required
+@cached
+def query_books():
+    """
+    Consulta com filtros combinados: título, categoria, faixa de preço, rating mínimo e disponibilidade.
+    Parte do índice mais seletivo entre os filtros e aplica os demais só sobre esses candidatos; com sort e limit, ordena apenas a página pedida (top-k). X-Query-Plan mostra o plano executado.
+    ---
+    security:
+      - basicAuth: []
+    parameters:
+      - name: title
+        in: query
+        type: string
+        required: false
+        description: Texto contido no título (ou no início, com match=prefix).
+      - name: match
+        in: query
+        type: string
+        enum: [substring, prefix]
+        required: false
+        description: "'substring' (padrão) ou 'prefix'."
+      - name: category
+        in: query
+        type: string
+        required: false
+        description: Categoria (sem diferenciar maiúsculas).
+      - name: min_price
+        in: query
+        type: number
+        format: float
+        required: false
+        description: Preço mínimo (inclusive).
+      - name: max_price
+        in: query
+        type: number
+        format: float
+        required: false
+        description: Preço máximo (inclusive).
+      - name: min_rating
+        in: query
+        type: integer
+        required: false
+        description: Rating mínimo (1 a 5).
+      - name: available
+        in: query
+        type: boolean
+        required: false
+        description: Só livros disponíveis (true) ou indisponíveis (false).
+      - name: sort
+        in: query
+        type: string
+        enum: [price, -price, rating, -rating]
+        required: false
+        description: Ordenação; empates e a ausência dele seguem a ordem dos dados. Preço nulo fica no fim.
+      - $ref: '#/parameters/limit'
+      - $ref: '#/parameters/offset'
+      - $ref: '#/parameters/cursor'
+      - $ref: '#/parameters/fields'
+      - $ref: '#/parameters/format'
+      - $ref: '#/parameters/stream'
+    responses:
+      200:
+        description: Livros que satisfazem todos os filtros. X-Total-Count traz o total e X-Query-Plan o plano.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              id: {type: integer, example: 1}
+              title: {type: string, example: "A Light in the Attic"}
+              price: {type: number, format: float, example: 51.77}
+              rating: {type: integer, example: 3}
+              availability: {type: boolean, example: true}
+              category: {type: string, example: "Poetry"}
+      400:
+        description: Parâmetros inválidos.
+      401:
+        description: Não autorizado.
+      500:
+        description: Erro interno do servidor.
+    """
+    snapshot = g.snapshot
+    if snapshot.empty:
+        return jsonify({"message": "Dados de livros não disponíveis."}), 500
+
+    try:
+        book_query = parse_book_query()
+        list_args = parse_list_args(snapshot.columns)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # Planejamento e filtros em books_index.py (BooksIndex.query) ou no SQLite (SqliteBooks.query)
+    with phase('query'):
+        positions, plan = snapshot.query(book_query)
+
+    response = make_response(list_response(snapshot.records, positions, list_args,
+                                           empty_message="Nenhum livro encontrado com os filtros fornecidos."))
+    response.headers['X-Query-Plan'] = ' > '.join(plan)
+    return response
+
+
+def parse_batch_body(columns):
+    """Lê o corpo JSON de /api/v1/books/batch; levanta ValueError com a mensagem para o cliente (400)."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('ids'), list):
+        raise ValueError("O corpo deve ser um objeto JSON com a lista 'ids'.")
+    ids = payload['ids']
+    if len(ids) > BATCH_MAX_IDS:
+        raise ValueError(f"No máximo {BATCH_MAX_IDS} ids por requisição.")
+    # bool é subclasse de int em Python, mas true/false não são ids; fora do int64 nenhum livro existe
+    if not all(type(book_id) is int and -2**63 <= book_id < 2**63 for book_id in ids):
+        raise ValueError("Os ids devem ser números inteiros.")
+
+    fields = payload.get('fields')
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    if fields is not None:
+        if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+            raise ValueError("O campo 'fields' deve ser uma lista de nomes de colunas.")
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise ValueError(f"Campo(s) desconhecido(s) em 'fields': {', '.join(unknown)}. "
+                             f"Opções: {', '.join(columns)}")
+    return ids, fields or None
+
+@app.route('/api/v1/books/batch', methods=['POST'])
+@auth.login_required
+def get_books_batch():
+    """
+    Retorna vários livros pelo ID numa única requisição (até BATCH_MAX_IDS, padrão 10000).
+    Os livros vêm na ordem dos ids pedidos, com null no lugar dos ids que não existem (listados também em not_found).
+    ---
+    security:
+      - basicAuth: []
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required: [ids]
+          properties:
+            ids:
+              type: array
+              items: {type: integer}
+              example: [1, 2, 999999]
+            fields:
+              type: array
+              items: {type: string}
+              example: [id, title, price]
+              description: Colunas a retornar (padrão todas).
+    responses:
+      200:
+        description: Livros na ordem pedida.
+        schema:
+          type: object
+          properties:
+            books:
+              type: array
+              items:
+                type: object
+                properties:
+                  id: {type: integer, example: 1}
+                  title: {type: string, example: "A Light in the Attic"}
+                  price: {type: number, format: float, example: 51.77}
+            found: {type: integer, example: 2}
+            not_found:
+              type: array
+              items: {type: integer}
+              example: [999999]
+      400:
+        description: Corpo inválido ou ids demais.
+      401:
+        description: Não autorizado.
+      500:
+        description: Erro interno do servidor.
+    """
+    snapshot = g.snapshot
+    if snapshot.empty:
+        return jsonify({"message": "Dados de livros não disponíveis."}), 500
+
+    try:
+        ids, fields = parse_batch_body(snapshot.columns)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # Todos os ids resolvidos de uma vez (BooksIndex.get_many / SqliteBooks.get_many), na ordem pedida
+    with phase('query'):
+        books = snapshot.get_many(ids, fields)
+    not_found = [book_id for book_id, book in zip(ids, books) if book is None]
+    with phase('encode'):
+        return jsonify({"books": books, "found": len(ids) - len(not_found), "not_found": not_found})
+
+
+@app.route('/api/v1/books/export', methods=['GET'])
+@auth.login_required
+@cached
+def export_books():
+    """
+    Exporta o catálogo, ou o resultado dos filtros de /books/query, em Arrow IPC, Parquet ou NDJSON, em streaming.
+    O arquivo é gerado em lotes de EXPORT_CHUNK_ROWS livros, sem montar o resultado inteiro na memória. X-Dataset-Version traz a versão dos dados e o ETag muda com ela: um If-None-Match com o ETag anterior recebe 304 enquanto nada mudar.
+    ---
+    security:
+      - basicAuth: []
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [arrow, parquet, ndjson]
+        required: false
+        description: "'arrow' (padrão, Arrow IPC no formato stream), 'parquet' ou 'ndjson'."
+      - name: title
+        in: query
+        type: string
+        required: false
+        description: Filtro de título, como em /books/query (também match, category, min_price, max_price, min_rating, available e sort).
+      - $ref: '#/parameters/fields'
+    produces:
+      - application/vnd.apache.arrow.stream
+      - application/vnd.apache.parquet
+      - application/x-ndjson
+    responses:
+      200:
+        description: Arquivo com os livros. X-Total-Count traz o total e X-Dataset-Version a versão dos dados.
+      304:
+        description: Nada mudou desde o ETag enviado em If-None-Match.
+      400:
+        description: Parâmetros inválidos.
+      401:
+        description: Não autorizado.
+      500:
+        description: Erro interno do servidor.
+      501:
+        description: Formato Arrow/Parquet sem o pyarrow instalado no servidor.
+    """
+    from books_export import ARROW_FORMATS, EXPORT_FORMATS, generate_arrow, pa
+    from books_query import BookQuery
+    snapshot = g.snapshot
+    if snapshot.empty:
+        return jsonify({"message": "Dados de livros não disponíveis."}), 500
+
+    export_format = request.args.get('format', 'arrow')
+    try:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"O parâmetro 'format' deve ser um de: {', '.join(EXPORT_FORMATS)}.")
+        book_query = parse_book_query()
+        fields = parse_fields(snapshot.columns)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    if export_format in ARROW_FORMATS and pa is None:
+        return jsonify({"message": f"O formato '{export_format}' requer o pyarrow instalado no servidor."}), 501
 
-    if not filtered_books:
-        return jsonify({"message": "Nenhum livro encontrado na faixa de preço especificada."}), 200
+    # Sem filtros exporta tudo na ordem dos dados; com filtros, o mesmo planejador de /books/query
+    positions, plan = None, None
+    if book_query != BookQuery():
+        with phase('query'):
+            positions, plan = snapshot.query(book_query)
 
-    return jsonify(filtered_books)
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    headers = {
+        'X-Total-Count': str(len(snapshot) if positions is None else len(positions)),
+        'X-Dataset-Version': snapshot.version,
+        'Content-Disposition': f'attachment; filename="books-{snapshot.version}.{extension}"',
+    }
+    if plan:
+        headers['X-Query-Plan'] = ' > '.join(plan)
+    if export_format == 'ndjson':
+        response = list_response(snapshot.records, positions, ListArgs(0, None, fields, 'ndjson', True))
+        response.headers.update(headers)
+        return response
+    schema, chunks = snapshot.arrow_chunks(positions, fields, EXPORT_CHUNK_ROWS)
+    return Response(generate_arrow(schema, chunks, export_format), mimetype=mimetype, headers=headers)
 
 
 # --- Execução da Aplicação ---
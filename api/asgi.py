@@ -0,0 +1,77 @@
+# api/asgi.py
+#
+# Modo ASGI da API: as mesmas rotas, autenticação e respostas de api/app.py servidas por um servidor assíncrono
+# (uvicorn). O event loop cuida das conexões (keep-alive, clientes lentos, envio das respostas em streaming) e
+# cada requisição roda no app Flask num pool de threads de tamanho fixo (ASGI_THREADS).
+# Uso: uvicorn api.asgi:asgi_app --workers 4
+#      gunicorn api.asgi:asgi_app -k uvicorn.workers.UvicornWorker -w 4
+
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app import app # noqa: E402
+
+# Requisições executadas ao mesmo tempo por worker; as demais conexões esperam no event loop sem ocupar thread
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', '16'))
+WSGI_EXECUTOR = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix='asgi-wsgi')
+
+
+class _PooledWsgiInstance(WsgiToAsgiInstance):
+    # O WsgiToAsgiInstance do asgiref roda o app com thread_sensitive=True, ou seja, numa única thread
+    # compartilhada: as requisições de um worker ficariam em fila. Aqui o app roda numa thread do pool e cada
+    # mensagem da resposta volta ao event loop para ser enviada.
+    async def __call__(self, scope, receive, send):
+        self._loop, self._send = asyncio.get_running_loop(), send
+        await super().__call__(scope, receive, send)
+
+    async def run_wsgi_app(self, body):
+        await self._loop.run_in_executor(WSGI_EXECUTOR, self._run_wsgi_app, body)
+
+    def _send_from_thread(self, message):
+        asyncio.run_coroutine_threadsafe(self._send(message), self._loop).result()
+
+    def _run_wsgi_app(self, body):
+        """Roda o app WSGI na thread do pool e envia a resposta, respeitando o Content-Length declarado."""
+        environ = self.build_environ(self.scope, body)
+        response = self.wsgi_application(environ, self.start_response)
+        try:
+            bytes_sent = 0
+            for output in response:
+                if not self.response_started:
+                    self.response_started = True
+                    self._send_from_thread(self.response_start)
+                if self.response_content_length is not None:
+                    output = output[:self.response_content_length - bytes_sent]
+                self._send_from_thread({'type': 'http.response.body', 'body': output, 'more_body': True})
+                bytes_sent += len(output)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            if hasattr(response, 'close'): # Exigido pelo WSGI: libera geradores de respostas em streaming
+                response.close()
+        if not self.response_started:
+            self.response_started = True
+            self._send_from_thread(self.response_start)
+        self._send_from_thread({'type': 'http.response.body'})
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            # Os dados já foram carregados no import de app.py; só confirma início e fim para o servidor
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        await _PooledWsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+asgi_app = PooledWsgiToAsgi(app)
@@ -0,0 +1,84 @@
+# api/auth_cache.py
+#
+# O hash de senha do Werkzeug é lento de propósito (centenas de ms por verificação), e o verify_password
+# rodava a cada requisição autenticada. Aqui ficam:
+#   - CredentialCache: cache curto (TTL) e limitado das verificações bem-sucedidas. A chave é um HMAC de
+#     usuário + senha com uma chave aleatória do processo, então a senha nunca fica guardada em claro;
+#   - TokenSigner: tokens Bearer assinados (itsdangerous, já dependência do Flask), emitidos após um login
+#     Basic e verificados com um HMAC barato.
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+
+class CredentialCache:
+    """Verificações de senha bem-sucedidas recentes: chave HMAC(usuário, senha) -> (usuário, expiração)."""
+
+    def __init__(self, ttl_seconds=60, max_entries=1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.key = secrets.token_bytes(32) # Vale só para este processo; nunca sai da memória
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def _digest(self, username, password):
+        return hmac.new(self.key, f"{username}\0{password}".encode(), hashlib.sha256).digest()
+
+    def get(self, username, password):
+        """Usuário se a mesma credencial foi verificada há menos de ttl_seconds, senão None."""
+        if not self.enabled:
+            return None
+        digest = self._digest(username, password)
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is not None and entry[1] > time.monotonic():
+                self.stats['hits'] += 1
+                return entry[0]
+            if entry is not None:
+                del self.entries[digest] # Expirada
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, username, password):
+        if not self.enabled:
+            return
+        digest = self._digest(username, password)
+        with self.lock:
+            self.entries[digest] = (username, time.monotonic() + self.ttl_seconds)
+            self.entries.move_to_end(digest)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TokenSigner:
+    """Emite e verifica tokens Bearer assinados com expiração."""
+
+    def __init__(self, secret_key, max_age_seconds=3600):
+        self.max_age_seconds = max_age_seconds
+        self.serializer = URLSafeTimedSerializer(secret_key, salt='api-bearer-token')
+
+    def issue(self, username):
+        return self.serializer.dumps({'user': username})
+
+    def verify(self, token):
+        """Usuário do token, ou None se a assinatura for inválida ou o token tiver expirado."""
+        try:
+            payload = self.serializer.loads(token, max_age=self.max_age_seconds)
+        except (BadSignature, SignatureExpired):
+            return None
+        return payload.get('user') if isinstance(payload, dict) else None
@@ -0,0 +1,73 @@
+# api/books_data.py
+
+import hashlib
+import os
+
+import pandas as pd
+
+from books_store import compact_books
+
+CSV_FILENAME = 'books.csv'
+FEATHER_FILENAME = 'books.feather' # Gerado pelo scraper (scripts/sinks.py, FeatherSink)
+
+
+def resolve_data_file(data_dir, data_format='auto'):
+    """Escolhe o arquivo a carregar: 'csv', 'feather' ou 'auto'.
+
+    No modo 'auto' o Feather é preferido, desde que não seja mais antigo que o CSV (um CSV
+    editado ou gerado depois não deve ser ignorado).
+    """
+    csv_path = os.path.join(data_dir, CSV_FILENAME)
+    feather_path = os.path.join(data_dir, FEATHER_FILENAME)
+    if data_format == 'csv':
+        return csv_path
+    if data_format == 'feather':
+        return feather_path
+    if os.path.exists(feather_path) and (
+            not os.path.exists(csv_path) or os.path.getmtime(feather_path) >= os.path.getmtime(csv_path)):
+        return feather_path
+    return csv_path
+
+
+def dataset_version(path):
+    """Identificador curto da versão do arquivo de dados (nome, tamanho e mtime).
+
+    É o mesmo em todos os workers que leem o mesmo arquivo, então ETags e cursores valem entre eles.
+    """
+    stat = os.stat(path)
+    return hashlib.sha1(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def read_books_csv(path):
+    books = pd.read_csv(path)
+    # Converte 'id' para int, se não for
+    if 'id' in books.columns:
+        books['id'] = books['id'].astype(int)
+    return books
+
+
+def read_books_feather(path):
+    """Lê o Feather com memory-map, sem copiar as colunas grandes para a memória do processo.
+
+    Colunas de texto sem nulos ficam como pandas ArrowDtype apontando para o arquivo mapeado, então
+    N workers compartilham as mesmas páginas via page cache do sistema. Numéricas sem nulos também
+    são zero-copy; `category` (dictionary) vira Categorical, que só copia os códigos.
+    """
+    import pyarrow as pa # Dependência opcional: sem pyarrow a API continua lendo o CSV
+
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_string(column.type) and column.null_count == 0:
+            columns[name] = pd.Series(pd.arrays.ArrowExtensionArray(column), name=name)
+        else:
+            # Nulos viram None/NaN como no CSV (pd.NA não é serializável pelo jsonify)
+            columns[name] = column.to_pandas()
+    return pd.DataFrame(columns)
+
+
+def read_books_data(path):
+    """Lê o CSV ou o Feather e converte para a representação compacta (books_store.compact_books)."""
+    if path.endswith('.feather'):
+        return compact_books(read_books_feather(path))
+    return compact_books(read_books_csv(path))
@@ -0,0 +1,107 @@
+# api/books_export.py
+#
+# Exportação em massa (/api/v1/books/export) para consumo por jobs de Machine Learning: o catálogo, ou o subconjunto
+# de uma consulta com filtros, em Arrow IPC (formato stream), Parquet ou NDJSON. Os backends entregam o resultado
+# em lotes (tabelas pyarrow) de no máximo EXPORT_CHUNK_ROWS livros (BooksIndex.arrow_chunks /
+# SqliteBooks.arrow_chunks) e aqui cada lote é gravado e enviado assim que fica pronto, então a memória do worker
+# fica limitada a um lote, qualquer que seja o tamanho do catálogo.
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Dependência opcional: sem pyarrow só o NDJSON fica disponível
+    pa = pq = None
+
+# formato -> (mimetype, extensão do arquivo)
+EXPORT_FORMATS = {
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+ARROW_FORMATS = ('arrow', 'parquet')
+
+
+def export_schema(schema):
+    """`schema` (inferido pelo backend) com as colunas do catálogo nos tipos fixos da exportação.
+
+    Os tipos compactos do catálogo em memória (books_store) dependem dos dados: id int16 ou int32, stock_count int8
+    ou maior, índices da categoria int8 ou int16 conforme o número de categorias; o SQLite só tem inteiros de 64
+    bits e textos. Quem guarda snapshots precisa do mesmo schema entre cargas e entre backends, então todo lote é
+    convertido para este. Colunas fora do esquema do scraper ficam com o tipo inferido.
+    """
+    types = {
+        'id': pa.int64(),
+        'title': pa.string(),
+        'price': pa.float64(),
+        'rating': pa.int8(),
+        'availability': pa.bool_(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'image_url': pa.string(),
+        'detail_url': pa.string(),
+        'upc': pa.string(),
+        'description': pa.string(),
+        'stock_count': pa.int64(),
+    }
+    return pa.schema([field.with_type(types.get(field.name, field.type)) for field in schema])
+
+
+def frame_schema(books):
+    """Schema Arrow das colunas do DataFrame, o mesmo para todos os lotes.
+
+    Colunas object são inferidas pelos primeiros valores não nulos: inferir por lote daria tipo null a um lote
+    só com nulos e o schema deixaria de bater entre os lotes.
+    """
+    fields = []
+    for name in books.columns:
+        column = books[name]
+        sample = column.dropna().iloc[:100] if column.dtype == object else column.iloc[:0]
+        field = pa.Schema.from_pandas(pd.DataFrame({name: sample}), preserve_index=False).field(name)
+        fields.append(field.with_type(pa.string()) if pa.types.is_null(field.type) else field)
+    return pa.schema(fields)
+
+
+class _ChunkSink:
+    """Arquivo só de escrita em memória: os writers do pyarrow gravam nele e o gerador repassa os bytes."""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def generate_arrow(schema, chunks, export_format):
+    """Gerador dos bytes do arquivo Arrow IPC ou Parquet, um pedaço por lote (pa.Table).
+
+    No Parquet cada lote vira um row group; o rodapé (com as estatísticas dos row groups) vai no último pedaço.
+    """
+    sink = _ChunkSink()
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    for chunk in chunks:
+        writer.write_table(chunk)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
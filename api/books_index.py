@@ -0,0 +1,343 @@
+# api/books_index.py
+#
+# Índices em memória sobre os dados dos livros, construídos uma única vez a cada carga (load_books_data)
+# para que as rotas não precisem varrer nem copiar o DataFrame a cada requisição.
+
+import re
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from books_query import INDEX_MAX_FRACTION, TopPositions, sort_keys
+from books_stats import compute_aggregates
+from books_store import BookRecords
+
+# Caracteres com significado em expressão regular: a busca antiga usava str.contains (regex=True), então
+# consultas com eles continuam sendo avaliadas como regex, numa varredura linear
+REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+# Ordem do ranking: título começa com a consulta, consulta no início de uma palavra, qualquer posição
+RANK_TITLE_PREFIX, RANK_WORD_PREFIX, RANK_SUBSTRING = 0, 1, 2
+
+
+class TitleSearchIndex:
+    """Índice invertido por palavra sobre os títulos normalizados (lower), com um índice de trigramas
+    sobre o vocabulário.
+
+    Uma ocorrência de substring da consulta no título implica que cada pedaço da consulta (separado por
+    espaços) está dentro de alguma palavra do título. Os candidatos são então a interseção, pedaço a
+    pedaço, da união das listas de posições das palavras que contêm aquele pedaço; a confirmação final
+    (`in` / `startswith`) sobre os candidatos garante o mesmo resultado da varredura completa.
+    """
+
+    def __init__(self, titles):
+        # None/NaN não casam com nada, como o na=False do str.contains
+        self.lowered = [title.lower() if isinstance(title, str) else None for title in titles]
+        vocabulary = {}
+        token_ids, positions = [], []
+        for position, title in enumerate(self.lowered):
+            if title is None:
+                continue
+            for token in set(title.split()):
+                token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                positions.append(position)
+        self.tokens = list(vocabulary)
+
+        # Listas de posições em CSR: as posições do token t ficam em postings[offsets[t]:offsets[t + 1]],
+        # já ordenadas (sort estável sobre posições inseridas em ordem crescente)
+        token_ids = np.asarray(token_ids, dtype=np.int32)
+        order = np.argsort(token_ids, kind='stable')
+        self.postings = np.asarray(positions, dtype=np.int32)[order]
+        self.offsets = np.zeros(len(self.tokens) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_ids, minlength=len(self.tokens)), out=self.offsets[1:])
+
+        self.token_trigrams = {}
+        for token_id, token in enumerate(self.tokens):
+            for trigram in {token[i:i + 3] for i in range(len(token) - 2)}:
+                self.token_trigrams.setdefault(trigram, []).append(token_id)
+
+    def _tokens_containing(self, piece):
+        if len(piece) < 3:
+            return [token_id for token_id, token in enumerate(self.tokens) if piece in token]
+        trigrams = sorted((self.token_trigrams.get(piece[i:i + 3], []) for i in range(len(piece) - 2)), key=len)
+        candidates = set(trigrams[0]).intersection(*trigrams[1:])
+        return [token_id for token_id in candidates if piece in self.tokens[token_id]]
+
+    def _candidates(self, query):
+        candidates = None
+        for piece in query.split():
+            token_ids = self._tokens_containing(piece)
+            if not token_ids:
+                return np.empty(0, dtype=np.int32)
+            positions = np.unique(np.concatenate(
+                [self.postings[self.offsets[token_id]:self.offsets[token_id + 1]] for token_id in token_ids]))
+            candidates = positions if candidates is None else np.intersect1d(candidates, positions, assume_unique=True)
+            if not len(candidates):
+                break
+        return candidates
+
+    def search(self, query, prefix=False, pattern=None):
+        """Posições (em ordem crescente) cujos títulos contêm `query` (já em minúsculas) ou começam com ela.
+
+        `pattern` é `query` já compilada, quando ela é uma expressão regular.
+        """
+        if pattern is not None or (not prefix and REGEX_METACHARACTERS.intersection(query)):
+            pattern = pattern or re.compile(query)
+            return [position for position, title in enumerate(self.lowered)
+                    if title is not None and pattern.search(title)]
+        if not query.split():
+            # Só espaços: sem pedaços para indexar (a rota já descarta consultas vazias)
+            candidates = range(len(self.lowered))
+        else:
+            candidates = self._candidates(query).tolist()
+        if prefix:
+            return [position for position in candidates
+                    if self.lowered[position] is not None and self.lowered[position].startswith(query)]
+        return [position for position in candidates
+                if self.lowered[position] is not None and query in self.lowered[position]]
+
+    def estimate(self, query):
+        """Limite superior de candidatos que o índice devolveria para `query` (sem confirmar nenhum título)."""
+        pieces = query.split()
+        if not pieces:
+            return len(self.lowered)
+        estimates = []
+        for piece in pieces:
+            token_ids = np.asarray(self._tokens_containing(piece), dtype=np.int64)
+            estimates.append(int((self.offsets[token_ids + 1] - self.offsets[token_ids]).sum()))
+        return min(estimates)
+
+    def filter(self, query, positions, prefix=False, pattern=None):
+        """Subconjunto de `positions` (na mesma ordem) cujos títulos casam com `query`, testando só esses títulos.
+
+        `pattern` é `query` já compilada, quando ela é uma expressão regular.
+        """
+        if prefix:
+            matches = lambda title: title.startswith(query)
+        elif pattern is not None or REGEX_METACHARACTERS.intersection(query):
+            pattern = pattern or re.compile(query)
+            matches = lambda title: pattern.search(title) is not None
+        else:
+            matches = lambda title: query in title
+        lowered = self.lowered
+        return np.asarray([position for position in positions.tolist()
+                           if lowered[position] is not None and matches(lowered[position])], dtype=np.int64)
+
+    def rank(self, query, positions):
+        """Reordena por relevância (ver RANK_*), mantendo a ordem original entre empates."""
+        def relevance(position):
+            title = self.lowered[position]
+            if title.startswith(query):
+                return RANK_TITLE_PREFIX
+            if title.find(' ' + query) >= 0:
+                return RANK_WORD_PREFIX
+            return RANK_SUBSTRING
+        return sorted(positions, key=relevance)
+
+
+
+class BooksIndex:
+    """Acesso às linhas como dicts prontos para o jsonify, índice id -> posição e índices de busca."""
+
+    def __init__(self, books, version='empty'):
+        self.books = books
+        self.version = version # Versão do dataset (books_data.dataset_version), usada nas chaves de cache
+        self.columns = list(books.columns)
+        # Dicts com tipos nativos do Python (int, float, bool, str), como o to_dict, montados só para as linhas pedidas
+        self.records = BookRecords(books)
+        self.position_by_id = {}
+        for position, book_id in enumerate(books['id'].tolist() if 'id' in books.columns else []):
+            # Com ids repetidos vale o primeiro, como no filtro booleano que a rota usava
+            self.position_by_id.setdefault(book_id, position)
+        # O mesmo índice em arrays, para lookups em lote com uma busca binária vetorizada: ids ordenados com sort
+        # estável, então entre ids repetidos a primeira posição vem antes (a que o searchsorted encontra)
+        ids = books['id'].to_numpy(dtype=np.int64) if 'id' in books.columns else np.empty(0, dtype=np.int64)
+        self.id_order = np.argsort(ids, kind='stable')
+        self.sorted_ids = ids[self.id_order]
+
+        self.title_search = TitleSearchIndex(books['title'].tolist() if 'title' in books.columns else [])
+        # Categoria normalizada (lower) -> posições em ordem crescente; categorias nulas ficam de fora
+        self.positions_by_category = {}
+        # Código da categoria de cada livro (-1 = nula) e códigos de cada categoria normalizada, para filtrar
+        # candidatos por categoria com uma máscara em BooksIndex.query
+        self.category_codes = np.full(len(books), -1, dtype=np.int64)
+        self.category_codes_by_key = {}
+        if 'category' in books.columns:
+            self.category_codes, categories = pd.factorize(books['category'])
+            for code, category in enumerate(categories):
+                self.category_codes_by_key.setdefault(str(category).lower(), []).append(code)
+            for key, category_codes in self.category_codes_by_key.items():
+                self.positions_by_category[key] = np.flatnonzero(np.isin(self.category_codes, category_codes))
+
+        # Índice de preço: posições ordenadas por preço (sort estável, empates na ordem dos dados; NaN no fim)
+        prices = books['price'].to_numpy(dtype=np.float64) if 'price' in books.columns else np.full(len(books), np.nan)
+        self.prices = prices
+        self.price_order = np.argsort(prices, kind='stable')
+        self.sorted_prices = prices[self.price_order]
+        # Colunas dos filtros de BooksIndex.query (NaN/None onde a coluna não existe: nenhum livro passa)
+        self.ratings = (books['rating'].to_numpy() if 'rating' in books.columns
+                        else np.full(len(books), np.nan))
+        self.availability = (books['availability'].to_numpy() if 'availability' in books.columns
+                             else np.full(len(books), None, dtype=object))
+        # Livros com o maior rating, já em ordem crescente de preço (reaproveita o índice de preço)
+        self.top_rated_positions = np.empty(0, dtype=np.int64)
+        if 'rating' in books.columns and len(books):
+            ratings = books['rating'].to_numpy()
+            self.top_rated_positions = self.price_order[ratings[self.price_order] == ratings.max()]
+
+    def __len__(self):
+        return len(self.books)
+
+    @property
+    def empty(self):
+        return self.books.empty
+
+    @cached_property
+    def aggregates(self):
+        """Estatísticas calculadas na primeira requisição e válidas até a próxima carga dos dados."""
+        return compute_aggregates(self.books)
+
+    def get_by_id(self, book_id):
+        """Retorna o dict do livro em O(1), ou None se o id não existir."""
+        position = self.position_by_id.get(book_id)
+        return self.records[position] if position is not None else None
+
+    def positions_of(self, ids):
+        """Posições dos `ids` (array int64) numa única passada vetorizada; -1 onde o id não existe."""
+        if not len(self.sorted_ids):
+            return np.full(len(ids), -1, dtype=np.int64)
+        index = np.minimum(np.searchsorted(self.sorted_ids, ids, side='left'), len(self.sorted_ids) - 1)
+        return np.where(self.sorted_ids[index] == ids, self.id_order[index], -1)
+
+    def get_many(self, ids, fields=None):
+        """Dicts dos livros de `ids`, na ordem pedida (repetições incluídas), com None onde o id não existe."""
+        positions = self.positions_of(np.asarray(ids, dtype=np.int64))
+        found = positions >= 0
+        records = iter(self.records.take(positions[found], fields))
+        return [next(records) if hit else None for hit in found.tolist()]
+
+    def arrow_chunks(self, positions=None, fields=None, chunk_rows=10000):
+        """Schema Arrow e gerador de tabelas Arrow das `positions` (None = todos os livros), `chunk_rows` por lote."""
+        import pyarrow as pa
+        from books_export import export_schema, frame_schema
+
+        books = self.books[fields] if fields else self.books
+        frame = frame_schema(books)
+        schema = export_schema(frame)
+        total = len(books) if positions is None else len(positions)
+
+        def chunks():
+            for start in range(0, total, chunk_rows):
+                # Sem filtro cada lote é uma fatia das colunas (sem cópia das colunas Arrow mapeadas do Feather,
+                # que seguem em blocos: por isso Table e não RecordBatch)
+                chunk = (books.iloc[start:start + chunk_rows] if positions is None
+                         else books.iloc[np.asarray(positions[start:start + chunk_rows])])
+                yield pa.Table.from_pandas(chunk, schema=frame, preserve_index=False).cast(schema)
+        return schema, chunks()
+
+    def price_range(self, min_price, max_price, sort=None):
+        """Posições com min_price <= preço <= max_price: duas buscas binárias e um slice do índice.
+
+        `sort`: None (ordem dos dados, como o filtro antigo), 'price' (crescente) ou '-price' (decrescente).
+        """
+        if np.isnan(min_price) or np.isnan(max_price): # Comparações com NaN nunca são verdadeiras
+            return np.empty(0, dtype=np.int64)
+        start, stop = self._price_bounds(min_price, max_price)
+        positions = self.price_order[start:stop]
+        if sort == 'price':
+            return positions
+        if sort == '-price':
+            # Decrescente mantendo os empates na ordem dos dados
+            return positions[np.argsort(-self.sorted_prices[start:stop], kind='stable')]
+        return np.sort(positions)
+
+    def _price_bounds(self, min_price, max_price):
+        """Trecho [start, stop) do índice de preço com min_price <= preço <= max_price (NaN fica de fora)."""
+        start = int(np.searchsorted(self.sorted_prices, min_price, side='left'))
+        return start, max(start, int(np.searchsorted(self.sorted_prices, max_price, side='right')))
+
+    def query(self, query):
+        """Posições que satisfazem todos os filtros de `query` (books_query.BookQuery) e o plano executado.
+
+        Entre os filtros com índice (categoria, faixa de preço, título) parte do que tem a menor estimativa de
+        linhas; os demais viram máscaras vetorizadas sobre esses candidatos, da mais seletiva para a menos, e o
+        título, confirmado livro a livro, fica por último. Sem filtro indexado (ou se nem o melhor deles descarta
+        livros suficientes, INDEX_MAX_FRACTION), parte de todos os livros.
+        O resultado fica na ordem dos dados ou, com query.sort, numa TopPositions (ordena só as páginas pedidas).
+        """
+        if np.isnan(query.min_price) or np.isnan(query.max_price):
+            return np.empty(0, dtype=np.int64), ['price[0]']
+        title_is_regex = query.title_pattern is not None
+        sources, masks, estimates = {}, {}, {}
+        if query.category:
+            category_positions = self.positions_by_category.get(query.category, np.empty(0, dtype=np.int64))
+            category_codes = self.category_codes_by_key.get(query.category, [])
+            estimates['category'] = len(category_positions)
+            sources['category'] = lambda: category_positions
+            masks['category'] = lambda positions: np.isin(self.category_codes[positions], category_codes)
+        if query.has_price_filter:
+            start, stop = self._price_bounds(query.min_price, query.max_price)
+            estimates['price'] = stop - start
+            sources['price'] = lambda: np.sort(self.price_order[start:stop])
+            masks['price'] = lambda positions: ((self.prices[positions] >= query.min_price)
+                                                & (self.prices[positions] <= query.max_price))
+        if query.min_rating is not None:
+            estimates['rating'] = self._rating_count(query.min_rating)
+            masks['rating'] = lambda positions: self.ratings[positions] >= query.min_rating
+        if query.available is not None:
+            estimates['available'] = self._availability_count(query.available)
+            masks['available'] = lambda positions: self.availability[positions] == query.available
+        if query.title and not title_is_regex:
+            estimates['title'] = self.title_search.estimate(query.title)
+            sources['title'] = lambda: np.asarray(self.title_search.search(query.title, query.prefix), dtype=np.int64)
+
+        source = min(sources, key=estimates.get) if sources else 'scan'
+        if source != 'scan' and estimates[source] > INDEX_MAX_FRACTION * len(self.records):
+            source = 'scan'
+        positions = sources[source]() if source != 'scan' else np.arange(len(self.records))
+        plan = [f"{source}[{len(positions)}]"]
+        for name in sorted((name for name in masks if name != source), key=estimates.get):
+            positions = positions[masks[name](positions)]
+            plan.append(f"{name}[{len(positions)}]")
+        if query.title and source != 'title':
+            positions = self.title_search.filter(query.title, positions, query.prefix, query.title_pattern)
+            plan.append(f"title[{len(positions)}]")
+
+        if query.sort:
+            column = self.prices if query.sort.lstrip('-') == 'price' else self.ratings
+            keys = sort_keys(column[positions], descending=query.sort.startswith('-'))
+            return TopPositions(positions, keys), plan + [f"top-k {query.sort}"]
+        return positions, plan
+
+    @cached_property
+    def _rating_counts(self):
+        values, counts = np.unique(self.ratings[~pd.isna(self.ratings)], return_counts=True)
+        return values, np.cumsum(counts[::-1])[::-1] # Livros com rating >= values[i]
+
+    def _rating_count(self, min_rating):
+        values, counts_at_least = self._rating_counts
+        index = np.searchsorted(values, min_rating, side='left')
+        return int(counts_at_least[index]) if index < len(values) else 0
+
+    @cached_property
+    def _availability_counts(self):
+        return {flag: int((self.availability == flag).sum()) for flag in (True, False)}
+
+    def _availability_count(self, available):
+        return self._availability_counts[available]
+
+    def search(self, title=None, category=None, prefix=False, rank=False, title_pattern=None):
+        """Posições dos livros cujo título contém `title` e cuja categoria é `category` (ambos em minúsculas).
+
+        `title_pattern` é `title` já compilado, quando ele é uma expressão regular. Sem `rank` a ordem é a dos
+        dados, como no filtro sobre o DataFrame que a rota usava.
+        """
+        positions = np.arange(len(self.records))
+        if category:
+            positions = self.positions_by_category.get(category, np.empty(0, dtype=np.int64))
+        if title:
+            matches = np.asarray(self.title_search.search(title, prefix, title_pattern), dtype=np.int64)
+            positions = np.intersect1d(positions, matches, assume_unique=True) if category else matches
+            if rank:
+                positions = np.asarray(self.title_search.rank(title, positions.tolist()), dtype=np.int64)
+        return positions
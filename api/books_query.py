@@ -0,0 +1,83 @@
+# api/books_query.py
+#
+# Consulta com vários filtros combinados (/api/v1/books/query): título, categoria, faixa de preço, rating mínimo
+# e disponibilidade, com ordenação opcional. O planejamento fica em BooksIndex.query (books_index.py): parte do
+# índice mais seletivo entre os filtros que têm índice e aplica os demais como máscaras vetorizadas sobre os
+# candidatos. Aqui ficam a descrição da consulta e a ordenação parcial (top-k) do resultado.
+
+import math
+import re
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+QUERY_SORTS = ('price', '-price', 'rating', '-rating')
+# Se o filtro indexado mais seletivo ainda devolve mais que esta fração do catálogo, o planejador varre todos os
+# livros em vez de partir do índice (menos acessos fora de ordem)
+INDEX_MAX_FRACTION = 0.3
+FULL_SORT_FRACTION = 0.25 # A partir desta fração do resultado, um argsort completo sai mais barato que o partition
+
+
+class BookQuery(NamedTuple):
+    title: Optional[str] = None # Em minúsculas
+    prefix: bool = False # Título começando com `title` em vez de contendo
+    title_pattern: Optional[re.Pattern] = None # `title` compilado, quando ele é uma expressão regular
+    category: Optional[str] = None # Em minúsculas
+    min_price: float = -math.inf
+    max_price: float = math.inf
+    min_rating: Optional[int] = None
+    available: Optional[bool] = None
+    sort: Optional[str] = None # Um de QUERY_SORTS; None = ordem dos dados
+
+    @property
+    def has_price_filter(self):
+        return self.min_price != -math.inf or self.max_price != math.inf
+
+
+def sort_keys(values, descending=False):
+    """Chaves de ordenação crescente: NaN vai para o fim nos dois sentidos, como no índice de preço."""
+    keys = -values.astype(np.float64) if descending else values.astype(np.float64)
+    keys[np.isnan(keys)] = np.inf
+    return keys
+
+
+def top_k_order(keys, k):
+    """Índices dos `k` menores `keys`, em ordem crescente e, nos empates, na ordem original (como um sort estável).
+
+    np.partition acha o k-ésimo valor em O(n); só os valores abaixo dele e os primeiros empates com ele são
+    ordenados, em vez do resultado inteiro.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= len(keys):
+        return np.argsort(keys, kind='stable')
+    kth = np.partition(keys, k - 1)[k - 1]
+    below = np.flatnonzero(keys < kth)
+    ties = np.flatnonzero(keys == kth)[:k - len(below)]
+    chosen = np.concatenate([below, ties])
+    return chosen[np.lexsort((chosen, keys[chosen]))]
+
+
+class TopPositions:
+    """Posições de um resultado ordenado por `keys`, com a ordem calculada só até onde as páginas pedem.
+
+    len() é o total do resultado (X-Total-Count) e cada slice [a:b] ordena apenas os b primeiros (top_k_order);
+    páginas seguintes reaproveitam a maior ordem já calculada.
+    """
+
+    def __init__(self, positions, keys):
+        self.positions = positions
+        self.keys = keys
+        self._order = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, item):
+        start, stop, step = item.indices(len(self))
+        if stop > len(self._order):
+            if stop >= FULL_SORT_FRACTION * len(self):
+                self._order = np.argsort(self.keys, kind='stable')
+            else:
+                self._order = top_k_order(self.keys, max(stop, 2 * len(self._order)))
+        return self.positions[self._order[start:stop:step]]
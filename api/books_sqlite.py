@@ -0,0 +1,390 @@
+# api/books_sqlite.py
+#
+# Backend SQLite da API (BOOKS_BACKEND=sqlite), alternativa ao DataFrame em memória: os dados ficam no
+# data/books.sqlite gravado pelo scraper (scripts/sinks.py, SqliteSink) e cada rota vira uma consulta
+# indexada. O worker guarda só um pool de conexões e os agregados, então a memória não cresce com o catálogo.
+# SqliteBooks tem a mesma interface do BooksIndex (books_index.py); as "posições" aqui são ids, e os
+# resultados das buscas são consultas paginadas sob demanda (QueryResult) em vez de arrays com todos os ids.
+
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import cached_property
+
+import numpy as np
+
+from books_index import REGEX_METACHARACTERS, RANK_SUBSTRING, RANK_TITLE_PREFIX, RANK_WORD_PREFIX
+from books_query import INDEX_MAX_FRACTION
+from books_stats import BooksAggregates, average_price
+
+SQLITE_FILENAME = 'books.sqlite'
+FTS_MIN_QUERY = 3 # O índice de trigramas só ajuda com consultas de 3 caracteres ou mais
+CACHE_SIZE_KIB = 16 * 1024 # Page cache por conexão (PRAGMA cache_size)
+# ORDER BY de cada ordenação de BooksIndex.query: preço nulo no fim nos dois sentidos e empates pela ordem dos dados
+QUERY_ORDER_BY = {
+    None: 'books.id',
+    'price': 'books.price NULLS LAST, books.id',
+    '-price': 'books.price DESC NULLS LAST, books.id',
+    'rating': 'books.rating NULLS LAST, books.id',
+    '-rating': 'books.rating DESC NULLS LAST, books.id',
+}
+# Tipo declarado na tabela -> tipo Arrow, para colunas fora do schema fixo da exportação (books_export.export_schema)
+ARROW_TYPE_NAMES = {'INTEGER': 'int64', 'REAL': 'float64', 'TEXT': 'string'}
+
+
+def _contains(title, query):
+    return title is not None and query in title.lower()
+
+
+def _startswith(title, query):
+    return title is not None and title.lower().startswith(query)
+
+
+def _regexp(title, pattern):
+    return title is not None and re.search(pattern, title.lower()) is not None
+
+
+def _title_rank(title, query):
+    title = title.lower()
+    if title.startswith(query):
+        return RANK_TITLE_PREFIX
+    if title.find(' ' + query) >= 0:
+        return RANK_WORD_PREFIX
+    return RANK_SUBSTRING
+
+
+class ConnectionPool:
+    """Conexões somente leitura ao banco, reaproveitadas entre as requisições das threads de um worker.
+
+    As conexões são abertas sob demanda (até `size`) no processo que as usa, então o pool sobrevive ao
+    fork dos workers do gunicorn.
+    """
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _connect(self):
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        connection.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+        # Mesma semântica de busca do BooksIndex (lower() do Python, regex do módulo re)
+        connection.create_function('py_contains', 2, _contains, deterministic=True)
+        connection.create_function('py_startswith', 2, _startswith, deterministic=True)
+        connection.create_function('py_regexp', 2, _regexp, deterministic=True)
+        connection.create_function('py_title_rank', 2, _title_rank, deterministic=True)
+        return connection
+
+    @contextmanager
+    def connection(self):
+        if os.getpid() != self._pid: # Processo filho (fork): não reaproveita conexões do pai
+            self.__init__(self.path, self.size)
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                self._opened += can_open
+            connection = self._connect() if can_open else self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def execute(self, sql, params=()):
+        with self.connection() as connection:
+            return connection.execute(sql, params).fetchall()
+
+
+class QueryResult:
+    """Ids (em ordem) de uma consulta: len() faz um COUNT e cada slice um LIMIT/OFFSET, sem materializar tudo."""
+
+    def __init__(self, pool, where='1', params=(), order_by='books.id', source='books', order_params=()):
+        self.pool = pool
+        self.where = where
+        self.params = tuple(params)
+        self.order_by = order_by
+        self.order_params = tuple(order_params) # Parâmetros do ORDER BY, que não entram no COUNT
+        self.source = source
+        self._length = None
+
+    def __len__(self):
+        if self._length is None:
+            self._length = self.pool.execute(f"SELECT COUNT(*) FROM {self.source} WHERE {self.where}",
+                                             self.params)[0][0]
+        return self._length
+
+    def __getitem__(self, item):
+        start, stop, _ = item.indices(len(self))
+        if stop <= start:
+            return np.empty(0, dtype=np.int64)
+        rows = self.pool.execute(f"SELECT books.id FROM {self.source} WHERE {self.where} "
+                                 f"ORDER BY {self.order_by} LIMIT ? OFFSET ?",
+                                 self.params + self.order_params + (stop - start, start))
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+
+class SqliteRecords:
+    """Linhas do banco como dicts prontos para o jsonify (mesmos tipos e NaN do BookRecords)."""
+
+    def __init__(self, pool, columns, length):
+        self.pool = pool
+        self.columns = columns
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def _to_dicts(self, names, rows):
+        converted = []
+        for row in rows:
+            record = {}
+            for name, value in zip(names, row):
+                if value is None:
+                    value = np.nan # Como o pandas lê células vazias do CSV
+                elif name == 'availability':
+                    value = bool(value)
+                record[name] = value
+            converted.append(record)
+        return converted
+
+    def lookup(self, ids, fields=None):
+        """Dict id -> registro dos `ids` que existem, só com `fields` se informado."""
+        if not ids:
+            return {}
+        names = fields or self.columns
+        # Os ids vão num único parâmetro JSON: sem o limite de variáveis por consulta do SQLite
+        rows = self.pool.execute(f"SELECT id, {', '.join(names)} FROM books WHERE id IN "
+                                 f"(SELECT value FROM json_each(?))", (json.dumps(ids),))
+        return dict(zip((row[0] for row in rows), self._to_dicts(names, [row[1:] for row in rows])))
+
+    def take(self, positions, fields=None):
+        """Dicts dos ids em `positions`, na mesma ordem, só com `fields` se informado."""
+        ids = [int(position) for position in positions]
+        by_id = self.lookup(ids, fields)
+        return [by_id[book_id] for book_id in ids if book_id in by_id]
+
+    def page(self, start, stop, fields=None):
+        """Dicts das linhas start..stop na ordem dos dados (id)."""
+        names = fields or self.columns
+        # O OFFSET percorre o índice books_id (só ids), não as linhas inteiras da tabela
+        rows = self.pool.execute(f"SELECT {', '.join(names)} FROM books WHERE id IN "
+                                 f"(SELECT id FROM books ORDER BY id LIMIT ? OFFSET ?) ORDER BY id",
+                                 (max(0, stop - start), start))
+        return self._to_dicts(names, rows)
+
+    def __getitem__(self, item):
+        return self.page(item, item + 1)[0]
+
+
+class SqliteBooks:
+    """Snapshot do backend SQLite: mesma interface do BooksIndex, respondida por consultas indexadas."""
+
+    def __init__(self, path, version='empty', pool_size=4):
+        self.path = path
+        self.version = version
+        self.pool = ConnectionPool(path, pool_size)
+        table_info = self.pool.execute("PRAGMA table_info(books)")
+        self.columns = [row[1] for row in table_info]
+        self.column_types = {row[1]: row[2].upper() for row in table_info}
+        self.has_fts = bool(self.pool.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"))
+        self.records = SqliteRecords(self.pool, self.columns, self.pool.execute("SELECT COUNT(*) FROM books")[0][0])
+        self.books = None # Sem DataFrame: os dados ficam no banco
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def top_rated_positions(self):
+        # Maior rating, em ordem crescente de preço (preço nulo no fim) e, nos empates, na ordem dos dados
+        return QueryResult(self.pool, "rating = (SELECT MAX(rating) FROM books)",
+                           order_by="price NULLS LAST, books.id")
+
+    @cached_property
+    def aggregates(self):
+        """Os mesmos agregados de books_stats.compute_aggregates, calculados em SQL."""
+        execute = self.pool.execute
+        categories = [row[0] for row in
+                      execute("SELECT DISTINCT category FROM books WHERE category IS NOT NULL ORDER BY category")]
+        # Médias somadas em numpy na ordem dos dados, como em compute_aggregates: o AVG do SQLite soma de outro jeito
+        # e o centavo arredondado pode mudar
+        category_prices = execute("SELECT category, price FROM books ORDER BY id")
+        prices = np.array([price for _, price in category_prices], dtype=np.float64) # NULL -> nan
+        has_price = ~np.isnan(prices)
+        prices = np.where(has_price, prices, 0.0)
+        book_categories = np.array([category for category, _ in category_prices], dtype=object)
+        rating_counts = dict(execute("SELECT rating, COUNT(*) FROM books GROUP BY rating"))
+        overview = {
+            "total_books": len(prices),
+            "average_price": average_price(prices, int(has_price.sum())),
+            "rating_distribution": {f"{k}_star": rating_counts.get(k, 0) for k in range(1, 6)},
+        }
+        rows = execute(
+            "SELECT category, COUNT(*), "
+            "(SELECT title FROM books AS top WHERE top.category = books.category "
+            " ORDER BY rating DESC, price NULLS LAST, id LIMIT 1) "
+            "FROM books WHERE category IS NOT NULL GROUP BY category ORDER BY category")
+        category_stats = []
+        for category_name, count, top_title in rows:
+            in_category = book_categories == category_name
+            category_stats.append({
+                "category_name": category_name,
+                "book_count": count,
+                "average_price": average_price(prices[in_category], int(has_price[in_category].sum())),
+                "top_rated_book_in_category": top_title if top_title is not None else np.nan,
+            })
+        return BooksAggregates(categories, overview, category_stats)
+
+    def get_by_id(self, book_id):
+        records = self.records.take([book_id])
+        return records[0] if records else None
+
+    def get_many(self, ids, fields=None):
+        by_id = self.records.lookup([int(book_id) for book_id in ids], fields)
+        return [by_id.get(book_id) for book_id in ids]
+
+    def arrow_chunks(self, positions=None, fields=None, chunk_rows=10000):
+        """Schema Arrow e gerador de tabelas Arrow dos ids em `positions` (None = todos), `chunk_rows` por lote."""
+        import pyarrow as pa
+        from books_export import export_schema
+
+        names = fields or self.columns
+        schema = export_schema(pa.schema([(name, pa.type_for_alias(ARROW_TYPE_NAMES.get(self.column_types.get(name),
+                                                                                        'string')))
+                                          for name in names]))
+
+        def to_table(rows):
+            columns = list(zip(*rows)) if rows else [()] * len(names)
+            arrays = []
+            for field, values in zip(schema, columns):
+                if field.name == 'availability':
+                    values = [bool(value) if value is not None else None for value in values]
+                arrays.append(pa.array(values, type=field.type))
+            return pa.Table.from_arrays(arrays, schema=schema)
+
+        def chunks():
+            if positions is None:
+                # Paginação pela chave (id > último id do lote anterior): cada lote é uma busca no índice, sem OFFSET
+                last_id = -2**63
+                while True:
+                    rows = self.pool.execute(f"SELECT id, {', '.join(names)} FROM books WHERE id > ? ORDER BY id "
+                                             f"LIMIT ?", (last_id, chunk_rows))
+                    if not rows:
+                        return
+                    last_id = rows[-1][0]
+                    yield to_table([row[1:] for row in rows])
+            else:
+                for start in range(0, len(positions), chunk_rows):
+                    ids = [int(book_id) for book_id in positions[start:start + chunk_rows]]
+                    rows = self.pool.execute(f"SELECT id, {', '.join(names)} FROM books WHERE id IN "
+                                             f"(SELECT value FROM json_each(?))", (json.dumps(ids),))
+                    by_id = {row[0]: row[1:] for row in rows}
+                    yield to_table([by_id[book_id] for book_id in ids if book_id in by_id])
+        return schema, chunks()
+
+    def price_range(self, min_price, max_price, sort=None):
+        if np.isnan(min_price) or np.isnan(max_price):
+            return np.empty(0, dtype=np.int64)
+        order_by = {None: 'books.id', 'price': 'price, books.id', '-price': 'price DESC, books.id'}[sort]
+        return QueryResult(self.pool, "price >= ? AND price <= ?", (min_price, max_price), order_by)
+
+    def _title_conditions(self, title, prefix, conditions, params, use_fts=True, pattern=None):
+        """Acrescenta as condições do filtro de título; retorna a origem (FROM) da consulta.
+
+        `pattern` é `title` já compilado, quando ele é uma expressão regular.
+        """
+        if pattern is not None or (not prefix and REGEX_METACHARACTERS.intersection(title)):
+            conditions.append("py_regexp(books.title, ?)")
+            params.append(pattern.pattern if pattern is not None else title)
+            return 'books'
+        source = 'books'
+        if use_fts and self.has_fts and len(title) >= FTS_MIN_QUERY:
+            # Candidatos pelo índice de trigramas; py_contains/py_startswith confirmam com o lower() do Python
+            source = "books_fts JOIN books ON books.id = books_fts.rowid"
+            conditions.append("books_fts MATCH ?")
+            params.append('"' + title.replace('"', '""') + '"')
+        conditions.append("py_startswith(books.title, ?)" if prefix else "py_contains(books.title, ?)")
+        params.append(title)
+        return source
+
+    def search(self, title=None, category=None, prefix=False, rank=False, title_pattern=None):
+        """Ids dos livros cujo título contém `title` e cuja categoria é `category` (ambos em minúsculas).
+
+        `title_pattern` é `title` já compilado, quando ele é uma expressão regular.
+        """
+        conditions, params, source = [], [], 'books'
+        if category:
+            conditions.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        if title:
+            source = self._title_conditions(title, prefix, conditions, params, pattern=title_pattern)
+        if title and rank:
+            return QueryResult(self.pool, ' AND '.join(conditions), params, 'py_title_rank(books.title, ?), books.id',
+                               source, order_params=(title,))
+        return QueryResult(self.pool, ' AND '.join(conditions) or '1', params, 'books.id', source)
+
+    def _count(self, where, params):
+        return self.pool.execute(f"SELECT COUNT(*) FROM books WHERE {where}", params)[0][0]
+
+    def query(self, query):
+        """Ids que satisfazem todos os filtros de `query` (books_query.BookQuery) e o plano executado.
+
+        O mesmo planejamento do BooksIndex.query: sem histogramas, o planejador do SQLite estima mal faixas de
+        preço e partia do índice de preço mesmo com uma categoria bem mais seletiva. Aqui cada filtro com índice
+        (categoria, faixa de preço, FTS do título) é estimado com um COUNT sobre o próprio índice, o menor conduz a
+        consulta e os demais são aplicados linha a linha: o '+' antes da coluna impede o SQLite de usar o índice dela.
+        """
+        if np.isnan(query.min_price) or np.isnan(query.max_price):
+            return np.empty(0, dtype=np.int64), ['price[0]']
+        title_is_regex = query.title_pattern is not None
+        estimates = {}
+        if query.category:
+            estimates['category'] = self._count("category = ? COLLATE NOCASE", (query.category,))
+        if query.has_price_filter:
+            estimates['price'] = self._count("price >= ? AND price <= ?", (query.min_price, query.max_price))
+        if query.title and not title_is_regex and self.has_fts and len(query.title) >= FTS_MIN_QUERY:
+            estimates['title'] = self.pool.execute("SELECT COUNT(*) FROM books_fts WHERE books_fts MATCH ?",
+                                                   ('"' + query.title.replace('"', '""') + '"',))[0][0]
+        source = min(estimates, key=estimates.get) if estimates else 'scan'
+        if source != 'scan' and estimates[source] > INDEX_MAX_FRACTION * len(self):
+            source = 'scan'
+        plan = [f"{source}[{estimates.get(source, len(self))}]"]
+
+        def column(name):
+            return f"books.{name}" if name == source else f"+books.{name}"
+
+        conditions, params, tables, filters = [], [], 'books', []
+        if query.category:
+            conditions.append(f"{column('category')} = ? COLLATE NOCASE")
+            params.append(query.category)
+            filters.append('category')
+        if query.has_price_filter:
+            conditions.append(f"{column('price')} >= ? AND {column('price')} <= ?")
+            params.extend((query.min_price, query.max_price))
+            filters.append('price')
+        if query.min_rating is not None:
+            conditions.append("+books.rating >= ?")
+            params.append(query.min_rating)
+            filters.append('rating')
+        if query.available is not None:
+            conditions.append("books.availability = ?")
+            params.append(int(query.available))
+            filters.append('available')
+        if query.title:
+            tables = self._title_conditions(query.title, query.prefix, conditions, params, use_fts=source == 'title',
+                                            pattern=query.title_pattern)
+            filters.append('title')
+        plan += [name for name in filters if name != source] + ([f"top-k {query.sort}"] if query.sort else [])
+        return QueryResult(self.pool, ' AND '.join(conditions) or '1', params, QUERY_ORDER_BY[query.sort], tables), plan
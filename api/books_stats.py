@@ -0,0 +1,62 @@
+# api/books_stats.py
+#
+# Agregados das rotas de estatísticas e categorias, calculados de uma vez (operações vetorizadas) sobre o
+# DataFrame inteiro. BooksIndex.aggregates guarda o resultado até a próxima carga dos dados.
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class BooksAggregates(NamedTuple):
+    categories: list # Categorias distintas, em ordem alfabética (/api/v1/categories)
+    overview: dict # /api/v1/stats/overview
+    category_stats: list # /api/v1/stats/categories
+
+
+def average_price(prices, count):
+    """Média arredondada exatamente como a versão original (pandas Series.mean por grupo, depois round).
+
+    `prices` traz os preços na ordem dos dados com os nulos já trocados por 0 e `count` é o número de preços não
+    nulos: a soma float64 do numpy sobre esse array e a divisão são as do Series.mean, e o round é o do np.float64.
+    Uma média agregada de outro jeito (groupby().mean(), AVG do SQLite) soma em outra ordem e pode mudar o
+    centavo arredondado.
+    """
+    if not count:
+        return np.nan
+    return round(np.float64(prices.sum(dtype=np.float64)) / np.float64(count), 2)
+
+
+def compute_aggregates(books):
+    categories = books['category'].dropna().unique().tolist()
+    categories.sort()
+
+    rating_counts = books['rating'].value_counts().to_dict()
+    overview = {
+        "total_books": len(books),
+        "average_price": round(books['price'].mean(), 2),
+        "rating_distribution": {f"{k}_star": rating_counts.get(k, 0) for k in range(1, 6)},
+    }
+
+    # O mais bem avaliado de cada categoria: maior rating, depois menor preço. O sort é estável, então
+    # empates ficam na ordem dos dados, como no sort_values por grupo que as rotas faziam
+    with_category = books.dropna(subset=['category'])
+    ranked = with_category.sort_values(by=['rating', 'price'], ascending=[False, True], kind='stable')
+    top_rated_titles = ranked.drop_duplicates(subset='category').set_index('category')['title']
+    prices = with_category['price'].to_numpy(dtype=np.float64)
+    has_price = ~np.isnan(prices)
+    prices = np.where(has_price, prices, 0.0)
+    group_positions = with_category.groupby('category', observed=True).indices # Posições em ordem dos dados
+
+    category_stats = [
+        {
+            "category_name": category_name,
+            "book_count": len(positions),
+            "average_price": average_price(prices[positions], int(has_price[positions].sum())),
+            "top_rated_book_in_category": top_rated_titles[category_name],
+        }
+        for category_name, positions in group_positions.items()
+    ]
+    category_stats.sort(key=lambda x: x['category_name'])
+
+    return BooksAggregates(categories, overview, category_stats)
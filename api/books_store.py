@@ -0,0 +1,242 @@
+# api/books_store.py
+#
+# Representação compacta do catálogo em memória. O DataFrame carregado (books_data.read_books_data) passa por
+# compact_books: inteiros no menor dtype que os comporta (rating int8, id int16/int32), availability bool,
+# category Categorical, textos em strings Arrow (um buffer contínuo em vez de um objeto Python por célula) e
+# URLs com o prefixo/sufixo comum guardado uma única vez (PrefixStringArray). O DataFrame continua sendo o
+# acesso a todos os dados (snapshot.books) e BookRecords monta os dicts das respostas a partir dele, só para
+# as linhas pedidas, em vez de manter um dict Python por livro.
+
+import os
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionArray, ExtensionDtype, register_extension_dtype, take
+
+try:
+    import pyarrow as pa
+except ImportError: # Dependência opcional: sem pyarrow os textos ficam como objetos Python
+    pa = None
+
+TEXT_COLUMNS = ('title', 'upc', 'description')
+URL_COLUMNS = ('image_url', 'detail_url')
+INTEGER_COLUMNS = ('id', 'rating', 'stock_count')
+SCALAR_READ_LIMIT = 32 # Até quantas linhas uma coluna Arrow em blocos é lida valor a valor em vez de com take
+
+
+@register_extension_dtype
+class PrefixStringDtype(ExtensionDtype):
+    name = 'prefix_string'
+    type = str
+    na_value = np.nan
+
+    @classmethod
+    def construct_array_type(cls):
+        return PrefixStringArray
+
+    def __repr__(self):
+        return self.name
+
+
+class PrefixStringArray(ExtensionArray):
+    """Strings com prefixo e sufixo comuns (ex.: 'https://books.toscrape.com/catalogue/' ... '/index.html').
+
+    Só a parte do meio de cada valor fica num array Arrow; os valores completos são remontados na leitura.
+    Nulos viram NaN, como numa coluna object lida pelo pandas.
+    """
+
+    def __init__(self, prefix, middles, suffix=''):
+        self.prefix = prefix
+        self.middles = middles
+        self.suffix = suffix
+
+    @classmethod
+    def from_strings(cls, values):
+        strings = [value for value in values if isinstance(value, str)]
+        prefix = os.path.commonprefix(strings) if strings else ''
+        # Sufixo comum ao que sobra depois do prefixo (o prefixo pode cobrir um valor inteiro)
+        rests = [string[len(prefix):] for string in strings]
+        suffix = os.path.commonprefix([rest[::-1] for rest in rests])[::-1] if rests else ''
+        middles = [value[len(prefix):len(value) - len(suffix)] if isinstance(value, str) else None
+                   for value in values]
+        return cls(prefix, pa.array(middles, type=pa.string()), suffix)
+
+    @classmethod
+    def _from_sequence(cls, scalars, dtype=None, copy=False):
+        return cls.from_strings(list(scalars))
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls.from_strings(list(values))
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        return cls.from_strings([value for array in to_concat for value in array.to_list()])
+
+    @property
+    def dtype(self):
+        return PrefixStringDtype()
+
+    @property
+    def nbytes(self):
+        return self.middles.nbytes + len(self.prefix) + len(self.suffix)
+
+    def __len__(self):
+        return len(self.middles)
+
+    def _decode(self, middles):
+        prefix, suffix = self.prefix, self.suffix
+        return [prefix + middle + suffix if middle is not None else np.nan for middle in _to_list(middles)]
+
+    def to_list(self, positions=None):
+        """Valores completos (das `positions`, se informadas) como lista de str/NaN."""
+        middles = self.middles if positions is None else self.middles.take(pa.array(positions, type=pa.int64()))
+        return self._decode(middles)
+
+    tolist = to_list
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            middle = self.middles[int(item)].as_py()
+            return self.prefix + middle + self.suffix if middle is not None else np.nan
+        positions = np.arange(len(self))[item]
+        return PrefixStringArray(self.prefix, self.middles.take(pa.array(positions, type=pa.int64())), self.suffix)
+
+    def __array__(self, dtype=None):
+        return np.array(self.to_list(), dtype=object)
+
+    def __arrow_array__(self, type=None):
+        # Conversão para Arrow (exportação): os valores completos, com nulos em vez de NaN
+        return pa.array(self.to_list(), type=type or pa.string(), from_pandas=True)
+
+    def __eq__(self, other):
+        return np.asarray(self, dtype=object) == other
+
+    def isna(self):
+        return self.middles.is_null().to_numpy(zero_copy_only=False)
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        positions = take(np.arange(len(self)), indices, allow_fill=allow_fill, fill_value=-1)
+        return PrefixStringArray(self.prefix, self.middles.take(pa.array(positions, mask=positions < 0)),
+                                 self.suffix)
+
+    def copy(self):
+        return PrefixStringArray(self.prefix, self.middles, self.suffix) # Arrays Arrow são imutáveis
+
+    def _values_for_factorize(self):
+        return np.asarray(self, dtype=object), np.nan
+
+
+def _to_list(array):
+    # Via numpy: bem mais rápido que to_pylist, que cria um escalar Arrow por valor
+    return array.to_numpy(zero_copy_only=False).tolist()
+
+
+def _is_plain_strings(column):
+    return column.dtype == object and column.notna().all() and column.map(type).eq(str).all()
+
+
+def compact_books(books):
+    """Converte as colunas do catálogo para os tipos compactos; colunas desconhecidas ficam como estão.
+
+    Colunas de texto já em Arrow (Feather mapeado em memória) não são recodificadas: elas apontam para páginas
+    do arquivo compartilhadas entre os workers, e recodificá-las criaria uma cópia privada em cada um.
+    """
+    columns = {}
+    for name in books.columns:
+        column = books[name]
+        if name in INTEGER_COLUMNS and pd.api.types.is_integer_dtype(column.dtype):
+            column = pd.to_numeric(column, downcast='integer')
+        elif name == 'availability' and column.dtype == object and column.isin([True, False]).all():
+            column = column.astype(bool)
+        elif name == 'category' and column.dtype == object:
+            column = column.astype('category')
+        elif pa is not None and name in URL_COLUMNS and _is_plain_strings(column):
+            column = pd.Series(PrefixStringArray.from_strings(column.tolist()), name=name, index=column.index)
+        elif pa is not None and name in TEXT_COLUMNS and _is_plain_strings(column):
+            column = pd.Series(pd.arrays.ArrowExtensionArray(pa.array(column.tolist(), type=pa.string())),
+                               name=name, index=column.index)
+        columns[name] = column
+    return pd.DataFrame(columns, index=books.index)
+
+
+def _chunked_reader(chunked):
+    # ChunkedArray.take junta todos os blocos (uma cópia da coluna inteira) a cada chamada; aqui cada posição
+    # vai direto ao seu bloco, sem tirar a coluna do arquivo mapeado (Feather gravado em lotes)
+    chunks = chunked.chunks
+    offsets = np.cumsum([0] + [len(chunk) for chunk in chunks])
+
+    def read(positions):
+        chunk_ids = np.searchsorted(offsets, positions, side='right') - 1
+        if len(positions) <= SCALAR_READ_LIMIT: # Poucas linhas (busca por id, páginas pequenas): valor a valor
+            local_positions = (positions - offsets[chunk_ids]).tolist()
+            values = [chunks[chunk_id][local].as_py() for chunk_id, local in zip(chunk_ids.tolist(), local_positions)]
+            return [value if value is not None else np.nan for value in values]
+        values = [None] * len(positions)
+        for chunk_id in np.unique(chunk_ids).tolist():
+            in_chunk = np.flatnonzero(chunk_ids == chunk_id)
+            local = pa.array(positions[in_chunk] - offsets[chunk_id], type=pa.int64())
+            for index, value in zip(in_chunk.tolist(), _to_list(chunks[chunk_id].take(local))):
+                values[index] = value if value is not None else np.nan
+        return values
+    return read
+
+
+def _column_reader(column):
+    """Função posições -> lista de valores nativos do Python (como o to_dict devolveria) para uma coluna."""
+    values = column.array
+    if isinstance(values, PrefixStringArray):
+        return values.to_list
+    if isinstance(values, pd.Categorical):
+        # Código -1 (nulo) cai no último item, NaN, como no to_dict
+        categories = values.categories.tolist() + [np.nan]
+        codes = values.codes
+        return lambda positions: [categories[code] for code in codes[positions].tolist()]
+    if isinstance(values, pd.arrays.ArrowExtensionArray):
+        return _chunked_reader(values.__arrow_array__())
+    if isinstance(column.dtype, np.dtype): # Colunas numpy (column.array é um PandasArray, também ExtensionArray)
+        array = column.to_numpy()
+        return lambda positions: array[positions].tolist()
+    return lambda positions: column.iloc[positions].tolist()
+
+
+class BookRecords(Sequence):
+    """Linhas do DataFrame como dicts prontos para o jsonify, montados sob demanda.
+
+    Substitui a lista de dicts com um objeto por livro: records[i], records[a:b] e take(posições) leem
+    só as linhas pedidas, coluna a coluna.
+    """
+
+    def __init__(self, books):
+        self.columns = list(books.columns)
+        self._length = len(books)
+        self._readers = {name: _column_reader(books[name]) for name in self.columns}
+
+    def __len__(self):
+        return self._length
+
+    def take(self, positions, fields=None):
+        """Dicts das `positions` (array/lista de inteiros), só com `fields` se informado, na ordem pedida."""
+        positions = np.asarray(positions, dtype=np.int64)
+        names = fields or self.columns
+        if not len(positions):
+            return []
+        values = [self._readers[name](positions) for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def page(self, start, stop, fields=None):
+        """Dicts das linhas start..stop, na ordem dos dados."""
+        return self.take(np.arange(start, stop), fields)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.take(np.arange(self._length)[item])
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError('BookRecords index out of range')
+        return self.take([item])[0]
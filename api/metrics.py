@@ -0,0 +1,224 @@
+# api/metrics.py
+#
+# Instrumentação da API exposta em /api/v1/metrics no formato texto do Prometheus, sem dependências novas:
+#   - histograma de latência por rota (endpoint, método e status), medido do before_request ao after_request;
+#   - histograma por fase dentro da requisição (auth, query, encode), somando os blocos marcados com phase();
+#   - métricas lidas na hora por "coletores" registrados pela aplicação (caches, snapshot, carga dos dados).
+# Cada observação é um bisect e uma soma sob um lock, alguns microssegundos por requisição. As métricas são
+# do processo: com vários workers do gunicorn, cada um responde pelas próprias.
+# Também há um profiler por amostragem, ligado por requisição (SamplingProfiler, ver instrument).
+
+import bisect
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+# Limites dos buckets (segundos), do acerto no cache de respostas a uma exportação inteira
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PROFILE_HEADER = 'X-Profile' # Header da requisição que liga o profiler (com PROFILER_ENABLED)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'NaN'
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def format_family(name, kind, help_text, samples):
+    """Linhas de uma métrica: `samples` é um valor ou uma lista de (dict de labels, valor)."""
+    if not isinstance(samples, list):
+        samples = [({}, samples)]
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{_format_labels(labels)} {_format_value(value)}' for labels, value in samples)
+    return lines
+
+
+class Histogram:
+    """Histograma cumulativo do Prometheus com uma série por combinação de valores dos labels."""
+
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self.series = {} # valores dos labels -> [contagem por bucket (o último é +Inf), soma]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value) # Primeiro bucket com limite >= value ('le')
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        with self.lock:
+            series = [(label_values, list(counts), total) for label_values, (counts, total) in self.series.items()]
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for label_values, counts, total in sorted(series):
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels({**labels, "le": bound})} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Metrics:
+    """Registro das métricas da API: os histogramas de requisição/fase e os coletores da aplicação."""
+
+    def __init__(self, prefix='books_api'):
+        self.prefix = prefix
+        self.request_seconds = Histogram(f'{prefix}_request_duration_seconds',
+                                         'Duração das requisições até a resposta (sem o envio do corpo em streaming).',
+                                         ('endpoint', 'method', 'status'))
+        self.phase_seconds = Histogram(f'{prefix}_phase_duration_seconds',
+                                       'Tempo de cada fase dentro de uma requisição (auth, query, encode).',
+                                       ('endpoint', 'phase'))
+        self.collectors = [] # Funções sem argumentos que devolvem listas de linhas (format_family)
+
+    def add_collector(self, collect):
+        self.collectors.append(collect)
+        return collect
+
+    def render(self):
+        lines = self.request_seconds.render() + self.phase_seconds.render()
+        for collect in self.collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def phase(name):
+    """Soma a duração do bloco na fase `name` da requisição atual; fora de uma requisição instrumentada não faz nada."""
+    phases = g.get('phase_seconds') if has_request_context() else None
+    if phases is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - started
+
+
+class SamplingProfiler:
+    """Amostra a pilha de uma thread a cada `interval` segundos, a partir de outra thread.
+
+    O resultado (collapsed()) é o formato "collapsed" dos flame graphs (flamegraph.pl, speedscope): uma pilha
+    por linha, da raiz à folha, e o número de amostras. Por causa do GIL, a thread de amostragem só roda nas
+    trocas de thread do interpretador, então o intervalo efetivo pode passar do pedido (sys.getswitchinterval()).
+    """
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='request-profiler')
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def start_profiler():
+    """Liga o SamplingProfiler na requisição atual, se ela pediu (header X-Profile) e o profiler estiver ligado.
+
+    Chame só depois da autenticação, para usuários que podem receber o perfil: o profiler custa uma thread de
+    amostragem por requisição e não pode ser ligado por qualquer cliente.
+    """
+    interval = g.get('profile_interval')
+    if interval is not None and g.get('profiler') is None:
+        g.profiler = SamplingProfiler(threading.get_ident(), interval).start()
+
+
+def instrument(app, metrics, profile_dir=None, profile_interval=0.001):
+    """Registra no app Flask os hooks que alimentam os histogramas de `metrics`.
+
+    Chame antes de registrar outros before_request: se um deles responder direto (ex.: 503 durante a carga),
+    os seguintes não rodam, mas o after_request daqui roda e registra a requisição.
+    Com `profile_dir`, uma requisição com o header X-Profile: 1 roda sob o SamplingProfiler a partir do
+    start_profiler() (chamado pelo app após autenticar o usuário); as pilhas são gravadas em `profile_dir` e o
+    nome do arquivo volta no header X-Profile-File.
+    """
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.phase_seconds = {}
+        if profile_dir and request.headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes'):
+            g.profile_interval = profile_interval # O profiler só começa em start_profiler()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        metrics.request_seconds.observe(time.perf_counter() - started, endpoint, request.method,
+                                        str(response.status_code))
+        for name, seconds in g.phase_seconds.items():
+            metrics.phase_seconds.observe(seconds, endpoint, name)
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
+            response.headers['X-Profile-File'] = save_profile(profiler, profile_dir, endpoint)
+            response.headers['X-Profile-Samples'] = str(sum(profiler.stacks.values()))
+        return response
+
+
+def save_profile(profiler, profile_dir, endpoint):
+    """Grava as pilhas amostradas em <profile_dir>/<timestamp>-<endpoint>-<pid>.folded e retorna o nome do arquivo."""
+    os.makedirs(profile_dir, exist_ok=True)
+    filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{endpoint}-{os.getpid()}.folded"
+    with open(os.path.join(profile_dir, filename), 'w') as profile_file:
+        profile_file.write(profiler.collapsed())
+    print(f"Perfil da requisição {endpoint} gravado em {os.path.join(profile_dir, filename)} "
+          f"({sum(profiler.stacks.values())} amostras).")
+    return filename
@@ -0,0 +1,150 @@
+# api/pagination.py
+#
+# Paginação, projeção de campos e respostas em streaming comuns às rotas que listam livros (/books,
+# /books/search, /books/top-rated, /books/price-range). Sem parâmetros a resposta continua sendo o array
+# JSON completo de antes; com format=ndjson ou stream=true o corpo é gerado em blocos de dicts montados
+# pelo BooksIndex, sem montar a resposta inteira na memória do worker.
+
+import base64
+import binascii
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode
+
+from flask import Response, current_app, jsonify, request
+
+from metrics import phase
+
+LIST_FORMATS = ('json', 'ndjson')
+STREAM_CHUNK_ROWS = 1000 # Livros serializados por bloco nas respostas em streaming
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class ListArgs(NamedTuple):
+    offset: int
+    limit: Optional[int]
+    fields: Optional[list] # None = todas as colunas
+    format: str # 'json' ou 'ndjson'
+    stream: bool
+
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor opaco devolvido em X-Next-Cursor -> offset; ValueError se não for um cursor válido."""
+    try:
+        prefix, offset = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split(':')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Parâmetro 'cursor' inválido.")
+    if prefix != 'o' or not offset.isdigit():
+        raise ValueError("Parâmetro 'cursor' inválido.")
+    return int(offset)
+
+
+def get_int_arg(name, minimum=0):
+    """Lê um parâmetro inteiro opcional da query string; None se ausente, ValueError se inválido."""
+    if name not in request.args:
+        return None
+    try:
+        value = int(request.args[name])
+    except ValueError:
+        value = None
+    if value is None or value < minimum:
+        raise ValueError(f"O parâmetro '{name}' deve ser um inteiro maior ou igual a {minimum}.")
+    return value
+
+
+def parse_fields(columns):
+    """Lê fields= (nomes separados por vírgula) da requisição atual; None = todas as colunas."""
+    if not request.args.get('fields'):
+        return None
+    fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise ValueError(f"Campo(s) desconhecido(s) em 'fields': {', '.join(unknown)}. "
+                         f"Opções: {', '.join(columns)}")
+    return fields
+
+
+def parse_list_args(columns):
+    """Lê limit, offset/cursor, fields, format e stream da requisição atual.
+
+    Levanta ValueError com a mensagem para o cliente (a rota responde 400).
+    """
+    limit = get_int_arg('limit', minimum=1)
+    offset = get_int_arg('offset') or 0
+    if 'cursor' in request.args:
+        offset = decode_cursor(request.args['cursor'])
+
+    fields = parse_fields(columns)
+
+    list_format = request.args.get('format', 'json')
+    if list_format not in LIST_FORMATS:
+        raise ValueError("O parâmetro 'format' deve ser 'json' ou 'ndjson'.")
+    stream = request.args.get('stream', '').lower() in TRUE_VALUES
+
+    return ListArgs(offset, limit, fields, list_format, stream)
+
+
+def _next_page_url(next_offset):
+    args = request.args.to_dict(flat=False)
+    args.pop('offset', None)
+    args['cursor'] = [encode_cursor(next_offset)]
+    return f"{request.base_url}?{urlencode(args, doseq=True)}"
+
+
+def list_response(records, positions, list_args, empty_message=None):
+    """Resposta de uma rota de listagem.
+
+    `records` são os registros do snapshot (BookRecords ou SqliteRecords) e `positions` as posições do
+    resultado, na ordem desejada (None = todos os livros na ordem dos dados). A página é recortada antes de qualquer dict ser
+    montado, já só com os campos pedidos; X-Total-Count traz o total e, se houver mais páginas, X-Next-Cursor/Link apontam a próxima.
+    """
+    with phase('query'):
+        total = len(records) if positions is None else len(positions)
+    start = min(list_args.offset, total)
+    stop = total if list_args.limit is None else min(total, start + list_args.limit)
+
+    def page_chunks(chunk_rows):
+        for chunk_start in range(start, stop, chunk_rows):
+            chunk_stop = min(stop, chunk_start + chunk_rows)
+            if positions is None:
+                yield records.page(chunk_start, chunk_stop, list_args.fields)
+            else:
+                yield records.take(positions[chunk_start:chunk_stop], list_args.fields)
+
+    headers = {'X-Total-Count': str(total)}
+    if stop < total:
+        headers['X-Next-Cursor'] = encode_cursor(stop)
+        headers['Link'] = f'<{_next_page_url(stop)}>; rel="next"'
+
+    if list_args.format == 'json' and not list_args.stream:
+        if total == 0 and empty_message:
+            return jsonify({"message": empty_message}), 200
+        with phase('query'):
+            books = [record for chunk in page_chunks(max(1, stop - start)) for record in chunk]
+        with phase('encode'):
+            return jsonify(books), 200, headers
+
+    # O gerador roda depois que a rota retorna: usa o provider JSON do app capturado agora (mesmas opções
+    # do jsonify: chaves ordenadas, saída compacta)
+    json_provider = current_app.json
+
+    def generate_ndjson():
+        for chunk in page_chunks(STREAM_CHUNK_ROWS):
+            yield ''.join(json_provider.dumps(record, separators=(',', ':')) + '\n' for record in chunk)
+
+    def generate_json_array():
+        yield '['
+        first = True
+        for chunk in page_chunks(STREAM_CHUNK_ROWS):
+            # Serializa o bloco inteiro de uma vez e tira os colchetes: vira um trecho do array final
+            body = json_provider.dumps(chunk, separators=(',', ':'))[1:-1]
+            yield body if first else ',' + body
+            first = False
+        yield ']\n'
+
+    if list_args.format == 'ndjson':
+        return Response(generate_ndjson(), mimetype='application/x-ndjson', headers=headers)
+    return Response(generate_json_array(), mimetype='application/json', headers=headers)
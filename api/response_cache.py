@@ -0,0 +1,178 @@
+# api/response_cache.py
+#
+# Cache das respostas já serializadas (bytes do JSON, mais as versões gzip/brotli) das rotas GET. A chave é
+# rota + query string normalizada + versão do dataset, então uma nova carga dos dados invalida tudo; o ETag
+# é derivado da mesma chave, o que permite responder 304 a If-None-Match sem tocar nos dados nem no cache.
+# As entradas ficam num LRU limitado pelo total de bytes guardados.
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+
+from metrics import phase
+
+try:
+    import brotli
+except ImportError: # brotli é opcional; sem ele só gzip é oferecido
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024 # Respostas menores que isso vão sem compressão
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5 # Bom equilíbrio: a compressão é feita uma vez por entrada, não por requisição
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding, body_size):
+    """Melhor codificação aceita pelo cliente para um corpo de `body_size` bytes ('identity' se nenhuma)."""
+    if body_size < MIN_COMPRESS_BYTES:
+        return 'identity'
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return 'identity'
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+class CachedResponse:
+    """Resposta 200 serializada; as versões comprimidas são geradas sob demanda e guardadas junto."""
+
+    def __init__(self, body, mimetype, headers):
+        self.bodies = {'identity': body}
+        self.mimetype = mimetype
+        self.headers = headers # Headers da rota que precisam ser repetidos (ex.: X-Total-Count)
+
+    @property
+    def size(self):
+        return sum(len(body) for body in self.bodies.values())
+
+
+class ResponseCache:
+    """LRU de CachedResponse limitado por bytes (somando todas as codificações guardadas)."""
+
+    def __init__(self, max_bytes, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 8
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'uncacheable': 0}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+            return entry
+
+    def put(self, key, entry):
+        if entry.size > self.max_entry_bytes:
+            self.stats['uncacheable'] += 1
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self.entries[key] = entry
+            self.total_bytes += entry.size
+            self._evict()
+
+    def add_encoding(self, key, entry, encoding):
+        """Comprime o corpo na codificação pedida e atualiza a contabilidade de memória."""
+        body = compress(entry.bodies['identity'], encoding)
+        with self.lock:
+            if encoding not in entry.bodies:
+                entry.bodies[encoding] = body
+                if self.entries.get(key) is entry:
+                    self.total_bytes += len(body)
+                    self._evict()
+        return entry.bodies[encoding]
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+def request_key(version):
+    """Rota + query string normalizada (ordem dos parâmetros não importa) + versão do dataset."""
+    args = sorted((name, value) for name, values in request.args.lists() for value in values)
+    return (version, request.path, tuple(args))
+
+
+def make_etag(key):
+    return hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+
+
+def cached_response(cache, get_version, passthrough_headers=('X-Total-Count', 'X-Next-Cursor', 'Link', 'X-Query-Plan')):
+    """Decorador das rotas GET: 304 para If-None-Match, cache dos 200 serializados e compressão.
+
+    Respostas em streaming (stream=true / format=ndjson) só ganham ETag/304, sem passar pelo cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request_key(get_version())
+            etag = make_etag(key)
+            if request.if_none_match.contains_weak(etag):
+                cache.stats['not_modified'] += 1
+                response = make_response('', 304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            entry = cache.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag, weak=True)
+                if response.is_streamed:
+                    return response
+                entry = CachedResponse(response.get_data(), response.mimetype,
+                                       {name: response.headers[name] for name in passthrough_headers
+                                        if name in response.headers})
+                cache.put(key, entry)
+
+            encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), len(entry.bodies['identity']))
+            body = entry.bodies.get(encoding)
+            if body is None:
+                with phase('encode'):
+                    body = cache.add_encoding(key, entry, encoding)
+            response = make_response(body, 200, entry.headers)
+            response.mimetype = entry.mimetype
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+            response.headers['Vary'] = 'Accept-Encoding'
+            # ETag fraco: as versões comprimidas e a original compartilham o mesmo validador
+            response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,59 @@
+# benchmarks/api_bench.py
+#
+# Utilitários comuns dos benchmarks da API: carrega api/app.py sobre uma pasta de dados (ex.: gerada por
+# synthetic.py) e mede a latência de rotas pelo cliente de testes do Flask, que percorre toda a pilha
+# WSGI (roteamento, autenticação, jsonify) sem o ruído de rede.
+
+import base64
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTH_HEADERS = {'Authorization': 'Basic ' + base64.b64encode(b'admin:adminpass').decode()}
+
+
+def load_api(data_dir, data_format='auto', fast_auth=True):
+    """Importa a API carregando os dados de `data_dir`; retorna o módulo app.
+
+    Com `fast_auth` o hash da senha do admin é refeito com uma única iteração de PBKDF2: o hash padrão
+    custa centenas de ms por requisição e esconderia o custo da rota que está sendo medida.
+    """
+    os.environ['BOOKS_DATA_DIR'] = data_dir
+    os.environ['BOOKS_DATA_FORMAT'] = data_format
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'api'))
+    import app
+    if fast_auth:
+        from werkzeug.security import generate_password_hash
+        app.USERS['admin'] = generate_password_hash('adminpass', method='pbkdf2:sha256:1')
+    return app
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def measure_latency(client, urls, headers=AUTH_HEADERS, warmup=20):
+    """Faz um GET por URL e retorna as latências em ms (p50, p99, máx.) e req/s."""
+    for url in urls[:warmup]:
+        client.get(url, headers=headers)
+    latencies = []
+    started = time.perf_counter()
+    for url in urls:
+        request_started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{url}: HTTP {response.status_code}")
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {'p50': percentile(latencies, 0.50), 'p99': percentile(latencies, 0.99),
+            'max': latencies[-1], 'rps': len(urls) / elapsed}
+
+
+def format_latency(name, result):
+    return (f"{name:<28}{result['p50']:>10.3f}{result['p99']:>10.3f}{result['max']:>10.3f}"
+            f"{result['rps']:>11.0f}")
+
+
+LATENCY_HEADER = f"{'rota':<28}{'p50 (ms)':>10}{'p99 (ms)':>10}{'máx (ms)':>10}{'req/s':>11}"
@@ -0,0 +1,193 @@
+# benchmarks/bench_api_asgi.py
+#
+# Teste de carga por HTTP real comparando o deploy síncrono atual (gunicorn com workers sync, api.app:app) com
+# o modo ASGI (gunicorn com workers do uvicorn, api.asgi:asgi_app), com muitos clientes simultâneos. Cada
+# cliente usa uma conexão keep-alive e faz requisições em sequência por rotas variadas (livro por id, busca,
+# listagem paginada, estatísticas); o resultado é req/s e latência p50/p99 vista pelo cliente.
+# A autenticação usa um token Bearer (mesma SECRET_KEY em todos os workers), como um cliente em produção.
+# A última rodada repete a maior concorrência com alguns clientes lentos, que enviam o cabeçalho da requisição
+# aos poucos (rede ruim): no modo sync cada um deles prende um worker inteiro enquanto isso.
+# Uso: python benchmarks/bench_api_asgi.py [--rows 10000] [--workers 2] [--concurrency 32 --concurrency 256]
+#      [--slow-clients 4]
+
+import argparse
+import asyncio
+import base64
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import PROJECT_ROOT, percentile # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+SERVERS = {
+    'sync (gunicorn)': ['api.app:app'],
+    'asgi (uvicorn)': ['api.asgi:asgi_app', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+SEARCH_WORDS = ('light', 'the', 'love', 'night', 'history', 'world')
+
+
+def start_server(app_args, data_dir, port, workers, extra_env=None):
+    env = dict(os.environ, BOOKS_DATA_DIR=data_dir, SECRET_KEY='bench-secret', **(extra_env or {}))
+    command = [sys.executable, '-m', 'gunicorn', *app_args, '-w', str(workers), '-b', f'127.0.0.1:{port}',
+               '--backlog', '4096', '--log-level', 'warning']
+    return subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def stop_server(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait()
+
+
+async def wait_ready(base_url, timeout=120):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(base_url + '/') as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"servidor em {base_url} não respondeu em {timeout}s")
+
+
+async def fetch_token(base_url):
+    basic = 'Basic ' + base64.b64encode(b'admin:adminpass').decode()
+    async with aiohttp.ClientSession() as session:
+        async with session.post(base_url + '/api/v1/auth/token', headers={'Authorization': basic}) as response:
+            return (await response.json())['access_token']
+
+
+def request_paths(rows, count, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.5:
+            paths.append(f'/api/v1/books/{rng.randint(1, rows)}')
+        elif kind < 0.75:
+            paths.append(f'/api/v1/books/search?title={rng.choice(SEARCH_WORDS)}&limit=20')
+        elif kind < 0.9:
+            paths.append(f'/api/v1/books?limit=50&offset={rng.randrange(0, rows, 50)}')
+        else:
+            paths.append('/api/v1/stats/overview')
+    return paths
+
+
+async def run_load(base_url, token, paths, concurrency, method='GET', headers=None):
+    """Divide `paths` entre `concurrency` clientes simultâneos; retorna req/s, p50, p95, p99 e erros.
+
+    Cada item de `paths` é um caminho ou um par (caminho, corpo JSON).
+    """
+    headers = headers or {'Authorization': f'Bearer {token}'}
+    latencies = []
+    errors = 0
+
+    async def client(session, client_paths):
+        nonlocal errors
+        for path in client_paths:
+            path, body = (path, None) if isinstance(path, str) else path
+            started = time.perf_counter()
+            try:
+                async with session.request(method, base_url + path, headers=headers, json=body) as response:
+                    await response.read()
+                    if response.status >= 500:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session, paths[i::concurrency]) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {'rps': len(paths) / elapsed, 'p50': percentile(latencies, 0.50), 'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99), 'errors': errors}
+
+
+async def slow_client(port, token, duration, interval=0.5):
+    """Envia uma requisição em pedaços ao longo de `duration` segundos e lê a resposta."""
+    request = (f'GET /api/v1/stats/overview HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+               f'Authorization: Bearer {token}\r\nConnection: close\r\n\r\n').encode()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    pieces = max(1, int(duration / interval))
+    step = -(-len(request) // pieces)
+    for start in range(0, len(request), step):
+        writer.write(request[start:start + step])
+        await writer.drain()
+        await asyncio.sleep(interval)
+    await reader.read()
+    writer.close()
+
+
+async def run_with_slow_clients(base_url, port, token, paths, concurrency, slow_clients):
+    # Os clientes lentos ficam conectados enquanto a carga normal roda (mede-se só a carga normal)
+    slow = [asyncio.create_task(slow_client(port, token, duration=10)) for _ in range(slow_clients)]
+    await asyncio.sleep(0.5)
+    result = await run_load(base_url, token, paths, concurrency)
+    await asyncio.gather(*slow)
+    return result
+
+
+def format_result(name, clients, result):
+    return (f"{name:<18}{clients:>14}{result['rps']:>10.0f}{result['p50']:>10.1f}"
+            f"{result['p99']:>10.1f}{result['errors']:>8}")
+
+
+async def bench_server(name, app_args, data_dir, args):
+    base_url = f'http://127.0.0.1:{args.port}'
+    process = start_server(app_args, data_dir, args.port, args.workers)
+    try:
+        await wait_ready(base_url)
+        token = await fetch_token(base_url)
+        await run_load(base_url, token, request_paths(args.rows, 500, seed=99), 16) # Aquecimento
+        for concurrency in args.concurrency:
+            result = await run_load(base_url, token, request_paths(args.rows, args.requests), concurrency)
+            print(format_result(name, str(concurrency), result))
+        if args.slow_clients:
+            concurrency = max(args.concurrency)
+            result = await run_with_slow_clients(base_url, args.port, token, request_paths(args.rows, args.requests),
+                                                 concurrency, args.slow_clients)
+            print(format_result(name, f"{concurrency}+{args.slow_clients} lentos", result))
+    finally:
+        stop_server(process)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000,
+                        help="Tamanho do catálogo sintético (com --data-dir, o maior id usado nas requisições)")
+    parser.add_argument('--requests', type=int, default=5000, help="Requisições por nível de concorrência")
+    parser.add_argument('--concurrency', type=int, action='append', help="Clientes simultâneos (padrão: 32 e 256)")
+    parser.add_argument('--workers', type=int, default=2, help="Workers do gunicorn em ambos os modos")
+    parser.add_argument('--slow-clients', type=int, default=4, help="Clientes lentos na última rodada (0 pula)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--data-dir', help="Pasta com books.csv/books.feather (padrão: gera um catálogo sintético)")
+    args = parser.parse_args()
+    args.concurrency = args.concurrency or [32, 256]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or write_catalogue(args.rows, tmp_dir)
+        print(f"{args.rows} livros, {args.workers} workers, {args.requests} requisições por nível\n")
+        print(f"{'modo':<18}{'clientes':>14}{'req/s':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'erros':>8}")
+        for name, app_args in SERVERS.items():
+            asyncio.run(bench_server(name, app_args, data_dir, args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_api_auth.py
+#
+# Requisições autenticadas por segundo em /api/v1/health (rota quase sem custo, então sobra o custo da
+# autenticação) com o hash de senha padrão do Werkzeug: Basic sem o cache de credenciais, Basic com o cache
+# (CredentialCache) e Bearer com token assinado obtido em /api/v1/auth/token.
+# Uso: python benchmarks/bench_api_auth.py [--requests 200] [--data-dir DIR]
+
+import argparse
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, LATENCY_HEADER, PROJECT_ROOT, format_latency, load_api, measure_latency # noqa: E402
+
+ROUTE = '/api/v1/health'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--uncached-requests', type=int, default=20,
+                        help="Requisições sem cache (cada uma custa um hash de senha inteiro)")
+    parser.add_argument('--data-dir', default=os.path.join(PROJECT_ROOT, 'data'))
+    args = parser.parse_args()
+
+    api = load_api(args.data_dir, fast_auth=False) # Mede justamente o hash padrão
+    client = api.app.test_client()
+
+    token = client.post('/api/v1/auth/token', headers=AUTH_HEADERS).get_json()['access_token']
+    bearer_headers = {'Authorization': f'Bearer {token}'}
+    if client.get(ROUTE, headers=bearer_headers).status_code != 200:
+        print("Token Bearer recusado")
+        sys.exit(1)
+
+    print(f"{ROUTE}; hash de senha: {api.USERS['admin'].split('$')[0]}\n")
+    print(LATENCY_HEADER)
+    ttl_seconds, api.CREDENTIAL_CACHE.ttl_seconds = api.CREDENTIAL_CACHE.ttl_seconds, 0
+    print(format_latency('Basic, sem cache', measure_latency(client, [ROUTE] * args.uncached_requests, warmup=1)))
+    api.CREDENTIAL_CACHE.ttl_seconds = ttl_seconds
+    print(format_latency('Basic, com cache', measure_latency(client, [ROUTE] * args.requests)))
+    print(format_latency('Bearer (token assinado)', measure_latency(client, [ROUTE] * args.requests, bearer_headers)))
+    print(f"\ncache de credenciais: {api.CREDENTIAL_CACHE.stats}")
+
+
+if __name__ == '__main__':
+    main()
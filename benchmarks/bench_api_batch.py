@@ -0,0 +1,83 @@
+# benchmarks/bench_api_batch.py
+#
+# /api/v1/books/batch (todos os ids numa requisição, resolvidos numa passada vetorizada) contra o que um cliente
+# fazia antes: uma chamada /api/v1/books/<id> por livro, pagando a cada uma autenticação, roteamento e JSON.
+# Mede o tempo total e os bytes transferidos para N ids (10% deles inexistentes), com o cache de respostas
+# desligado, e à parte só o lookup (snapshot.get_many x um get_by_id por id).
+# Uso: python benchmarks/bench_api_batch.py [--rows 100000] [--ids 10 --ids 100 --ids 1000 --ids 10000]
+#      [--backend pandas|sqlite] [--data-dir DIR]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, load_api # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+
+def single_calls(client, ids):
+    transferred = 0
+    found = 0
+    for book_id in ids:
+        response = client.get(f'/api/v1/books/{book_id}', headers=AUTH_HEADERS)
+        transferred += len(response.get_data())
+        found += response.status_code == 200
+    return found, transferred
+
+
+def batch_call(client, ids):
+    response = client.post('/api/v1/books/batch', json={'ids': ids}, headers=AUTH_HEADERS)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()['found'], len(response.get_data())
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--ids', type=int, action='append', help="Quantidades de ids (padrão: 10, 100, 1000, 10000)")
+    parser.add_argument('--backend', choices=['pandas', 'sqlite'], default='pandas')
+    parser.add_argument('--data-dir', help="Pasta com books.feather/books.sqlite (padrão: gera um catálogo sintético)")
+    args = parser.parse_args()
+    args.ids = args.ids or [10, 100, 1000, 10000]
+
+    os.environ['BOOKS_BACKEND'] = args.backend
+    os.environ['RESPONSE_CACHE_MB'] = '0' # Mede as consultas, não o cache de respostas
+    os.environ['BATCH_MAX_IDS'] = str(max(args.ids))
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or write_catalogue(args.rows, tmp_dir, ('feather', 'sqlite'))
+        api = load_api(data_dir, data_format='feather')
+        client = api.app.test_client()
+        snapshot = api.BOOKS_INDEX
+        batch_call(client, [1]) # Aquecimento
+
+        print(f"{args.rows} livros, backend {args.backend}, cache de respostas desligado\n")
+        print(f"{'ids':>7}{'N chamadas (ms)':>17}{'(KB)':>9}{'batch (ms)':>12}{'(KB)':>9}{'ganho':>8}"
+              f"{'get_by_id x N (ms)':>20}{'get_many (ms)':>15}")
+        for count in args.ids:
+            # 10% de ids inexistentes, para medir também o caminho do "não encontrado"
+            ids = [rng.randint(1, args.rows) if rng.random() < 0.9 else args.rows + rng.randint(1, 10**6)
+                   for _ in range(count)]
+            single_ms, (single_found, single_bytes) = timed(lambda: single_calls(client, ids))
+            batch_ms, (batch_found, batch_bytes) = timed(lambda: batch_call(client, ids))
+            assert single_found == batch_found, (single_found, batch_found)
+            lookup_ms, _ = timed(lambda: [snapshot.get_by_id(book_id) for book_id in ids])
+            many_ms, _ = timed(lambda: snapshot.get_many(ids))
+            print(f"{count:>7}{single_ms:>17.1f}{single_bytes / 1024:>9.0f}{batch_ms:>12.1f}{batch_bytes / 1024:>9.0f}"
+                  f"{single_ms / batch_ms:>7.0f}x{lookup_ms:>20.1f}{many_ms:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
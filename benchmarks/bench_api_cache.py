@@ -0,0 +1,63 @@
+# benchmarks/bench_api_cache.py
+#
+# Latência das rotas GET com o cache de respostas serializadas (response_cache.py) desligado, com acerto no
+# cache, com compressão (gzip/br guardados na entrada) e com revalidação via If-None-Match (304).
+# Uso: python benchmarks/bench_api_cache.py [--rows 100000] [--requests 300] [--data-dir DIR]
+
+import argparse
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, LATENCY_HEADER, format_latency, load_api, measure_latency # noqa: E402
+
+ROUTES = [
+    '/api/v1/categories',
+    '/api/v1/stats/overview',
+    '/api/v1/stats/categories',
+    '/api/v1/books/42',
+    '/api/v1/books/search?title=light&limit=50',
+    '/api/v1/books/top-rated?limit=100',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--data-dir', help="Pasta com books.csv/books.feather (padrão: gera um catálogo sintético)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir
+        if not data_dir:
+            from synthetic import write_catalogue
+            data_dir = write_catalogue(args.rows, tmp_dir, ('feather',))
+        api = load_api(data_dir)
+        client = api.app.test_client()
+        cache = api.RESPONSE_CACHE
+        compressed_headers = dict(AUTH_HEADERS, **{'Accept-Encoding': 'br, gzip'})
+
+        print(f"{len(api.BOOKS_DATA)} livros, {args.requests} requisições por medição\n")
+        print(LATENCY_HEADER)
+        for route in ROUTES:
+            urls = [route] * args.requests
+            print(route)
+            max_entry_bytes, cache.max_entry_bytes = cache.max_entry_bytes, 0 # Nada cabe: cache desligado
+            cache.clear()
+            print(format_latency('  sem cache', measure_latency(client, urls)))
+            cache.max_entry_bytes = max_entry_bytes
+            print(format_latency('  cache (identity)', measure_latency(client, urls)))
+            print(format_latency('  cache (br/gzip)', measure_latency(client, urls, compressed_headers)))
+            etag = client.get(route, headers=AUTH_HEADERS).headers['ETag']
+            revalidate_headers = dict(AUTH_HEADERS, **{'If-None-Match': etag})
+            print(format_latency('  If-None-Match (304)', measure_latency(client, urls, revalidate_headers)))
+
+        print(f"\ncache: {len(cache.entries)} entradas, {cache.total_bytes / 1024:.0f} KiB, {cache.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_api_compact.py
+#
+# Memória do catálogo em um worker com 1k, 100k e 1M livros sintéticos:
+#   inferido - o que a API mantinha antes: DataFrame do pd.read_csv (colunas object) e um dict por livro
+#   compacto - read_books_data do CSV (books_store.compact_books) e BookRecords, que monta os dicts sob demanda
+#   feather  - o mesmo a partir do books.feather mapeado em memória
+# Cada medição roda num processo novo; "RSS" é o aumento de RSS com a carga e "privada" o aumento da memória
+# privada (sem as páginas do arquivo mapeado, que os workers compartilham). "DataFrame" é memory_usage(deep=True).
+# Uso: python benchmarks/bench_api_compact.py [--sizes 1000 100000 1000000]
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import PROJECT_ROOT # noqa: E402
+from bench_api_memory import memory_usage_kb # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+MODES = ('inferido', 'compacto', 'feather')
+
+
+def run_worker(mode, data_dir):
+    """Processo filho: carrega o catálogo no modo pedido e imprime o aumento de memória em JSON."""
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'api'))
+    import pandas as pd
+    from books_data import read_books_csv, read_books_data
+    from books_store import BookRecords
+
+    gc.collect()
+    before = memory_usage_kb()
+    if mode == 'inferido':
+        books = read_books_csv(os.path.join(data_dir, 'books.csv'))
+        records = books.to_dict(orient='records')
+    else:
+        books = read_books_data(os.path.join(data_dir, 'books.csv' if mode == 'compacto' else 'books.feather'))
+        records = BookRecords(books)
+    gc.collect()
+    after = memory_usage_kb()
+    assert len(records) == len(books)
+    print(json.dumps({'rss': after['rss'] - before['rss'], 'private': after['private'] - before['private'],
+                      'frame': int(books.memory_usage(deep=True).sum()) // 1024,
+                      'dtypes': {name: str(dtype) for name, dtype in books.dtypes.items()},
+                      'pandas': pd.__version__}), flush=True)
+
+
+def measure(mode, data_dir):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', mode, data_dir],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads([line for line in output.splitlines() if line.startswith('{')][-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'DATA_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    print(f"{'livros':>9}  {'modo':<10}{'RSS (MB)':>10}{'privada (MB)':>14}{'DataFrame (MB)':>16}")
+    dtypes = None
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_catalogue(rows, tmp_dir)
+            for mode in MODES:
+                report = measure(mode, tmp_dir)
+                print(f"{rows:>9}  {mode:<10}{report['rss'] / 1024:>10.1f}{report['private'] / 1024:>14.1f}"
+                      f"{report['frame'] / 1024:>16.1f}")
+                if mode == 'compacto':
+                    dtypes = report['dtypes']
+    print("\nTipos no modo compacto: " + ', '.join(f"{name}={dtype}" for name, dtype in dtypes.items()))
+
+
+if __name__ == '__main__':
+    main()
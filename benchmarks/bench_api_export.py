@@ -0,0 +1,111 @@
+# benchmarks/bench_api_export.py
+#
+# Pico de memória alocada (tracemalloc) e tempo até o primeiro byte ao exportar o catálogo inteiro por
+# /api/v1/books: array JSON montado de uma vez (padrão), array JSON em streaming (stream=true) e NDJSON; e por
+# /api/v1/books/export em Arrow IPC, Parquet e NDJSON, com o tempo que o consumidor leva para carregar cada
+# resposta num DataFrame. Confere antes que todas as respostas têm o mesmo conteúdo.
+# Uso: python benchmarks/bench_api_export.py [--rows 100000] [--data-dir DIR]
+
+import argparse
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, load_api # noqa: E402
+
+MODES = {
+    'json (padrão)': '/api/v1/books',
+    'json stream=true': '/api/v1/books?stream=true',
+    'ndjson': '/api/v1/books?format=ndjson',
+    'export arrow': '/api/v1/books/export?format=arrow',
+    'export parquet': '/api/v1/books/export?format=parquet',
+    'export ndjson': '/api/v1/books/export?format=ndjson',
+}
+
+
+def load_frame(name, data):
+    """Como um job de treino leria a resposta: bytes -> DataFrame."""
+    if 'arrow' in name:
+        return pa.ipc.open_stream(data).read_all().to_pandas()
+    if 'parquet' in name:
+        return pq.read_table(io.BytesIO(data)).to_pandas()
+    if 'ndjson' in name:
+        return pd.read_json(io.BytesIO(data), lines=True)
+    return pd.DataFrame(json.loads(data))
+
+
+def as_records(frame):
+    return [{name: None if isinstance(value, float) and math.isnan(value) else value for name, value in row.items()}
+            for row in frame.astype(object).to_dict('records')]
+
+
+def export(client, url):
+    """Consome a resposta bloco a bloco, como um cliente HTTP; retorna (1º byte, total, bytes, pico)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(url, headers=AUTH_HEADERS, buffered=False)
+    first_byte, size = None, 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk if isinstance(chunk, bytes) else chunk.encode())
+    total = time.perf_counter() - started
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_byte, total, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--data-dir', help="Pasta com books.csv/books.feather (padrão: gera um catálogo sintético)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir
+        if not data_dir:
+            from synthetic import write_catalogue
+            data_dir = write_catalogue(args.rows, tmp_dir, ('feather',))
+        api = load_api(data_dir)
+        client = api.app.test_client()
+
+        expected = client.get(MODES['json (padrão)'], headers=AUTH_HEADERS).get_json()
+        streamed = client.get(MODES['json stream=true'], headers=AUTH_HEADERS).get_json()
+        lines = client.get(MODES['ndjson'], headers=AUTH_HEADERS).get_data(as_text=True).splitlines()
+        if streamed != expected or [json.loads(line) for line in lines] != expected:
+            print("Divergência entre os modos de exportação")
+            sys.exit(1)
+        bodies = {name: client.get(url, headers=AUTH_HEADERS).get_data() for name, url in MODES.items()}
+        reference = as_records(pd.DataFrame(expected))
+        for name, body in bodies.items():
+            if name.startswith('export') and as_records(load_frame(name, body)) != reference:
+                print(f"Divergência em {name}")
+                sys.exit(1)
+
+        print(f"{len(api.BOOKS_DATA)} livros\n")
+        print(f"{'modo':<20}{'1º byte (ms)':>14}{'total (s)':>11}{'MB enviados':>13}{'pico alocado (MB)':>19}"
+              f"{'leitura no cliente (s)':>24}")
+        for name, url in MODES.items():
+            first_byte, total, size, peak = export(client, url)
+            started = time.perf_counter()
+            load_frame(name, bodies[name])
+            parse = time.perf_counter() - started
+            print(f"{name:<20}{first_byte * 1000:>14.1f}{total:>11.2f}{size / 2**20:>13.1f}{peak / 2**20:>19.1f}"
+                  f"{parse:>24.2f}")
+
+
+if __name__ == '__main__':
+    main()
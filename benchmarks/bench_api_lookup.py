@@ -0,0 +1,64 @@
+# benchmarks/bench_api_lookup.py
+#
+# Latência de /api/v1/books/<id> com o índice por id (BooksIndex) contra a consulta antiga (filtro booleano
+# sobre o DataFrame inteiro + iloc[0].to_dict()), registrada numa rota temporária para passar pela mesma
+# pilha Flask. Usa um catálogo sintético (synthetic.py) ou uma pasta de dados existente.
+# Uso: python benchmarks/bench_api_lookup.py [--rows 100000] [--requests 2000] [--data-dir DIR]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, LATENCY_HEADER, format_latency, load_api, measure_latency # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--data-dir', help="Pasta com books.csv/books.feather (padrão: gera um catálogo sintético)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir
+        if not data_dir:
+            from synthetic import write_catalogue
+            data_dir = write_catalogue(args.rows, tmp_dir, ('feather',))
+        api = load_api(data_dir)
+
+        from flask import jsonify
+
+        def legacy_get_book_by_id(book_id):
+            book = api.BOOKS_DATA[api.BOOKS_DATA['id'] == book_id]
+            if not book.empty:
+                return jsonify(book.iloc[0].to_dict())
+            return jsonify({"message": "Livro não encontrado."}), 404
+
+        api.app.add_url_rule('/bench/legacy/books/<int:book_id>', view_func=api.auth.login_required(legacy_get_book_by_id))
+
+        rng = random.Random(0)
+        ids = [rng.choice(api.BOOKS_INDEX.records)['id'] for _ in range(args.requests)]
+        client = api.app.test_client()
+        # As duas rotas precisam devolver exatamente o mesmo livro
+        mismatches = sum(client.get(f'/api/v1/books/{book_id}', headers=AUTH_HEADERS).get_json()
+                         != client.get(f'/bench/legacy/books/{book_id}', headers=AUTH_HEADERS).get_json()
+                         for book_id in ids[:100] + [0, -1])
+        if mismatches:
+            print(f"Divergência entre índice e consulta antiga em {mismatches} ids")
+            sys.exit(1)
+
+        print(f"{len(api.BOOKS_DATA)} livros, {args.requests} requisições por rota\n")
+        print(LATENCY_HEADER)
+        legacy = measure_latency(client, [f'/bench/legacy/books/{book_id}' for book_id in ids])
+        print(format_latency('antes (filtro booleano)', legacy))
+        indexed = measure_latency(client, [f'/api/v1/books/{book_id}' for book_id in ids])
+        print(format_latency('depois (índice por id)', indexed))
+
+
+if __name__ == '__main__':
+    main()
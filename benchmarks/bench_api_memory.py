@@ -0,0 +1,103 @@
+# benchmarks/bench_api_memory.py
+#
+# Compara o carregamento da API a partir do books.csv e do books.feather (memory-map): tempo de import de
+# api/app.py (cold start de um worker) e memória por worker com N workers vivos ao mesmo tempo, como no
+# gunicorn. A memória vem de /proc/<pid>/smaps_rollup: RSS conta as páginas compartilhadas do arquivo
+# mapeado em todos os workers, PSS as divide entre eles e Private é o que cada worker paga sozinho.
+# Uso: python benchmarks/bench_api_memory.py [--rows 100000] [--workers 4] [--data-dir DIR]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+FORMATS = ('csv', 'feather')
+
+
+def memory_usage_kb():
+    """RSS, PSS e memória privada do processo atual, em kB (Linux)."""
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            fields = line.split()
+            if fields[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                usage[fields[0].rstrip(':')] = int(fields[1])
+    return {'rss': usage['Rss'], 'pss': usage['Pss'],
+            'private': usage['Private_Clean'] + usage['Private_Dirty']}
+
+
+def run_worker():
+    """Processo filho: importa a API, informa tempo e memória e espera o pai encerrar (stdin)."""
+    started = time.perf_counter()
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'api'))
+    import app # o import carrega os dados
+    load_seconds = time.perf_counter() - started
+    print(json.dumps({'load_seconds': load_seconds, 'rows': len(app.BOOKS_DATA)}), flush=True)
+    sys.stdin.readline()
+    # A memória é lida de novo só agora, com todos os workers vivos, para o PSS refletir o compartilhamento
+    print(json.dumps(memory_usage_kb()), flush=True)
+
+
+def measure(data_dir, data_format, workers):
+    env = dict(os.environ, BOOKS_DATA_DIR=data_dir, BOOKS_DATA_FORMAT=data_format)
+    processes = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker'], env=env, text=True,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for _ in range(workers)
+    ]
+    reports = []
+    for process in processes:
+        line = process.stdout.readline()
+        while line and not line.startswith('{'): # Ignora as mensagens de carregamento da API
+            line = process.stdout.readline()
+        reports.append(json.loads(line))
+    for process in processes:
+        process.stdin.write('\n')
+        process.stdin.flush()
+    for process, report in zip(processes, reports):
+        report['memory'] = json.loads(process.stdout.readline())
+        process.wait()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--workers', type=int, default=4, help="Workers vivos ao mesmo tempo por formato")
+    parser.add_argument('--data-dir', help="Pasta com books.csv e books.feather (padrão: gera um catálogo sintético)")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir
+        if not data_dir:
+            from synthetic import write_catalogue
+            data_dir = write_catalogue(args.rows, tmp_dir, FORMATS)
+        for data_format in FORMATS:
+            size_mb = os.path.getsize(os.path.join(data_dir, f'books.{data_format}')) / 2**20
+            print(f"books.{data_format}: {size_mb:.1f} MB")
+
+        print(f"\n{'formato':<10}{'linhas':>9}{'load (s)':>11}{'RSS/worker':>13}{'PSS/worker':>13}"
+              f"{'privada/worker':>16}{'PSS total':>12}")
+        for data_format in FORMATS:
+            reports = measure(data_dir, data_format, args.workers)
+            load = sum(report['load_seconds'] for report in reports) / len(reports)
+            rss, pss, private = (sum(report['memory'][key] for report in reports) / len(reports) / 1024
+                                 for key in ('rss', 'pss', 'private'))
+            print(f"{data_format:<10}{reports[0]['rows']:>9}{load:>11.2f}{rss:>10.1f} MB{pss:>10.1f} MB"
+                  f"{private:>13.1f} MB{pss * len(reports):>9.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_api_metrics.py
+#
+# Custo da instrumentação (metrics.py): latência por rota com METRICS_ENABLED=0 e =1, o tempo de gerar o
+# /api/v1/metrics e o custo de uma requisição sob o profiler por amostragem (header X-Profile: 1).
+# Cada configuração roda num processo novo, com o cache de respostas desligado para medir as rotas.
+# Uso: python benchmarks/bench_api_metrics.py [--rows 100000] [--requests 500] [--data-dir DIR]
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, LATENCY_HEADER, format_latency, load_api, measure_latency # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+CONFIGS = {
+    # nome: (METRICS_ENABLED, PROFILER_ENABLED)
+    'sem métricas': ('0', '0'),
+    'com métricas': ('1', '0'),
+    'com métricas + profiler': ('1', '1'),
+}
+
+
+def route_urls(rows, requests, seed=0):
+    rng = random.Random(seed)
+    return {
+        'categories': ['/api/v1/categories'] * requests,
+        'livro por id': [f'/api/v1/books/{rng.randint(1, rows)}' for _ in range(requests)],
+        'busca título, limit=20': [f'/api/v1/books/search?title={rng.choice(("light", "the", "love"))}&limit=20'
+                                   for _ in range(requests)],
+        'listagem, limit=100': [f'/api/v1/books?limit=100&offset={rng.randrange(0, rows, 100)}'
+                                for _ in range(requests)],
+    }
+
+
+def run_worker(config, data_dir, rows, requests):
+    """Processo filho: sobe a API na configuração pedida, mede as rotas e imprime JSON."""
+    metrics_enabled, profiler_enabled = CONFIGS[config]
+    os.environ.update(METRICS_ENABLED=metrics_enabled, PROFILER_ENABLED=profiler_enabled, RESPONSE_CACHE_MB='0',
+                      PROFILE_DIR=tempfile.mkdtemp())
+    api = load_api(data_dir, data_format='feather')
+    client = api.app.test_client()
+    latencies = {name: measure_latency(client, urls) for name, urls in route_urls(rows, requests).items()}
+    report = {'latencies': latencies}
+    if metrics_enabled == '1':
+        report['metrics endpoint'] = measure_latency(client, ['/api/v1/metrics'] * 50)
+    if profiler_enabled == '1':
+        # Algumas requisições perfiladas: o profiler só roda nelas, as demais seguem sem custo extra
+        report['busca perfilada'] = measure_latency(client, route_urls(rows, 20)['busca título, limit=20'],
+                                                    headers={**AUTH_HEADERS, 'X-Profile': '1'}, warmup=0)
+    print(json.dumps(report), flush=True)
+
+
+def measure(config, data_dir, rows, requests):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', config, '--data-dir', data_dir,
+                             '--rows', str(rows), '--requests', str(requests)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads([line for line in output.splitlines() if line.startswith('{')][-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--requests', type=int, default=500, help="Requisições por rota")
+    parser.add_argument('--data-dir', help="Pasta com books.feather (padrão: gera um catálogo sintético)")
+    parser.add_argument('--worker', choices=CONFIGS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.data_dir, args.rows, args.requests)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or write_catalogue(args.rows, tmp_dir)
+        reports = {config: measure(config, data_dir, args.rows, args.requests) for config in CONFIGS}
+
+    print(f"{args.rows} livros, {args.requests} requisições por rota, cache de respostas desligado")
+    for config, report in reports.items():
+        print(f"\n[{config}]\n{LATENCY_HEADER}")
+        for name, result in report['latencies'].items():
+            print(format_latency(name, result))
+        for name in ('metrics endpoint', 'busca perfilada'):
+            if name in report:
+                print(format_latency(name, report[name]))
+
+
+if __name__ == '__main__':
+    main()
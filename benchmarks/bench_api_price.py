@@ -0,0 +1,81 @@
+# benchmarks/bench_api_price.py
+#
+# Custo de /api/v1/books/price-range e /api/v1/books/top-rated com o índice de preço ordenado (BooksIndex) e
+# com os filtros antigos sobre o DataFrame, para catálogos sintéticos de tamanhos crescentes. Mede só a
+# consulta e a montagem dos dicts (sem o jsonify, que cresce com o tamanho da resposta em ambos os casos):
+# com o índice, uma página ordenada por preço custa o mesmo com 1k ou 1M livros.
+# Uso: python benchmarks/bench_api_price.py [--sizes 1000 100000 1000000] [--repeat 20]
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'api'))
+
+from books_index import BooksIndex # noqa: E402
+from synthetic import generate_books # noqa: E402
+
+PAGE_SIZE = 20
+
+
+def legacy_price_range(books, min_price, max_price):
+    return books[(books['price'] >= min_price) & (books['price'] <= max_price)].to_dict(orient='records')
+
+
+def legacy_top_rated(books):
+    top_rated = books[books['rating'] == books['rating'].max()].sort_values(by='price', ascending=True)
+    return top_rated.to_dict(orient='records')
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=20, help="Repetições por medição (vale a mediana)")
+    args = parser.parse_args()
+
+    print(f"{'livros':>9}  {'consulta':<36}{'antes (ms)':>12}{'depois (ms)':>13}")
+    for size in args.sizes:
+        books = pd.DataFrame(generate_books(size, details=False))
+        index = BooksIndex(books)
+        rng = random.Random(0)
+        windows = [(low, low + 0.5) for low in (round(rng.uniform(10, 59), 2) for _ in range(args.repeat))]
+        window_iter = itertools.cycle(windows) # As duas versões percorrem as mesmas faixas
+
+        cases = [
+            ("faixa de R$0,50 (ordem dos dados)",
+             lambda: legacy_price_range(books, *next(window_iter)),
+             lambda: index.records.take(index.price_range(*next(window_iter)))),
+            (f"faixa 10-60, sort=price, limit={PAGE_SIZE}",
+             lambda: sorted(legacy_price_range(books, 10, 60), key=lambda book: book['price'])[:PAGE_SIZE],
+             lambda: index.records.take(index.price_range(10, 60, 'price')[0:PAGE_SIZE])),
+            ("top-rated (completo)",
+             lambda: legacy_top_rated(books),
+             lambda: index.records.take(index.top_rated_positions)),
+            (f"top-rated, limit={PAGE_SIZE}",
+             lambda: legacy_top_rated(books)[:PAGE_SIZE],
+             lambda: index.records.take(index.top_rated_positions[0:PAGE_SIZE])),
+        ]
+        for name, legacy, indexed in cases:
+            legacy_ms = median_ms(legacy, args.repeat)
+            indexed_ms = median_ms(indexed, args.repeat)
+            print(f"{size:>9}  {name:<36}{legacy_ms:>12.3f}{indexed_ms:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
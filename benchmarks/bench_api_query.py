@@ -0,0 +1,110 @@
+# benchmarks/bench_api_query.py
+#
+# /api/v1/books/query (filtros combinados, planejador e top-k) contra o que um cliente precisava fazer antes:
+# buscar o resultado inteiro de cada rota de filtro único (/books/search, /books/price-range), fazer a interseção
+# dos ids, ordenar e cortar a página. Mede latência total e bytes transferidos por consulta, e à parte o top-k
+# (np.partition) contra o argsort completo com 100k e 1M chaves.
+# Uso: python benchmarks/bench_api_query.py [--rows 100000] [--repeat 20] [--backend pandas|sqlite] [--data-dir DIR]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, PROJECT_ROOT, load_api # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+# nome: (rotas de filtro único que o cliente combinaria, consulta equivalente em /books/query)
+SCENARIOS = {
+    'categoria + preço, 20 mais baratos': (
+        ['/api/v1/books/search?category=poetry', '/api/v1/books/price-range?min=20&max=40'],
+        '/api/v1/books/query?category=poetry&min_price=20&max_price=40&sort=price&limit=20'),
+    'título + preço + rating>=4': (
+        ['/api/v1/books/search?title=love', '/api/v1/books/price-range?min=10&max=30'],
+        '/api/v1/books/query?title=love&min_price=10&max_price=30&min_rating=4&limit=20'),
+    'título + categoria, 20 mais caros': (
+        ['/api/v1/books/search?title=the', '/api/v1/books/search?category=fiction'],
+        '/api/v1/books/query?title=the&category=fiction&sort=-price&limit=20'),
+    'faixa larga + disponível, top rating': (
+        ['/api/v1/books/price-range?min=10&max=60'],
+        '/api/v1/books/query?min_price=10&max_price=60&available=true&sort=-rating&limit=20'),
+}
+
+
+def client_side(client, urls, min_rating=None):
+    """O jeito antigo: resultado inteiro de cada rota, interseção dos ids e página montada no cliente."""
+    transferred = 0
+    books_by_id, ids = {}, None
+    for url in urls:
+        response = client.get(url, headers=AUTH_HEADERS)
+        transferred += len(response.get_data())
+        books = response.get_json() if response.status_code == 200 else []
+        books = books if isinstance(books, list) else []
+        books_by_id.update((book['id'], book) for book in books)
+        url_ids = {book['id'] for book in books}
+        ids = url_ids if ids is None else ids & url_ids
+    selected = [books_by_id[book_id] for book_id in sorted(ids)]
+    if min_rating is not None:
+        selected = [book for book in selected if book['rating'] >= min_rating]
+    return selected[:20], transferred
+
+
+def timed(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], result
+
+
+def bench_top_k(sizes, k=20, repeat=20):
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'api'))
+    from books_query import top_k_order
+    rng = np.random.default_rng(0)
+    print(f"\n{'chaves':>10}{'argsort (ms)':>15}{'top-k (ms)':>13}   (k={k}, empates frequentes como em preços)")
+    for size in sizes:
+        keys = np.round(rng.uniform(10, 60, size), 2)
+        full, expected = timed(lambda: np.argsort(keys, kind='stable')[:k], repeat)
+        partial, result = timed(lambda: top_k_order(keys, k), repeat)
+        assert np.array_equal(expected, result)
+        print(f"{size:>10}{full:>15.3f}{partial:>13.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--repeat', type=int, default=20, help="Repetições por cenário (mostra a mediana)")
+    parser.add_argument('--backend', choices=['pandas', 'sqlite'], default='pandas')
+    parser.add_argument('--data-dir', help="Pasta com books.feather/books.sqlite (padrão: gera um catálogo sintético)")
+    args = parser.parse_args()
+
+    os.environ['BOOKS_BACKEND'] = args.backend
+    os.environ['RESPONSE_CACHE_MB'] = '0' # Mede as consultas, não o cache de respostas
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or write_catalogue(args.rows, tmp_dir, ('feather', 'sqlite'))
+        api = load_api(data_dir, data_format='feather')
+        client = api.app.test_client()
+
+        print(f"{args.rows} livros, backend {args.backend}, mediana de {args.repeat} repetições\n")
+        print(f"{'cenário':<38}{'cliente (ms)':>13}{'cliente (KB)':>14}{'query (ms)':>12}{'query (KB)':>12}   plano")
+        for name, (urls, query_url) in SCENARIOS.items():
+            min_rating = 4 if 'min_rating=4' in query_url else None
+            old_ms, (_, old_bytes) = timed(lambda: client_side(client, urls, min_rating), max(3, args.repeat // 4))
+            new_ms, response = timed(lambda: client.get(query_url, headers=AUTH_HEADERS), args.repeat)
+            print(f"{name:<38}{old_ms:>13.1f}{old_bytes / 1024:>14.0f}{new_ms:>12.2f}"
+                  f"{len(response.get_data()) / 1024:>12.1f}   {response.headers.get('X-Query-Plan')}")
+
+    bench_top_k([100000, 1000000])
+
+
+if __name__ == '__main__':
+    main()
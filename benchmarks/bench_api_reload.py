@@ -0,0 +1,99 @@
+# benchmarks/bench_api_reload.py
+#
+# Recarga a quente: clientes concorrentes consultam a API enquanto outra thread alterna os dados entre dois
+# catálogos (tamanhos diferentes) via POST /api/v1/admin/reload?wait=true. Confere que nenhuma resposta mistura
+# snapshots (o total do header X-Total-Count bate com o corpo, inclusive no streaming, e só aparecem os
+# tamanhos dos dois catálogos) e compara a latência com e sem recargas acontecendo.
+# Uso: python benchmarks/bench_api_reload.py [--rows 20000] [--seconds 10] [--clients 4]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, percentile, load_api # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+ROUTES = ['/api/v1/books?stream=true&fields=id', '/api/v1/stats/overview', '/api/v1/books/search?title=the&limit=5']
+
+
+def check_response(route, response, sizes):
+    """Descrição do problema, ou None se a resposta for consistente com um único snapshot."""
+    if response.status_code != 200:
+        return f"HTTP {response.status_code}"
+    body = json.loads(response.get_data())
+    if route.startswith('/api/v1/books?'):
+        total = int(response.headers['X-Total-Count'])
+        if total not in sizes or len(body) != total:
+            return f"X-Total-Count={total}, corpo com {len(body)} livros"
+    elif route == '/api/v1/stats/overview':
+        if body['total_books'] not in sizes or sum(body['rating_distribution'].values()) != body['total_books']:
+            return f"overview inconsistente: {body}"
+    return None
+
+
+def run_clients(api, clients, seconds, sizes):
+    latencies, problems, stop_at = [], [], time.perf_counter() + seconds
+
+    def client_loop():
+        client = api.app.test_client()
+        while time.perf_counter() < stop_at:
+            for route in ROUTES:
+                started = time.perf_counter()
+                response = client.get(route, headers=AUTH_HEADERS)
+                latencies.append((time.perf_counter() - started) * 1000)
+                problem = check_response(route, response, sizes)
+                if problem:
+                    problems.append(f"{route}: {problem}")
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    return threads, latencies, problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000, help="Tamanho do 1º catálogo (o 2º tem o dobro)")
+    parser.add_argument('--seconds', type=float, default=10.0, help="Duração de cada fase")
+    parser.add_argument('--clients', type=int, default=4, help="Threads consultando a API")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dirs = [write_catalogue(args.rows, os.path.join(tmp_dir, 'a'), ('feather',)),
+                     write_catalogue(args.rows * 2, os.path.join(tmp_dir, 'b'), ('feather',), seed=1)]
+        sizes = {args.rows, args.rows * 2}
+        api = load_api(data_dirs[0])
+        admin = api.app.test_client()
+
+        print(f"{'fase':<14}{'requisições':>13}{'p50 (ms)':>10}{'p99 (ms)':>10}{'recargas':>10}{'recarga (s)':>13}{'problemas':>11}")
+        for phase in ('sem recarga', 'com recargas'):
+            threads, latencies, problems = run_clients(api, args.clients, args.seconds, sizes)
+            reload_times = []
+            while phase == 'com recargas' and any(thread.is_alive() for thread in threads):
+                os.environ['BOOKS_DATA_DIR'] = data_dirs[(len(reload_times) + 1) % 2]
+                started = time.perf_counter()
+                response = admin.post('/api/v1/admin/reload?wait=true', headers=AUTH_HEADERS)
+                reload_times.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    problems.append(f"reload: HTTP {response.status_code}")
+            for thread in threads:
+                thread.join()
+            latencies.sort()
+            average_reload = sum(reload_times) / len(reload_times) if reload_times else 0
+            print(f"{phase:<14}{len(latencies):>13}{percentile(latencies, 0.5):>10.2f}{percentile(latencies, 0.99):>10.2f}"
+                  f"{len(reload_times):>10}{average_reload:>13.2f}{len(problems):>11}")
+            for problem in problems[:5]:
+                print(f"  {problem}")
+            if problems:
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
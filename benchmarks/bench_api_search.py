@@ -0,0 +1,84 @@
+# benchmarks/bench_api_search.py
+#
+# Compara a busca de /api/v1/books/search com índice (BooksIndex.search) e a implementação antiga (cópia do
+# DataFrame + lower + str.contains a cada requisição) num catálogo sintético de títulos (1M por padrão).
+# Antes de medir confere que as duas devolvem exatamente os mesmos livros, na mesma ordem, para um conjunto
+# de consultas: palavras inteiras, pedaços de palavra, prefixos, consultas com espaço, com caracteres de
+# regex e combinadas com categoria. Sai com código 1 se houver divergência.
+# Uso: python benchmarks/bench_api_search.py [--rows 1000000] [--repeat 3]
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'api'))
+
+from books_index import BooksIndex # noqa: E402
+from synthetic import generate_books # noqa: E402
+
+QUERIES = [
+    ('light', ''), ('the', ''), ('a', ''), ('ing', ''), ('harry potter', ''), ('of the', ''), ('zzz', ''),
+    ('secret', 'mystery'), ('', 'poetry'), ('love', 'romance'), ('(the', ''), ('vol. 1', ''), ('ca.', ''),
+    ('#1)', ''), ("don't", ''), ('world: a', ''),
+]
+
+
+def legacy_search(books, title_query, category_query):
+    """A rota antes do índice, sem o jsonify."""
+    filtered_books = books.copy()
+    if title_query:
+        filtered_books = filtered_books[filtered_books['title'].str.lower().str.contains(title_query, na=False)]
+    if category_query:
+        filtered_books = filtered_books[filtered_books['category'].str.lower() == category_query]
+    return filtered_books.to_dict(orient='records')
+
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            result = function()
+        except re.error: # Regex inválida: as duas implementações devem falhar (a rota responde 500)
+            result = 're.error'
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições por consulta (vale a melhor)")
+    args = parser.parse_args()
+
+    books = pd.DataFrame(generate_books(args.rows, details=False))
+    started = time.perf_counter()
+    index = BooksIndex(books)
+    print(f"{len(books)} livros; índice construído em {time.perf_counter() - started:.1f} s "
+          f"({len(index.title_search.tokens)} palavras distintas)\n")
+
+    print(f"{'título':<16}{'categoria':<12}{'livros':>9}{'antes (ms)':>13}{'depois (ms)':>13}{'ganho':>9}")
+    mismatches = []
+    for title_query, category_query in QUERIES:
+        legacy_ms, expected = timed(lambda: legacy_search(books, title_query, category_query), args.repeat)
+        indexed_ms, found = timed(lambda: index.search(title_query, category_query), args.repeat)
+        if found != expected:
+            mismatches.append((title_query, category_query))
+        count = len(found) if isinstance(found, list) else found
+        print(f"{title_query!r:<16}{category_query!r:<12}{count:>9}{legacy_ms:>13.1f}{indexed_ms:>13.1f}"
+              f"{legacy_ms / indexed_ms:>8.1f}x")
+
+    if mismatches:
+        print(f"\nDivergências em relação à busca antiga: {mismatches}")
+        sys.exit(1)
+    print("\nResultados idênticos aos da busca antiga em todas as consultas.")
+
+
+if __name__ == '__main__':
+    main()
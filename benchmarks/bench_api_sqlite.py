@@ -0,0 +1,91 @@
+# benchmarks/bench_api_sqlite.py
+#
+# Backend pandas (catálogo inteiro em memória) contra o backend SQLite (BOOKS_BACKEND=sqlite, consultas
+# indexadas ao books.sqlite): RSS do worker depois da carga e depois das requisições, e latência por rota.
+# Cada backend roda num processo novo, com o cache de respostas desligado para medir as consultas.
+# Uso: python benchmarks/bench_api_sqlite.py [--rows 100000] [--requests 200] [--data-dir DIR]
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import LATENCY_HEADER, format_latency, load_api, measure_latency # noqa: E402
+from bench_api_memory import memory_usage_kb # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+BACKENDS = ('pandas', 'sqlite')
+FORMATS = ('csv', 'feather', 'sqlite')
+
+
+def route_urls(rows, requests, seed=0):
+    rng = random.Random(seed)
+    words = ('light', 'the', 'love', 'night', 'history', 'world')
+    return {
+        'livro por id': [f'/api/v1/books/{rng.randint(1, rows)}' for _ in range(requests)],
+        'busca título, limit=20': [f'/api/v1/books/search?title={rng.choice(words)}&limit=20'
+                                   for _ in range(requests)],
+        'busca categoria, limit=20': ['/api/v1/books/search?category=poetry&limit=20'] * requests,
+        'faixa de preço, limit=20': [f'/api/v1/books/price-range?min={low}&max={low + 1}&sort=price&limit=20'
+                                     for low in (rng.randint(10, 58) for _ in range(requests))],
+        'top-rated, limit=20': ['/api/v1/books/top-rated?limit=20'] * requests,
+        'listagem, página funda': [f'/api/v1/books?limit=50&offset={rng.randrange(0, rows, 50)}'
+                                   for _ in range(requests)],
+        'stats/categories': ['/api/v1/stats/categories'] * requests,
+    }
+
+
+def run_worker(backend, data_dir, rows, requests):
+    """Processo filho: sobe a API no backend pedido, mede memória e latências e imprime JSON."""
+    os.environ['BOOKS_BACKEND'] = backend
+    os.environ['RESPONSE_CACHE_MB'] = '0'
+    before = memory_usage_kb()['rss']
+    api = load_api(data_dir, data_format='feather')
+    loaded = memory_usage_kb()['rss']
+    client = api.app.test_client()
+    latencies = {name: measure_latency(client, urls) for name, urls in route_urls(rows, requests).items()}
+    print(json.dumps({'rss_loaded': loaded - before, 'rss_after': memory_usage_kb()['rss'] - before,
+                      'latencies': latencies}), flush=True)
+
+
+def measure(backend, data_dir, rows, requests):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', backend, '--data-dir', data_dir,
+                             '--rows', str(rows), '--requests', str(requests)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads([line for line in output.splitlines() if line.startswith('{')][-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--requests', type=int, default=200, help="Requisições por rota")
+    parser.add_argument('--data-dir', help="Pasta com books.feather e books.sqlite (padrão: gera um catálogo sintético)")
+    parser.add_argument('--worker', choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.data_dir, args.rows, args.requests)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or write_catalogue(args.rows, tmp_dir, FORMATS)
+        reports = {backend: measure(backend, data_dir, args.rows, args.requests) for backend in BACKENDS}
+
+    print(f"{args.rows} livros, {args.requests} requisições por rota (pandas lê o books.feather)\n")
+    for backend, report in reports.items():
+        print(f"{backend}: RSS +{report['rss_loaded'] / 1024:.1f} MB após a carga, "
+              f"+{report['rss_after'] / 1024:.1f} MB após as requisições")
+    for backend, report in reports.items():
+        print(f"\n[{backend}]\n{LATENCY_HEADER}")
+        for name, result in report['latencies'].items():
+            print(format_latency(name, result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_api_startup.py
+#
+# Tempo de inicialização de um worker da API (cold start), em processos novos, dividido em:
+#   python  - do spawn do processo até o script começar (interpretador e site-packages)
+#   import  - import de api/app.py (Flask, Flasgger, hashes de senha e, no modo eager, a carga dos dados)
+#   load    - do fim do import até o snapshot dos dados ficar pronto (só no modo background)
+#   ready   - do spawn até o worker poder responder às rotas de dados
+# e o custo da primeira geração do spec do Swagger (/apispec_1.json) contra a segunda, já em cache.
+# Uso: python benchmarks/bench_api_startup.py [--rows 100000] [--runs 3] [--data-dir DIR]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import PROJECT_ROOT # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+MODES = {
+    # nome: (BOOKS_LOAD_MODE, hashes de senha prontos nas variáveis de ambiente)
+    'eager': ('eager', False),
+    'eager + hashes': ('eager', True),
+    'background + hashes': ('background', True),
+}
+
+
+def run_worker(spawned_at):
+    """Processo filho: importa a API, espera os dados e imprime os tempos em JSON."""
+    started = time.time()
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'api'))
+    import app
+    imported = time.time()
+    while app.BOOKS_INDEX is None:
+        time.sleep(0.005)
+    ready = time.time()
+
+    client = app.app.test_client()
+    spec_times = []
+    for _ in range(2):
+        spec_started = time.perf_counter()
+        client.get('/apispec_1.json')
+        spec_times.append(time.perf_counter() - spec_started)
+    print(json.dumps({'python': started - spawned_at, 'import': imported - started, 'load': ready - imported,
+                      'ready': ready - spawned_at, 'rows': len(app.BOOKS_DATA),
+                      'spec_first': spec_times[0], 'spec_cached': spec_times[1]}), flush=True)
+
+
+def measure(data_dir, load_mode, with_hashes):
+    env = dict(os.environ, BOOKS_DATA_DIR=data_dir, BOOKS_LOAD_MODE=load_mode)
+    if with_hashes:
+        from werkzeug.security import generate_password_hash
+        env['ADMIN_PASSWORD_HASH'] = generate_password_hash('adminpass')
+        env['USER_PASSWORD_HASH'] = generate_password_hash('userpass')
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', repr(time.time())], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads([line for line in output.splitlines() if line.startswith('{')][-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--runs', type=int, default=3, help="Inicializações por modo (mostra a mediana)")
+    parser.add_argument('--data-dir', help="Pasta com books.csv/books.feather (padrão: gera um catálogo sintético)")
+    parser.add_argument('--worker', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or write_catalogue(args.rows, tmp_dir)
+        print(f"{'modo':<22}{'linhas':>8}{'python':>9}{'import':>9}{'load':>9}{'ready':>9}"
+              f"{'spec 1ª':>10}{'spec 2ª':>10}   (s)")
+        for name, (load_mode, with_hashes) in MODES.items():
+            reports = [measure(data_dir, load_mode, with_hashes) for _ in range(args.runs)]
+            median = {key: sorted(report[key] for report in reports)[len(reports) // 2]
+                      for key in ('python', 'import', 'load', 'ready', 'spec_first', 'spec_cached')}
+            print(f"{name:<22}{reports[0]['rows']:>8}{median['python']:>9.2f}{median['import']:>9.2f}"
+                  f"{median['load']:>9.2f}{median['ready']:>9.2f}{median['spec_first']:>10.3f}"
+                  f"{median['spec_cached']:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
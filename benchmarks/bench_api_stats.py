@@ -0,0 +1,89 @@
+# benchmarks/bench_api_stats.py
+#
+# Latência de /api/v1/categories, /api/v1/stats/overview e /api/v1/stats/categories com os agregados em cache
+# (BooksIndex.aggregates) contra os cálculos antigos por requisição, registrados em rotas temporárias. A rota
+# "/" (JSON constante, sem autenticação nem dados) serve de referência de "arquivo estático".
+# Uso: python benchmarks/bench_api_stats.py [--rows 100000] [--requests 300] [--data-dir DIR]
+
+import argparse
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import AUTH_HEADERS, LATENCY_HEADER, format_latency, load_api, measure_latency # noqa: E402
+
+
+def register_legacy_routes(api):
+    from flask import jsonify
+
+    books = api.BOOKS_DATA
+
+    def legacy_categories():
+        categories = books['category'].dropna().unique().tolist()
+        categories.sort()
+        return jsonify(categories)
+
+    def legacy_overview():
+        rating_counts = books['rating'].value_counts().to_dict()
+        return jsonify({
+            "total_books": len(books),
+            "average_price": round(books['price'].mean(), 2),
+            "rating_distribution": {f"{k}_star": rating_counts.get(k, 0) for k in range(1, 6)},
+        })
+
+    def legacy_category_stats():
+        category_stats = []
+        for category_name, group in books.dropna(subset=['category']).groupby('category'):
+            top_rated_book = group.sort_values(by=['rating', 'price'], ascending=[False, True]).iloc[0]['title']
+            category_stats.append({
+                "category_name": category_name,
+                "book_count": len(group),
+                "average_price": round(group['price'].mean(), 2),
+                "top_rated_book_in_category": top_rated_book,
+            })
+        category_stats.sort(key=lambda x: x['category_name'])
+        return jsonify(category_stats)
+
+    routes = {'/api/v1/categories': legacy_categories, '/api/v1/stats/overview': legacy_overview,
+              '/api/v1/stats/categories': legacy_category_stats}
+    for route, view in routes.items():
+        api.app.add_url_rule(f'/bench/legacy{route}', view_func=api.auth.login_required(view))
+    return list(routes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help="Tamanho do catálogo sintético")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--data-dir', help="Pasta com books.csv/books.feather (padrão: gera um catálogo sintético)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir
+        if not data_dir:
+            from synthetic import write_catalogue
+            data_dir = write_catalogue(args.rows, tmp_dir, ('feather',))
+        api = load_api(data_dir)
+        routes = register_legacy_routes(api)
+        client = api.app.test_client()
+
+        for route in routes:
+            cached = client.get(route, headers=AUTH_HEADERS).get_json()
+            if cached != client.get(f'/bench/legacy{route}', headers=AUTH_HEADERS).get_json():
+                print(f"Divergência entre agregado em cache e cálculo antigo em {route}")
+                sys.exit(1)
+
+        print(f"{len(api.BOOKS_DATA)} livros, {args.requests} requisições por rota\n")
+        print(LATENCY_HEADER)
+        print(format_latency('/ (referência)', measure_latency(client, ['/'] * args.requests)))
+        for route in routes:
+            name = route.replace('/api/v1', '')
+            print(format_latency(f"{name} antes", measure_latency(client, [f'/bench/legacy{route}'] * args.requests)))
+            print(format_latency(f"{name} depois", measure_latency(client, [route] * args.requests)))
+
+
+if __name__ == '__main__':
+    main()
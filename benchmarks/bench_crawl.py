@@ -0,0 +1,64 @@
+# benchmarks/bench_crawl.py
+#
+# Mede o scraping do catálogo (listagens + páginas de detalhes) contra o servidor local
+# (benchmarks/standin_server.py) e confere se o modo concorrente gera exatamente o mesmo CSV (mesmos ids e linhas) que o sequencial.
+# Uso: python benchmarks/bench_crawl.py --latency 0.05 [--skip-sequential]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'scripts'))
+sys.path.insert(0, BENCH_DIR)
+
+import scrape_books # noqa: E402
+from standin_server import DEFAULT_CSV, start_standin_server # noqa: E402
+
+
+def run_mode(base_url, mode, crawler_options, with_details, parse_pool='process'):
+    output_dir = tempfile.mkdtemp(prefix=f'bench_crawl_{mode}_')
+    started = time.perf_counter()
+    scrape_books.scrape_books_to_csv(base_url=base_url, output_dir=output_dir, mode=mode,
+                                     crawler_options=crawler_options, with_details=with_details,
+                                     parse_pool=parse_pool)
+    elapsed = time.perf_counter() - started
+    return elapsed, pd.read_csv(os.path.join(output_dir, 'books.csv'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--latency', type=float, default=0.05, help="Latência simulada por resposta")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--per-host', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=50.0)
+    parser.add_argument('--no-details', action='store_true', help="Só as páginas de listagem")
+    parser.add_argument('--parse-pool', choices=['process', 'thread'], default='process')
+    parser.add_argument('--skip-sequential', action='store_true', help="O modo sequencial dorme 1s por página")
+    args = parser.parse_args()
+
+    server, base_url = start_standin_server(args.csv, latency=args.latency, error_rate=args.error_rate)
+    crawler_options = {'max_workers': args.workers, 'per_host_concurrency': args.per_host,
+                       'per_host_rate': args.rate, 'backoff_base': 0.05}
+    try:
+        concurrent_time, concurrent_df = run_mode(base_url, 'concurrent', crawler_options,
+                                                   not args.no_details, args.parse_pool)
+        print(f"\nconcurrent: {concurrent_time:.2f}s, {len(concurrent_df)} livros")
+        if not args.skip_sequential:
+            sequential_time, sequential_df = run_mode(base_url, 'sequential', None, not args.no_details)
+            print(f"sequential: {sequential_time:.2f}s, {len(sequential_df)} livros")
+            pd.testing.assert_frame_equal(concurrent_df, sequential_df)
+            print(f"CSV idêntico nos dois modos; speedup {sequential_time / concurrent_time:.1f}x")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_parsers.py
+#
+# Mede páginas/s de cada backend de scripts/parsers.py nas páginas salvas em benchmarks/fixtures.
+# A paridade entre os backends (mesmo resultado que o bs4 original, campo a campo) é conferida por
+# tests/test_parsers.py sobre as mesmas páginas. As fixtures foram geradas com benchmarks/standin_server.py
+# e são lidas como o scraper as recebe (bytes sem charset decodificados como ISO-8859-1).
+# Uso: python benchmarks/bench_parsers.py [--seconds 2]
+
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'scripts'))
+
+from parsers import PARSER_BACKENDS # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+# URL de onde cada listagem foi servida, para resolver os links relativos
+CATALOGUE_FIXTURES = {
+    'index.html': 'https://books.toscrape.com/',
+    'catalogue_page-2.html': 'https://books.toscrape.com/catalogue/page-2.html',
+    'catalogue_page-50.html': 'https://books.toscrape.com/catalogue/page-50.html',
+}
+
+
+def load_fixtures():
+    catalogue, detail = {}, {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+            html = f.read().decode('latin-1')
+        if name in CATALOGUE_FIXTURES:
+            catalogue[name] = html
+        elif name.startswith('detail_'):
+            detail[name] = html
+    return catalogue, detail
+
+
+def pages_per_second(parse, pages, seconds):
+    parsed = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for args in pages:
+            parse(*args)
+        parsed += len(pages)
+    return parsed / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=2.0, help="Tempo de medição por backend e tipo de página")
+    args = parser.parse_args()
+
+    catalogue, detail = load_fixtures()
+    print(f"{len(PARSER_BACKENDS)} backends, {len(catalogue)} listagens, {len(detail)} detalhes\n")
+
+    catalogue_pages = [(html, CATALOGUE_FIXTURES[name]) for name, html in catalogue.items()]
+    detail_pages = [(html,) for html in detail.values()]
+    print(f"{'backend':<14}{'listagens/s':>14}{'detalhes/s':>14}")
+    for backend in PARSER_BACKENDS.values():
+        catalogue_rate = pages_per_second(backend.parse_catalogue, catalogue_pages, args.seconds)
+        detail_rate = pages_per_second(backend.parse_detail, detail_pages, args.seconds)
+        print(f"{backend.name:<14}{catalogue_rate:>14.1f}{detail_rate:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+# benchmarks/run_suite.py
+#
+# Suíte de benchmarks completa, offline, com resultado em JSON para comparar execuções (antes/depois de uma mudança):
+#   crawl - scraping concorrente (listagens + detalhes) contra o servidor local (standin_server.py): páginas/s e livros/s
+#   api   - para cada tamanho de catálogo sintético (synthetic.py, de 1k a 1M livros), sobe a API no gunicorn e
+#           dispara carga por HTTP em cada rota /api/v1/* (ROUTES): req/s, latência p50/p95/p99 vista pelo cliente,
+#           erros e RSS do gunicorn (master + workers) depois de cada rota
+# A recarga dos dados (/admin/reload) fica de fora: ela muda o que está sendo medido (ver bench_api_reload.py).
+# Uso: python benchmarks/run_suite.py [--rows 1000 --rows 100000] [--requests 1000] [--concurrency 16]
+#      [--workers 2] [--skip-crawl] [--output arquivo.json] [--compare anterior.json]
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from api_bench import PROJECT_ROOT # noqa: E402
+from bench_api_asgi import SEARCH_WORDS, SERVERS, fetch_token, run_load, start_server, stop_server, wait_ready # noqa: E402
+from synthetic import write_catalogue # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+BASIC_AUTH = 'Basic ' + base64.b64encode(b'admin:adminpass').decode()
+
+
+# Rotas medidas: nome -> (método, função (rng, linhas) -> caminho ou (caminho, corpo JSON), autenticação).
+# Caminhos variados evitam que tudo vire acerto no cache de respostas; rotas sem parâmetros (stats, categories)
+# medem justamente o cache.
+ROUTES = {
+    'health': ('GET', lambda rng, rows: '/api/v1/health', 'bearer'),
+    'auth/token (Basic)': ('POST', lambda rng, rows: '/api/v1/auth/token', 'basic'),
+    'books, página de 50': ('GET', lambda rng, rows: f'/api/v1/books?limit=50&offset={rng.randrange(0, rows, 50)}',
+                            'bearer'),
+    'books/<id>': ('GET', lambda rng, rows: f'/api/v1/books/{rng.randint(1, rows)}', 'bearer'),
+    'search título': ('GET', lambda rng, rows: f'/api/v1/books/search?title={rng.choice(SEARCH_WORDS)}'
+                                               f'&limit=20&offset={rng.randrange(0, 200, 20)}', 'bearer'),
+    'search prefixo + rank': ('GET', lambda rng, rows: f'/api/v1/books/search?title={rng.choice(SEARCH_WORDS)[:3]}'
+                                                       f'&match=prefix&rank=true&limit=20', 'bearer'),
+    'search categoria': ('GET', lambda rng, rows: f'/api/v1/books/search?category={rng.choice(("poetry", "travel", "fiction"))}'
+                                                  f'&limit=20&offset={rng.randrange(0, 100, 20)}', 'bearer'),
+    'categories': ('GET', lambda rng, rows: '/api/v1/categories', 'bearer'),
+    'stats/overview': ('GET', lambda rng, rows: '/api/v1/stats/overview', 'bearer'),
+    'stats/categories': ('GET', lambda rng, rows: '/api/v1/stats/categories', 'bearer'),
+    'top-rated': ('GET', lambda rng, rows: f'/api/v1/books/top-rated?limit=20&offset={rng.randrange(0, 1000, 20)}',
+                  'bearer'),
+    'price-range': ('GET', lambda rng, rows: (lambda low: f'/api/v1/books/price-range?min={low}&max={low + 2}'
+                                                          f'&sort=price&limit=20')(rng.randint(10, 57)), 'bearer'),
+    'query, filtros combinados': ('GET', lambda rng, rows: f'/api/v1/books/query?category={rng.choice(("poetry", "travel"))}'
+                                                           f'&min_price={rng.randint(10, 40)}&max_price=60'
+                                                           f'&min_rating={rng.randint(1, 5)}&sort=price&limit=20',
+                                  'bearer'),
+    'batch, 200 ids': ('POST', lambda rng, rows: ('/api/v1/books/batch',
+                                                  {'ids': [rng.randint(1, rows) for _ in range(200)]}), 'bearer'),
+    # Exportação filtrada (uma categoria numa faixa de preço): o catálogo inteiro a cada requisição mediria só a banda
+    'export ndjson, filtrado': ('GET', lambda rng, rows: f'/api/v1/books/export?format=ndjson'
+                                                         f'&category={rng.choice(("poetry", "travel", "fiction"))}'
+                                                         f'&min_price={rng.randint(10, 50)}&max_price=60', 'bearer'),
+    'export arrow, filtrado': ('GET', lambda rng, rows: f'/api/v1/books/export?format=arrow'
+                                                        f'&category={rng.choice(("poetry", "travel", "fiction"))}'
+                                                        f'&min_price={rng.randint(10, 50)}&max_price=60', 'bearer'),
+    'metrics': ('GET', lambda rng, rows: '/api/v1/metrics', 'bearer'),
+}
+
+
+def process_tree_rss_kb(pid):
+    """RSS somado do processo e dos filhos diretos (master e workers do gunicorn), em kB (Linux)."""
+    pids = [pid]
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # O nome do processo vem entre parênteses e pode ter espaços: o ppid é o 2º campo após o ')'
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        pids.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    total = 0
+    for child in pids:
+        try:
+            with open(f'/proc/{child}/status') as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            continue
+    return total
+
+
+def run_crawl(args):
+    """Scraping concorrente com detalhes contra o servidor local; retorna tempo e vazão."""
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+    from bench_crawl import run_mode
+    from standin_server import DEFAULT_CSV, start_standin_server
+
+    server, base_url = start_standin_server(DEFAULT_CSV, latency=args.crawl_latency)
+    crawler_options = {'max_workers': 16, 'per_host_concurrency': 8, 'per_host_rate': args.crawl_rate,
+                       'backoff_base': 0.05}
+    try:
+        seconds, books = run_mode(base_url, 'concurrent', crawler_options, with_details=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+    pages = math.ceil(len(books) / 20) + len(books) # Listagens (20 livros por página) + uma página de detalhes por livro
+    return {'seconds': seconds, 'books': len(books), 'pages': pages, 'pages_per_second': pages / seconds,
+            'books_per_second': len(books) / seconds, 'latency': args.crawl_latency}
+
+
+async def run_api(rows, data_dir, args):
+    """Sobe o gunicorn sobre o catálogo e mede cada rota de ROUTES; retorna o relatório do tamanho."""
+    base_url = f'http://127.0.0.1:{args.port}'
+    process = start_server(SERVERS['sync (gunicorn)'], data_dir, args.port, args.workers,
+                           extra_env={'BOOKS_DATA_FORMAT': 'feather'})
+    try:
+        started = time.perf_counter()
+        await wait_ready(base_url)
+        report = {'startup_seconds': time.perf_counter() - started,
+                  'rss_after_start_mb': process_tree_rss_kb(process.pid) / 1024, 'routes': {}}
+        token = await fetch_token(base_url)
+        for name, (method, make_path, auth) in ROUTES.items():
+            rng = random.Random(name)
+            headers = {'Authorization': BASIC_AUTH} if auth == 'basic' else None
+            # Aquecimento com outros caminhos, para a medição não começar com caches frios do processo
+            await run_load(base_url, token, [make_path(rng, rows) for _ in range(args.concurrency * 2)],
+                           args.concurrency, method, headers)
+            result = await run_load(base_url, token, [make_path(rng, rows) for _ in range(args.requests)],
+                                    args.concurrency, method, headers)
+            result['rss_mb'] = process_tree_rss_kb(process.pid) / 1024
+            report['routes'][name] = result
+            print(format_route(name, result), flush=True)
+        return report
+    finally:
+        stop_server(process)
+
+
+def format_route(name, result):
+    return (f"{name:<26}{result['rps']:>9.0f}{result['p50']:>9.2f}{result['p95']:>9.2f}{result['p99']:>9.2f}"
+            f"{result['errors']:>7}{result['rss_mb']:>10.1f}")
+
+
+ROUTE_HEADER = f"{'rota':<26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>7}{'RSS (MB)':>10}"
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def change(old, new):
+    return f"{(new - old) / old * 100:+.0f}%" if old else 'n/a'
+
+
+def compare(previous, current):
+    """Imprime a variação de vazão e p99 entre dois resultados da suíte."""
+    print(f"\nComparação com {previous['meta'].get('commit')} ({previous['meta'].get('started_at')})")
+    if previous.get('crawl') and current.get('crawl'):
+        old, new = previous['crawl']['pages_per_second'], current['crawl']['pages_per_second']
+        print(f"crawl: {old:.1f} -> {new:.1f} páginas/s ({change(old, new)})")
+    for rows, report in current['api'].items():
+        previous_routes = previous['api'].get(rows, {}).get('routes', {})
+        if not previous_routes:
+            continue
+        print(f"\n{rows} livros\n{'rota':<26}{'req/s antes':>12}{'depois':>9}{'':>7}{'p99 antes':>11}{'depois':>9}{'':>7}")
+        for name, result in report['routes'].items():
+            old = previous_routes.get(name)
+            if old is None:
+                print(f"{name:<26}{'(nova)':>12}{result['rps']:>9.0f}")
+                continue
+            print(f"{name:<26}{old['rps']:>12.0f}{result['rps']:>9.0f}{change(old['rps'], result['rps']):>7}"
+                  f"{old['p99']:>11.2f}{result['p99']:>9.2f}{change(old['p99'], result['p99']):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, action='append', help="Tamanhos do catálogo sintético (padrão: 1000 e 100000)")
+    parser.add_argument('--requests', type=int, default=1000, help="Requisições medidas por rota")
+    parser.add_argument('--concurrency', type=int, default=16, help="Clientes simultâneos")
+    parser.add_argument('--workers', type=int, default=2, help="Workers do gunicorn")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--skip-crawl', action='store_true', help="Pula o benchmark de scraping")
+    parser.add_argument('--crawl-latency', type=float, default=0.0, help="Latência simulada do servidor local (s)")
+    parser.add_argument('--crawl-rate', type=float, default=1000.0, help="Limite de requisições/s do crawler")
+    parser.add_argument('--output', help="Arquivo JSON do resultado (padrão: benchmarks/results/suite-<data>.json)")
+    parser.add_argument('--compare', help="Resultado JSON anterior para comparar")
+    args = parser.parse_args()
+    args.rows = args.rows or [1000, 100000]
+
+    results = {
+        'meta': {'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': git_commit(),
+                 'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+                 'settings': {name: value for name, value in vars(args).items() if name not in ('output', 'compare')}},
+        'crawl': None,
+        'api': {},
+    }
+    if not args.skip_crawl:
+        results['crawl'] = run_crawl(args)
+        crawl = results['crawl']
+        print(f"\ncrawl: {crawl['books']} livros, {crawl['pages']} páginas em {crawl['seconds']:.2f}s "
+              f"({crawl['pages_per_second']:.1f} páginas/s)")
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = write_catalogue(rows, tmp_dir)
+            print(f"\n{rows} livros, {args.workers} workers, {args.concurrency} clientes, "
+                  f"{args.requests} requisições por rota\n{ROUTE_HEADER}")
+            results['api'][str(rows)] = asyncio.run(run_api(rows, data_dir, args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultado gravado em {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+# benchmarks/standin_server.py
+#
+# Servidor HTTP local que imita books.toscrape.com a partir de um CSV no esquema de data/books.csv.
+# Gera o mesmo HTML do site (product_pod, paginador "Page X of N", páginas de detalhes) para testar e medir o scraper
+# sem depender da rede. As páginas são geradas a partir do CSV, e não reproduzidas de capturas: as páginas salvas em
+# benchmarks/fixtures (usadas pelo bench_parsers.py) são poucas para um crawl completo, com listagens e detalhes.
+# Uso: python benchmarks/standin_server.py --port 8000
+
+import argparse
+import csv
+import hashlib
+import html
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CSV = os.path.join(PROJECT_ROOT, 'data', 'books.csv')
+BOOKS_PER_PAGE = 20
+RATING_NAMES = {1: 'One', 2: 'Two', 3: 'Three', 4: 'Four', 5: 'Five'}
+SITE_PREFIX = 'https://books.toscrape.com/'
+# Categorias do site real, usadas quando o CSV ainda não tem a categoria ('N/A')
+CATEGORIES = [
+    'Travel', 'Mystery', 'Historical Fiction', 'Sequential Art', 'Classics', 'Philosophy', 'Romance',
+    'Womens Fiction', 'Fiction', 'Childrens', 'Religion', 'Nonfiction', 'Music', 'Default',
+    'Science Fiction', 'Sports and Games', 'Add a comment', 'Fantasy', 'New Adult', 'Young Adult',
+    'Science', 'Poetry', 'Paranormal', 'Art', 'Psychology', 'Autobiography', 'Parenting',
+    'Adult Fiction', 'Humor', 'Horror', 'History', 'Food and Drink', 'Christian Fiction',
+    'Business', 'Biography', 'Thriller', 'Contemporary', 'Spirituality', 'Academic',
+    'Self Help', 'Historical', 'Christian', 'Suspense', 'Short Stories', 'Novels', 'Health',
+    'Politics', 'Cultural', 'Erotica', 'Crime',
+]
+
+
+def load_catalogue(csv_path=DEFAULT_CSV):
+    """Lê o CSV e devolve os livros com os caminhos relativos ao site (sem o domínio)."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row['detail_path'] = _site_path(row['detail_url'])
+        row['image_path'] = _site_path(row['image_url'])
+        _fill_details(row)
+    return rows
+
+
+def _fill_details(row):
+    # Campos das páginas de detalhes: usa o CSV quando já existem, senão gera valores determinísticos
+    digest = hashlib.md5(row['detail_path'].encode('utf-8')).hexdigest()
+    if row.get('category') in (None, '', 'N/A'):
+        row['category'] = CATEGORIES[int(digest[:8], 16) % len(CATEGORIES)]
+    if not row.get('upc'):
+        row['upc'] = digest[:16]
+    if not row.get('description'):
+        row['description'] = f"{row['title']} is a book about {row['category'].lower()}. " * 8
+    if not row.get('stock_count') or row['stock_count'] == '0':
+        row['stock_count'] = str(int(digest[8:12], 16) % 22 + 1) if row['availability'] == 'True' else '0'
+
+
+def _site_path(url):
+    if url.startswith(SITE_PREFIX):
+        return url[len(SITE_PREFIX):]
+    return urlsplit(url).path.lstrip('/')
+
+
+def _relative(path, from_catalogue):
+    # Páginas em /catalogue/ usam links relativos a esse diretório, como no site original
+    if from_catalogue:
+        return path[len('catalogue/'):] if path.startswith('catalogue/') else '../' + path
+    return path
+
+
+def render_catalogue_page(books, page, total_pages, from_catalogue):
+    """Renderiza uma página de listagem com a marcação de books.toscrape.com."""
+    articles = []
+    for book in books:
+        detail_href = html.escape(_relative(book['detail_path'], from_catalogue))
+        image_src = html.escape(_relative(book['image_path'], from_catalogue))
+        title = html.escape(book['title'])
+        short_title = html.escape(book['title'] if len(book['title']) <= 40 else book['title'][:40] + '...')
+        availability = 'In stock' if book['availability'] == 'True' else 'Out of stock'
+        articles.append(f"""
+            <li class="col-xs-6 col-sm-4 col-md-3 col-lg-3">
+    <article class="product_pod">
+            <div class="image_container">
+                    <a href="{detail_href}"><img src="{image_src}" alt="{title}" class="thumbnail"></a>
+            </div>
+                <p class="star-rating {RATING_NAMES.get(int(book['rating']), 'Zero')}">
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                </p>
+            <h3><a href="{detail_href}" title="{title}">{short_title}</a></h3>
+            <div class="product_price">
+        <p class="price_color">Â£{float(book['price']):.2f}</p>
+<p class="instock availability">
+    <i class="icon-ok"></i>
+        {availability}
+</p>
+    <form>
+        <button type="submit" class="btn btn-primary btn-block" data-loading-text="Adding...">Add to basket</button>
+    </form>
+            </div>
+    </article>
+</li>""")
+
+    pager = []
+    if page > 1:
+        previous_href = f"page-{page - 1}.html" if from_catalogue else f"catalogue/page-{page - 1}.html"
+        pager.append(f'<li class="previous"><a href="{previous_href}">previous</a></li>')
+    pager.append(f'<li class="current">\n            Page {page} of {total_pages}\n            </li>')
+    if page < total_pages:
+        next_href = f"page-{page + 1}.html" if from_catalogue else f"catalogue/page-{page + 1}.html"
+        pager.append(f'<li class="next"><a href="{next_href}">next</a></li>')
+
+    return f"""<!DOCTYPE html>
+<html lang="en-us" class="no-js">
+    <head>
+        <title>All products | Books to Scrape - Sandbox</title>
+        <meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+    </head>
+    <body id="default" class="default">
+        <div class="container-fluid page">
+            <div class="page_inner">
+                <div class="page-header action"><h1>All products</h1></div>
+                <section>
+                    <ol class="row">{''.join(articles)}
+                    </ol>
+                    <div>
+                        <ul class="pager">
+                            {''.join(pager)}
+                        </ul>
+                    </div>
+                </section>
+            </div>
+        </div>
+    </body>
+</html>
+"""
+
+
+def render_detail_page(book):
+    """Renderiza a página de detalhes de um livro com a marcação de books.toscrape.com."""
+    title = html.escape(book['title'])
+    category = html.escape(book['category'])
+    category_slug = book['category'].lower().replace(' ', '-')
+    availability = (f"In stock ({book['stock_count']} available)" if book['availability'] == 'True'
+                    else 'Out of stock')
+    return f"""<!DOCTYPE html>
+<html lang="en-us" class="no-js">
+    <head>
+        <title>{title} | Books to Scrape - Sandbox</title>
+        <meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+    </head>
+    <body id="default" class="default">
+        <div class="container-fluid page">
+            <div class="page_inner">
+<ul class="breadcrumb">
+    <li>
+        <a href="../../index.html">Home</a>
+    </li>
+        <li>
+            <a href="../category/books_1/index.html">Books</a>
+        </li>
+        <li>
+            <a href="../category/books/{category_slug}_2/index.html">{category}</a>
+        </li>
+    <li class="active">{title}</li>
+</ul>
+<article class="product_page"><!-- Start of product page -->
+    <div class="row">
+        <div class="col-sm-6">
+            <div class="item active">
+                <img src="../../{html.escape(book['image_path'])}" alt="{title}" />
+            </div>
+        </div>
+        <div class="col-sm-6 product_main">
+    <h1>{title}</h1>
+<p class="price_color">Â£{float(book['price']):.2f}</p>
+<p class="instock availability">
+    <i class="icon-ok"></i>
+        {availability}
+</p>
+        </div>
+    </div>
+    <div id="product_description" class="sub-header">
+        <h2>Product Description</h2>
+    </div>
+    <p>{html.escape(book['description'])} ...more</p>
+    <div class="sub-header">
+        <h2>Product Information</h2>
+    </div>
+<table class="table table-striped">
+        <tr>
+            <th>UPC</th><td>{html.escape(book['upc'])}</td>
+        </tr>
+        <tr>
+            <th>Product Type</th><td>Books</td>
+        </tr>
+        <tr>
+            <th>Price (excl. tax)</th><td>Â£{float(book['price']):.2f}</td>
+        </tr>
+        <tr>
+            <th>Availability</th>
+            <td>{availability}</td>
+        </tr>
+        <tr>
+            <th>Number of reviews</th>
+            <td>0</td>
+        </tr>
+</table>
+</article>
+            </div>
+        </div>
+    </body>
+</html>
+"""
+
+
+class StandinCatalogue:
+    """Renderiza as páginas do site a partir dos livros carregados do CSV."""
+
+    def __init__(self, books):
+        self.books = books
+        self.total_pages = max(1, -(-len(books) // BOOKS_PER_PAGE))
+        self.books_by_path = {book['detail_path']: book for book in books}
+        self.last_modified = formatdate(time.time(), usegmt=True)
+
+    def render(self, path):
+        """Retorna o HTML para o caminho pedido, ou None se não existir."""
+        path = path.lstrip('/')
+        if path in ('', 'index.html'):
+            return self._page(1, from_catalogue=False)
+        if path.startswith('catalogue/page-') and path.endswith('.html'):
+            try:
+                page = int(path[len('catalogue/page-'):-len('.html')])
+            except ValueError:
+                return None
+            if 1 <= page <= self.total_pages:
+                return self._page(page, from_catalogue=True)
+            return None
+        book = self.books_by_path.get(path)
+        if book is not None:
+            return render_detail_page(book)
+        return None
+
+    def _page(self, page, from_catalogue):
+        start = (page - 1) * BOOKS_PER_PAGE
+        return render_catalogue_page(self.books[start:start + BOOKS_PER_PAGE], page,
+                                     self.total_pages, from_catalogue)
+
+
+def make_handler(catalogue, latency=0.0, error_rate=0.0):
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            if error_rate and random.random() < error_rate:
+                # Falha transitória para exercitar o retry com backoff do crawler
+                self._send(503, b'Service Unavailable')
+                return
+            body = catalogue.render(urlsplit(self.path).path)
+            if body is None:
+                self._send(404, b'Not Found')
+                return
+            # Sem charset no Content-Type, como o site real: o cliente decodifica como ISO-8859-1
+            body = body.encode('latin-1', errors='replace')
+            # Validadores para requisições condicionais, como o nginx do site real envia
+            validators = {'ETag': f'"{hashlib.md5(body).hexdigest()}"', 'Last-Modified': catalogue.last_modified}
+            if self.headers.get('If-None-Match') == validators['ETag']:
+                self._send(304, b'', validators)
+                return
+            self._send(200, body, validators)
+
+        def _send(self, status, body, extra_headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (extra_headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Silencia o log por requisição para não distorcer as medições
+
+    return StandinHandler
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass # Clientes que fecham conexões keep-alive ociosas não são erro aqui
+
+
+def start_standin_server(csv_path=DEFAULT_CSV, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0):
+    """Sobe o servidor em uma thread daemon. Retorna (server, base_url); encerre com server.shutdown() e server.server_close()."""
+    catalogue = StandinCatalogue(load_catalogue(csv_path))
+    server = StandinServer((host, port), make_handler(catalogue, latency, error_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Imitação local de books.toscrape.com")
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Atraso artificial por resposta (segundos)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fração de respostas 503")
+    args = parser.parse_args()
+
+    server, base_url = start_standin_server(args.csv, args.host, args.port, args.latency, args.error_rate)
+    print(f"Servindo {base_url} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
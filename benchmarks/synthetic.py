@@ -0,0 +1,87 @@
+# benchmarks/synthetic.py
+#
+# Gera catálogos sintéticos no esquema de data/books.csv (com as colunas da página de detalhes) para medir a
+# API com 1k, 100k ou 1M livros. Os títulos são montados com as palavras dos títulos reais, então buscas como
+# "light" ou "the" têm seletividade parecida com a do site. Os arquivos são gravados pelos mesmos sinks do
+# scraper (scripts/sinks.py), ou seja, com os mesmos tipos e a mesma publicação atômica.
+# Uso: python benchmarks/synthetic.py --rows 100000 --output-dir /tmp/books_100k [--format csv --format feather]
+
+import argparse
+import csv
+import hashlib
+import os
+import random
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'scripts'))
+sys.path.insert(0, BENCH_DIR)
+
+from sinks import make_sink, write_all # noqa: E402
+from standin_server import CATEGORIES, DEFAULT_CSV # noqa: E402
+
+SITE_PREFIX = 'https://books.toscrape.com/'
+DEFAULT_FORMATS = ('csv', 'feather')
+# Palavras que o pandas lê como nulo no CSV; ficam de fora para CSV e Feather terem o mesmo conteúdo
+PANDAS_NA_WORDS = {'None', 'NA', 'N/A', 'NaN', 'nan', 'null', 'NULL', 'n/a', '<NA>'}
+
+
+def title_vocabulary(csv_path=DEFAULT_CSV):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        words = {word for row in csv.DictReader(f) for word in row['title'].split()}
+    return sorted(words - PANDAS_NA_WORDS)
+
+
+def generate_books(rows, seed=0, csv_path=DEFAULT_CSV, details=True):
+    """Gera `rows` livros determinísticos (mesma seed, mesmo catálogo), com ids 1..rows.
+
+    Com `details=False` as colunas da página de detalhes ficam vazias, como no scraper com --no-details.
+    """
+    rng = random.Random(seed)
+    vocabulary = title_vocabulary(csv_path)
+    books = []
+    for book_id in range(1, rows + 1):
+        title = ' '.join(rng.choices(vocabulary, k=rng.randint(1, 8)))
+        digest = hashlib.md5(f"{seed}:{book_id}".encode()).hexdigest()
+        slug = '-'.join(title.lower().split()[:6])
+        in_stock = rng.random() < 0.9
+        book = {
+            'id': book_id,
+            'title': title,
+            'price': round(rng.uniform(10, 60), 2),
+            'rating': rng.randint(1, 5),
+            'availability': in_stock,
+            'category': rng.choice(CATEGORIES),
+            'image_url': f"{SITE_PREFIX}media/cache/{digest[:2]}/{digest[2:4]}/{digest}.jpg",
+            'detail_url': f"{SITE_PREFIX}catalogue/{slug}_{book_id}/index.html",
+            'upc': "", 'description': "", 'stock_count': 0,
+        }
+        if details:
+            book['upc'] = digest[:16]
+            book['description'] = ' '.join(rng.choices(vocabulary, k=rng.randint(20, 60)))
+            book['stock_count'] = rng.randint(1, 22) if in_stock else 0
+        books.append(book)
+    return books
+
+
+def write_catalogue(rows, output_dir, formats=DEFAULT_FORMATS, seed=0, batch_size=50000):
+    """Gera o catálogo e grava books.<formato> em `output_dir`; retorna o diretório."""
+    os.makedirs(output_dir, exist_ok=True)
+    write_all(make_sink(formats, output_dir), generate_books(rows, seed), batch_size)
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--output-dir', required=True)
+    parser.add_argument('--format', action='append', dest='formats', help="Formato(s) de saída (padrão: csv e feather)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    write_catalogue(args.rows, args.output_dir, args.formats or DEFAULT_FORMATS, args.seed)
+    print(f"{args.rows} livros gravados em '{args.output_dir}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# scripts/crawler.py
+
+import asyncio
+import inspect
+import random
+import time
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from requests.utils import get_encoding_from_headers
+
+# Status HTTP que valem uma nova tentativa (erros transitórios do servidor ou limite de taxa)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchResult(NamedTuple):
+    url: str
+    text: str
+    not_modified: bool # True quando o servidor respondeu 304 e o corpo veio do cache
+
+
+class CrawlError(Exception):
+    """Falha definitiva ao buscar uma URL (após esgotar as tentativas)."""
+
+    def __init__(self, url, reason):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+
+class HostLimiter:
+    """Limita concorrência e taxa de requisições por host."""
+
+    def __init__(self, max_concurrency=8, rate_per_second=25.0):
+        self.max_concurrency = max_concurrency
+        self.min_interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._semaphores = {}
+        self._next_slot = {}
+        self._locks = {}
+
+    def _state(self, host):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrency)
+            self._locks[host] = asyncio.Lock()
+            self._next_slot[host] = 0.0
+        return self._semaphores[host], self._locks[host]
+
+    async def _wait_turn(self, host, lock):
+        # Reserva o próximo horário livre do host e dorme até ele (intervalo mínimo entre requisições)
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot[host])
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def slot(self, host):
+        """Context manager assíncrono que ocupa uma vaga do host respeitando a taxa."""
+        semaphore, lock = self._state(host)
+        limiter = self
+
+        class _Slot:
+            async def __aenter__(self):
+                await semaphore.acquire()
+                try:
+                    await limiter._wait_turn(host, lock)
+                except BaseException:
+                    semaphore.release()
+                    raise
+
+            async def __aexit__(self, *exc):
+                semaphore.release()
+
+        return _Slot()
+
+
+class AsyncCrawler:
+    """Cliente HTTP assíncrono com pool de workers, limites por host e retry com backoff."""
+
+    def __init__(self, max_workers=16, per_host_concurrency=8, per_host_rate=25.0,
+                 max_retries=3, backoff_base=0.5, backoff_max=8.0, timeout=10, headers=None, cache=None):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.limiter = HostLimiter(per_host_concurrency, per_host_rate)
+        self.cache = cache # HttpCache opcional: habilita requisições condicionais (ETag/Last-Modified)
+        self.session = None
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'not_modified': 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_workers,
+                                         limit_per_host=self.limiter.max_concurrency)
+        self.session = aiohttp.ClientSession(connector=connector,
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                             headers=self.headers)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0) # Jitter para não sincronizar as novas tentativas
+
+    async def fetch(self, url):
+        """Busca uma URL e retorna o corpo decodificado como `requests` faria."""
+        return (await self.fetch_result(url)).text
+
+    async def fetch_result(self, url):
+        """Como `fetch`, mas indica se a resposta foi um 304 servido pelo cache."""
+        host = urlsplit(url).netloc
+        request_headers = self.cache.conditional_headers(url) if self.cache else {}
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self.limiter.slot(host):
+                    self.stats['requests'] += 1
+                    async with self.session.get(url, headers=request_headers) as response:
+                        if response.status == 304 and request_headers:
+                            self.stats['not_modified'] += 1
+                            return FetchResult(url, self.cache.get_body(url), True)
+                        if response.status in RETRY_STATUSES:
+                            last_error = f"HTTP {response.status}"
+                            retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+                        else:
+                            response.raise_for_status()
+                            body = await response.read()
+                            text = decode_body(body, response.headers)
+                            if self.cache:
+                                self.cache.store_response(url, text, response.headers)
+                            return FetchResult(url, text, False)
+            except aiohttp.ClientResponseError as e:
+                # Erros 4xx (exceto 429) não melhoram com nova tentativa
+                self.stats['failures'] += 1
+                raise CrawlError(url, f"HTTP {e.status}") from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = repr(e)
+
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        self.stats['failures'] += 1
+        raise CrawlError(url, last_error)
+
+    async def crawl(self, urls, handler, executor=None, cached=None):
+        """Busca `urls` com um pool de `max_workers` e aplica `handler(url, text)` a cada resposta.
+
+        Com `executor` (thread/process pool) o handler roda fora do event loop, então o parsing de
+        uma resposta se sobrepõe ao download das próximas. Se o handler devolver um awaitable, ele é
+        aguardado (permite encadear estágios). Se `cached(url)` for dado e a resposta vier de um
+        304, o valor que ele devolver (se não for None) substitui o handler, pulando o parsing.
+        Retorna uma lista na mesma ordem de `urls`; posições que falharam recebem a exceção.
+        """
+        loop = asyncio.get_running_loop()
+        results = [None] * len(urls)
+        queue = asyncio.Queue()
+        for position, url in enumerate(urls):
+            queue.put_nowait((position, url))
+
+        async def worker():
+            while True:
+                try:
+                    position, url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    fetched = await self.fetch_result(url)
+                    previous = cached(url) if cached and fetched.not_modified else None
+                    if previous is not None:
+                        result = previous
+                    elif executor is not None:
+                        result = await loop.run_in_executor(executor, handler, url, fetched.text)
+                    else:
+                        result = handler(url, fetched.text)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    results[position] = result
+                except Exception as e: # CrawlError ou erro do handler: registra e segue com a fila
+                    results[position] = e
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_workers, len(urls)))]
+        await asyncio.gather(*workers)
+        return results
+
+
+def decode_body(body, headers):
+    """Decodifica o corpo usando o charset do cabeçalho, com o mesmo fallback do `requests`."""
+    encoding = get_encoding_from_headers(headers) or 'utf-8'
+    return body.decode(encoding, errors='replace')
+
+
+def _parse_retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,91 @@
+# scripts/http_cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+
+
+class HttpCache:
+    """Cache de respostas em disco, indexado pela URL.
+
+    Guarda o corpo da última resposta 200, os validadores (ETag/Last-Modified) para requisições
+    condicionais e, opcionalmente, o resultado já interpretado da página, para que um 304 não
+    precise ser interpretado de novo.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return directory, os.path.join(directory, f"{key}.body"), os.path.join(directory, f"{key}.json")
+
+    def _read_meta(self, url):
+        _, _, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, url, meta):
+        directory, _, meta_path = self._paths(url)
+        _atomic_write(directory, meta_path, json.dumps(meta).encode('utf-8'))
+
+    def conditional_headers(self, url):
+        """Cabeçalhos If-None-Match/If-Modified-Since da última resposta, se houver corpo em cache."""
+        meta = self._read_meta(url)
+        if not meta or self.get_body(url) is None:
+            return {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def get_body(self, url):
+        _, body_path, _ = self._paths(url)
+        try:
+            with open(body_path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store_response(self, url, text, headers):
+        """Salva um 200 novo; descarta o resultado interpretado anterior, que ficou obsoleto."""
+        directory, body_path, _ = self._paths(url)
+        _atomic_write(directory, body_path, text.encode('utf-8'))
+        self._write_meta(url, {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'parsed': None,
+        })
+
+    def get_parsed(self, url):
+        meta = self._read_meta(url)
+        return meta.get('parsed') if meta else None
+
+    def set_parsed(self, url, parsed):
+        meta = self._read_meta(url)
+        if meta is None:
+            return
+        meta['parsed'] = parsed
+        self._write_meta(url, meta)
+
+
+def _atomic_write(directory, path, data):
+    # Arquivo temporário + rename: uma execução interrompida nunca deixa uma entrada corrompida
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
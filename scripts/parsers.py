@@ -0,0 +1,209 @@
+# scripts/parsers.py
+#
+# Backends de parsing do HTML de books.toscrape.com. Todos devolvem exatamente a mesma estrutura
+# (conferido por tests/test_parsers.py sobre as páginas salvas em benchmarks/fixtures):
+#   - bs4:          BeautifulSoup + html.parser, a implementação original
+#   - bs4-strainer: BeautifulSoup montando só os trechos usados (SoupStrainer)
+#   - lxml:         lxml.html com consultas XPath pré-compiladas (o mais rápido)
+
+import re
+from typing import Callable, NamedTuple
+from urllib.parse import urljoin # Importar urljoin para uma melhor combinação de URLs
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError: # lxml é opcional; sem ele só os backends bs4 ficam disponíveis
+    etree = lxml_html = None
+
+PAGE_COUNT_PATTERN = re.compile(r'of\s+(\d+)')
+STOCK_COUNT_PATTERN = re.compile(r'\((\d+) available\)')
+DESCRIPTION_MORE_SUFFIX = '...more'
+# Colunas vindas da página de detalhes; ficam vazias se o estágio de detalhes for desligado
+EMPTY_DETAILS = {'upc': "", 'description': "", 'stock_count': 0}
+
+def clean_price(price_text):
+    """Extrai o valor numérico do texto do preço."""
+    match = re.search(r'[\d\.]+', price_text)
+    if match:
+        return float(match.group())
+    return 0.0
+
+def get_star_rating(rating_class):
+    """Converte a classe CSS de rating para um valor numérico."""
+    rating_map = {'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5}
+    return rating_map.get(rating_class, 0)
+
+def make_book(page_url, title, detail_href, price_text, rating_class, availability_text, image_src):
+    """Monta o registro de um livro a partir dos valores brutos extraídos por qualquer backend."""
+    return {
+        'title': title.strip() if title is not None else "N/A",
+        'price': clean_price(price_text), # Usa a função auxiliar
+        'rating': get_star_rating(rating_class), # Usa a função auxiliar
+        'availability': 'In stock' in availability_text.strip(),
+        'category': "N/A", # Preenchida pelo estágio de detalhes
+        # Use page_url como base para urljoin para URLs de imagem e de detalhes
+        'image_url': urljoin(page_url, image_src or ""),
+        'detail_url': urljoin(page_url, detail_href or ""), # Adiciona a URL de detalhes
+        **EMPTY_DETAILS
+    }
+
+def make_details(breadcrumb, product_info, description):
+    """Monta os campos da página de detalhes a partir dos valores brutos de qualquer backend."""
+    # Breadcrumb: Home > Books > <Categoria> > <Título>
+    category = breadcrumb[2].strip() if len(breadcrumb) >= 3 else "N/A"
+    description = description.strip()
+    if description.endswith(DESCRIPTION_MORE_SUFFIX):
+        description = description[:-len(DESCRIPTION_MORE_SUFFIX)].rstrip()
+    stock_match = STOCK_COUNT_PATTERN.search(product_info.get('Availability', ''))
+    return {
+        'category': category,
+        'upc': product_info.get('UPC', ""),
+        'description': description,
+        'stock_count': int(stock_match.group(1)) if stock_match else 0,
+    }
+
+def _page_count(text):
+    # O paginador mostra "Page 1 of 50"; com o total dá para montar todas as URLs de uma vez
+    match = PAGE_COUNT_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+# --- BeautifulSoup ---
+
+CATALOGUE_STRAINER = SoupStrainer(class_=['product_pod', 'next', 'current'])
+DETAIL_STRAINER = SoupStrainer(class_=['breadcrumb', 'product_page'])
+
+def _parse_catalogue_soup(soup, page_url):
+    books_data = []
+    for book in soup.find_all('article', class_='product_pod'):
+        title_element = book.h3.a
+        image_element = book.find('img')
+        books_data.append(make_book(
+            page_url,
+            title_element.get('title') if title_element else None,
+            title_element.get('href') if title_element else None,
+            book.find('p', class_='price_color').text,
+            book.find('p', class_='star-rating')['class'][1],
+            book.find('p', class_='instock availability').text,
+            image_element.get('src') if image_element else None,
+        ))
+
+    next_page_url = None
+    next_button = soup.find('li', class_='next')
+    if next_button and next_button.a and 'href' in next_button.a.attrs:
+        next_page_url = urljoin(page_url, next_button.a['href'])
+
+    current = soup.find('li', class_='current')
+    total_pages = _page_count(current.text) if current else None
+
+    return books_data, next_page_url, total_pages
+
+def _parse_detail_soup(soup):
+    breadcrumb = [link.text for link in soup.select('ul.breadcrumb li a')]
+
+    product_info = {}
+    for row in soup.select('table.table-striped tr'):
+        if row.th and row.td:
+            product_info[row.th.text.strip()] = row.td.text.strip()
+
+    description = ""
+    description_header = soup.find('div', id='product_description')
+    if description_header:
+        description_element = description_header.find_next_sibling('p')
+        if description_element:
+            description = description_element.text
+
+    return make_details(breadcrumb, product_info, description)
+
+def parse_catalogue_bs4(html, page_url):
+    return _parse_catalogue_soup(BeautifulSoup(html, 'html.parser'), page_url)
+
+def parse_detail_bs4(html):
+    return _parse_detail_soup(BeautifulSoup(html, 'html.parser'))
+
+def parse_catalogue_bs4_strainer(html, page_url):
+    return _parse_catalogue_soup(BeautifulSoup(html, 'html.parser', parse_only=CATALOGUE_STRAINER), page_url)
+
+def parse_detail_bs4_strainer(html):
+    return _parse_detail_soup(BeautifulSoup(html, 'html.parser', parse_only=DETAIL_STRAINER))
+
+# --- lxml ---
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+if etree is not None:
+    XPATH_BOOKS = etree.XPath(f"//article[{_has_class('product_pod')}]")
+    XPATH_TITLE_LINK = etree.XPath("./h3/a")
+    XPATH_PRICE = etree.XPath(f"string(.//p[{_has_class('price_color')}])")
+    XPATH_RATING_CLASS = etree.XPath(f"string(.//p[{_has_class('star-rating')}]/@class)")
+    XPATH_AVAILABILITY = etree.XPath(f"string(.//p[{_has_class('instock')} and {_has_class('availability')}])")
+    XPATH_IMAGE_SRC = etree.XPath(".//img/@src")
+    XPATH_NEXT_HREF = etree.XPath(f"//li[{_has_class('next')}]/a/@href")
+    XPATH_CURRENT = etree.XPath(f"string(//li[{_has_class('current')}])")
+    XPATH_BREADCRUMB = etree.XPath(f"//ul[{_has_class('breadcrumb')}]/li/a")
+    XPATH_INFO_ROWS = etree.XPath(f"//table[{_has_class('table-striped')}]//tr")
+    XPATH_DESCRIPTION = etree.XPath("//div[@id='product_description']/following-sibling::p[1]")
+
+def parse_catalogue_lxml(html, page_url):
+    root = lxml_html.document_fromstring(html)
+    books_data = []
+    for book in XPATH_BOOKS(root):
+        title_links = XPATH_TITLE_LINK(book)
+        title_element = title_links[0] if title_links else None
+        rating_classes = XPATH_RATING_CLASS(book).split()
+        image_src = XPATH_IMAGE_SRC(book)
+        books_data.append(make_book(
+            page_url,
+            title_element.get('title') if title_element is not None else None,
+            title_element.get('href') if title_element is not None else None,
+            XPATH_PRICE(book),
+            rating_classes[1] if len(rating_classes) > 1 else "",
+            XPATH_AVAILABILITY(book),
+            image_src[0] if image_src else None,
+        ))
+
+    next_href = XPATH_NEXT_HREF(root)
+    next_page_url = urljoin(page_url, next_href[0]) if next_href else None
+    total_pages = _page_count(XPATH_CURRENT(root))
+
+    return books_data, next_page_url, total_pages
+
+def parse_detail_lxml(html):
+    root = lxml_html.document_fromstring(html)
+    breadcrumb = [link.text_content() for link in XPATH_BREADCRUMB(root)]
+
+    product_info = {}
+    for row in XPATH_INFO_ROWS(root):
+        th, td = row.find('.//th'), row.find('.//td')
+        if th is not None and td is not None:
+            product_info[th.text_content().strip()] = td.text_content().strip()
+
+    description_elements = XPATH_DESCRIPTION(root)
+    description = description_elements[0].text_content() if description_elements else ""
+
+    return make_details(breadcrumb, product_info, description)
+
+# --- Registro de backends ---
+
+class ParserBackend(NamedTuple):
+    name: str
+    parse_catalogue: Callable # (html, page_url) -> (livros, próxima URL, total de páginas)
+    parse_detail: Callable # (html) -> campos da página de detalhes
+
+PARSER_BACKENDS = {
+    'bs4': ParserBackend('bs4', parse_catalogue_bs4, parse_detail_bs4),
+    'bs4-strainer': ParserBackend('bs4-strainer', parse_catalogue_bs4_strainer, parse_detail_bs4_strainer),
+}
+if etree is not None:
+    PARSER_BACKENDS['lxml'] = ParserBackend('lxml', parse_catalogue_lxml, parse_detail_lxml)
+
+DEFAULT_PARSER = 'lxml' if 'lxml' in PARSER_BACKENDS else 'bs4'
+
+def get_parser(name=None):
+    """Retorna o backend pelo nome (ou o padrão); ValueError se não estiver disponível."""
+    name = name or DEFAULT_PARSER
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Parser '{name}' indisponível. Opções: {', '.join(PARSER_BACKENDS)}")
+    return PARSER_BACKENDS[name]
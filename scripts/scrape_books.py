@@ -1,112 +1,467 @@
 # scripts/scrape_books.py
 
+import argparse
+import asyncio
+import functools
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import re
 import os
-from urllib.parse import urljoin # Importar urljoin para uma melhor combinação de URLs
-
-def clean_price(price_text):
-    """Extrai o valor numérico do texto do preço."""
-    match = re.search(r'[\d\.]+', price_text)
-    if match:
-        return float(match.group())
-    return 0.0
-
-def get_star_rating(rating_class):
-    """Converte a classe CSS de rating para um valor numérico."""
-    rating_map = {'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5}
-    return rating_map.get(rating_class, 0)
-
-# Função para extrair categoria da página de detalhes (se necessário e implementado)
-# Por enquanto, vou manter o placeholder 'N/A' como no seu código original
-def scrape_category_from_detail_page(book_detail_url):
-    # Esta função é para uma melhoria futura ou se a categoria não estiver na página principal.
-    # Por simplicidade, mantemos 'N/A' como no seu código.
-    # No entanto, para atender completamente ao requisito, você precisaria implementá-la.
-    # Ex: return "Travel"
-    return "N/A" # Placeholder atual
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-def scrape_books_to_csv(base_url="https://books.toscrape.com/", output_dir="data"):
-    all_books_data = []
-    current_page_url = base_url
-    book_id_counter = 1 # Adiciona um contador de ID
+from crawler import AsyncCrawler, CrawlError
+from http_cache import HttpCache
+from parsers import DEFAULT_PARSER, PARSER_BACKENDS, clean_price, get_parser, get_star_rating # noqa: F401
+from sinks import BOOK_COLUMNS, SINK_TYPES, CrawlCheckpoint, OrderedBookWriter, make_sink, write_all
 
-    print("Iniciando scraping...")
-    # Garante que a pasta 'data' exista
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+PAGE_NUMBER_PATTERN = re.compile(r'(page-)\d+(\.html)')
+HTTP_CACHE_DIRNAME = '.http_cache' # Dentro de output_dir, usado pelo modo incremental
 
-    while current_page_url:
-        try:
-            print(f"Raspando página: {current_page_url}")
-            response = requests.get(current_page_url, timeout=10) # Adicionei timeout
-            response.raise_for_status()
+def parse_detail_page(html, parser=None):
+    """Extrai categoria, UPC, descrição e estoque da página de detalhes de um livro."""
+    return get_parser(parser).parse_detail(html)
+
+def parse_catalogue_page(html, page_url, parser=None):
+    """Extrai os livros de uma página do catálogo.
+
+    Retorna (livros, URL da próxima página ou None, total de páginas ou None).
+    """
+    return get_parser(parser).parse_catalogue(html, page_url)
+
+def scrape_book_details(book_detail_url, session=None, parser=None):
+    """Baixa e interpreta a página de detalhes de um único livro (caminho síncrono)."""
+    response = (session or requests).get(book_detail_url, timeout=10)
+    response.raise_for_status()
+    return parse_detail_page(response.text, parser)
+
+def scrape_category_from_detail_page(book_detail_url):
+    """Retorna a categoria do livro a partir da sua página de detalhes."""
+    return scrape_book_details(book_detail_url)['category']
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+def build_page_urls(second_page_url, total_pages):
+    """Gera as URLs das páginas 2..N a partir do link 'next' da primeira página.
 
-            books = soup.find_all('article', class_='product_pod')
+    Retorna None se o link não seguir o padrão 'page-N.html' (aí seguimos a cadeia de 'next').
+    """
+    if not second_page_url or not total_pages or not PAGE_NUMBER_PATTERN.search(second_page_url):
+        return None
+    return [PAGE_NUMBER_PATTERN.sub(rf'\g<1>{n}\g<2>', second_page_url) for n in range(2, total_pages + 1)]
 
-            for book in books:
-                title_element = book.h3.a
-                title = title_element['title'].strip() if title_element and 'title' in title_element.attrs else "N/A"
+def assign_ids(pages):
+    """Numera os livros na ordem das páginas, exatamente como o scraping sequencial."""
+    all_books_data = []
+    book_id_counter = 1 # Adiciona um contador de ID
+    for books in pages:
+        for book in books:
+            all_books_data.append({'id': book_id_counter, **book}) # Adiciona o ID único
+            book_id_counter += 1
+    return all_books_data
 
-                # URL de detalhes do livro para possível extração de categoria (se implementado)
-                book_detail_relative_url = title_element['href'] if title_element and 'href' in title_element.attrs else ""
-                # Use current_page_url como base para urljoin para links de detalhes
-                book_detail_full_url = urljoin(current_page_url, book_detail_relative_url)
+class DetailPagesError(Exception):
+    """Página de listagem com páginas de detalhes que falharam: ela não conta como raspada."""
 
+    def __init__(self, failures, total):
+        super().__init__(f"{failures} de {total} páginas de detalhes falharam")
+        self.failures = failures
 
-                price_text = book.find('p', class_='price_color').text
-                price = clean_price(price_text) # Usa a função auxiliar
 
-                rating_class = book.find('p', class_='star-rating')['class'][1]
-                rating = get_star_rating(rating_class) # Usa a função auxiliar
+def apply_details(books, details_results):
+    """Mescla os dados das páginas de detalhes nos livros.
 
-                availability_text = book.find('p', class_='instock availability').text.strip()
-                availability = 'In stock' in availability_text
+    Se algum detalhe falhou, levanta DetailPagesError: os livros ficariam com categoria, UPC,
+    descrição e estoque vazios, e a página não pode ser entregue como concluída.
+    """
+    failures = 0
+    for book, details in zip(books, details_results):
+        if isinstance(details, Exception):
+            print(f"Erro ao raspar detalhes de {book['detail_url']}: {details}")
+            failures += 1
+            continue
+        book.update(details)
+    if failures:
+        raise DetailPagesError(failures, len(books))
 
-                image_element = book.find('img')
-                image_url_relative = image_element['src'] if image_element and 'src' in image_element.attrs else ""
-                # Use current_page_url como base para urljoin para URLs de imagem
-                full_image_url = urljoin(current_page_url, image_url_relative)
+def scrape_sequentially(base_url, on_page, with_details=True, parser=None, start_page=1):
+    """Modo original: segue o link 'next' página a página, com pausa entre as requisições.
 
-                # A chamada para obter a categoria (mantendo 'N/A' por enquanto)
-                category = scrape_category_from_detail_page(book_detail_full_url) # Usaria esta função se a implementasse
+    Cada página concluída é entregue a `on_page(número, livros, próxima URL)`. Retorna se o
+    scraping foi completo (False se parou antes da última página, inclusive por falha num detalhe).
+    """
+    complete = True
+    current_page_url = base_url
+    page_number = start_page
+    session = requests.Session() # Reaproveita conexões entre as páginas de detalhes
 
-                all_books_data.append({
-                    'id': book_id_counter, # Adiciona o ID único
-                    'title': title,
-                    'price': price,
-                    'rating': rating,
-                    'availability': availability,
-                    'category': category,
-                    'image_url': full_image_url,
-                    'detail_url': book_detail_full_url # Adiciona a URL de detalhes
-                })
-                book_id_counter += 1
+    while current_page_url:
+        try:
+            print(f"Raspando página: {current_page_url}")
+            response = session.get(current_page_url, timeout=10) # Adicionei timeout
+            response.raise_for_status()
 
-            next_button = soup.find('li', class_='next')
-            if next_button and next_button.a and 'href' in next_button.a.attrs:
-                next_page_relative_url = next_button.a['href']
-                current_page_url = urljoin(current_page_url, next_page_relative_url)
+            books, next_page_url, _ = parse_catalogue_page(response.text, current_page_url, parser)
+            if with_details:
+                details_results = []
+                for book in books:
+                    try:
+                        details_results.append(scrape_book_details(book['detail_url'], session, parser))
+                    except requests.exceptions.RequestException as e:
+                        details_results.append(e)
+                apply_details(books, details_results)
+            on_page(page_number, books, next_page_url)
+
+            current_page_url = next_page_url
+            page_number += 1
+            if current_page_url:
                 time.sleep(1)
-            else:
-                current_page_url = None
 
+        except DetailPagesError as e:
+            print(f"Erro em {current_page_url}: {e}. Encerrando scraping nesta página.")
+            current_page_url = None # A página não foi entregue; --resume continua a partir dela
+            complete = False
         except requests.exceptions.RequestException as e:
             print(f"Erro de requisição: {e}. Encerrando scraping desta página.")
             current_page_url = None # Encerra se houver erro grave de requisição
+            complete = False
         except Exception as e:
             print(f"Um erro inesperado ocorreu: {e}. Encerrando scraping desta página.")
             current_page_url = None # Encerra se houver erro inesperado
+            complete = False
+
+    return complete
+
+# Handlers de nível de módulo para poderem ser enviados a um ProcessPoolExecutor
+def _parse_catalogue_response(parser, url, html):
+    return parse_catalogue_page(html, url, parser)[0]
+
+def _parse_detail_response(parser, url, html):
+    return parse_detail_page(html, parser)
+
+async def _crawl_catalogue(base_url, crawler, on_page, executor=None, with_details=True, revalidate_details=False,
+                           parser=None, pages_done=0):
+    """Baixa listagens e detalhes em pipeline, entregando cada página pronta a `on_page`.
+
+    Páginas até `pages_done` (já gravadas numa execução anterior) são puladas. Uma página com
+    algum detalhe que falhou (depois das novas tentativas do crawler) não é entregue e torna o
+    scraping incompleto. Retorna se o scraping foi completo.
+    """
+    loop = asyncio.get_running_loop()
+    parse_catalogue_response = functools.partial(_parse_catalogue_response, parser)
+    parse_detail_response = functools.partial(_parse_detail_response, parser)
+    cache = crawler.cache
+    cached = cache.get_parsed if cache else None
+
+    async def enrich(books):
+        # Estágio de detalhes: roda assim que a página de listagem é interpretada, em paralelo
+        # com o download das demais páginas (todos dividem o pool de conexões do crawler)
+        if not (with_details and books):
+            return
+        detail_urls = [book['detail_url'] for book in books]
+        results = await crawler.crawl(detail_urls, parse_detail_response, executor, cached)
+        if cache:
+            for url, result in zip(detail_urls, results):
+                if not isinstance(result, Exception):
+                    cache.set_parsed(url, result)
+        apply_details(books, results) # DetailPagesError se algum falhou
+
+    async def handle_page(url, html):
+        books = await loop.run_in_executor(executor, parse_catalogue_response, url, html)
+        await enrich(books)
+        if cache:
+            # Listagem + detalhes já mesclados: um 304 nesta página dispensa parsing e detalhes
+            cache.set_parsed(url, books)
+        return books
+
+    async def finish_page(url, page_number, books, following_url):
+        # Páginas fora do crawl de listagens (a primeira e a cadeia de 'next'); retorna se foi entregue
+        try:
+            await enrich(books)
+        except DetailPagesError as e:
+            print(f"Erro ao raspar {url}: {e}.")
+            return False
+        on_page(page_number, books, following_url)
+        return True
+
+    # A primeira página revela o total de páginas; as demais são buscadas em paralelo
+    print(f"Raspando página: {base_url}")
+    first = await crawler.fetch_result(base_url)
+    first_parsed = cached(base_url) if cached and first.not_modified and not revalidate_details else None
+    if first_parsed is None:
+        first_books, next_page_url, total_pages = parse_catalogue_page(first.text, base_url, parser)
+    else:
+        first_books, next_page_url, total_pages = (first_parsed['books'], first_parsed['next_page_url'],
+                                                   first_parsed['total_pages'])
+
+    async def finish_first_page():
+        if first_parsed is not None:
+            on_page(1, first_books, next_page_url)
+            return True
+        if not await finish_page(base_url, 1, first_books, next_page_url):
+            return False
+        if cache:
+            cache.set_parsed(base_url, {'books': first_books, 'next_page_url': next_page_url,
+                                        'total_pages': total_pages})
+        return True
+
+    first_page = asyncio.create_task(finish_first_page()) if pages_done < 1 else None
+    complete = True
+
+    page_urls = build_page_urls(next_page_url, total_pages)
+    if page_urls is not None:
+        page_numbers = {url: number for number, url in enumerate(page_urls, start=2) if number > pages_done}
+        print(f"{total_pages} páginas encontradas, buscando {len(page_numbers)} em paralelo...")
+
+        async def handle_numbered_page(url, html):
+            books = await handle_page(url, html)
+            on_page(page_numbers[url], books, following_page(url))
+            return books
+
+        def cached_page(url):
+            books = cached(url)
+            if books is not None:
+                on_page(page_numbers[url], books, following_page(url))
+            return books
+
+        def following_page(url):
+            # page_urls[i] é a página i + 2, então a seguinte à página N é page_urls[N - 1]
+            number = page_numbers[url]
+            return page_urls[number - 1] if number - 1 < len(page_urls) else None
+
+        results = await crawler.crawl(list(page_numbers), handle_numbered_page,
+                                      cached=None if revalidate_details or not cache else cached_page)
+        for url, result in zip(page_numbers, results):
+            if isinstance(result, Exception):
+                print(f"Erro ao raspar {url}: {result}.")
+                complete = False
+    else:
+        # Paginação desconhecida: segue a cadeia de 'next' (ainda com retry/limites do crawler)
+        page_tasks = []
+        chain_url, page_number = next_page_url, 2
+        while chain_url:
+            print(f"Raspando página: {chain_url}")
+            html = await crawler.fetch(chain_url)
+            books, following_url, _ = parse_catalogue_page(html, chain_url, parser)
+            if page_number > pages_done:
+                page_tasks.append(asyncio.create_task(finish_page(chain_url, page_number, books, following_url)))
+            chain_url, page_number = following_url, page_number + 1
+        if not all(await asyncio.gather(*page_tasks)):
+            complete = False
+
+    if first_page is not None and not await first_page:
+        complete = False
+
+    return complete
+
+def make_parse_executor(kind="process", workers=None):
+    """Pool onde o HTML é interpretado, fora do event loop que faz o download."""
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+def scrape_concurrently(base_url, on_page, crawler_options=None, with_details=True, parse_pool="process",
+                        parse_workers=None, cache_dir=None, revalidate_details=False, parser=None, pages_done=0):
+    """Modo concorrente: descobre o total de páginas e as busca em paralelo com o AsyncCrawler.
+
+    Com `cache_dir`, as requisições são condicionais e páginas sem mudança (304) não são
+    interpretadas de novo. Retorna se o scraping foi completo.
+    """
+    cache = HttpCache(cache_dir) if cache_dir else None
+
+    async def run(executor):
+        async with AsyncCrawler(**(crawler_options or {}), cache=cache) as crawler:
+            try:
+                return await _crawl_catalogue(base_url, crawler, on_page, executor, with_details,
+                                              revalidate_details, parser, pages_done)
+            except CrawlError as e:
+                print(f"Erro de requisição: {e}. Encerrando scraping.")
+                return False
+            finally:
+                print(f"Requisições: {crawler.stats['requests']}, novas tentativas: {crawler.stats['retries']}, "
+                      f"não modificadas (304): {crawler.stats['not_modified']}, falhas: {crawler.stats['failures']}")
+
+    with make_parse_executor(parse_pool, parse_workers) as executor:
+        return asyncio.run(run(executor))
+
+def _restore_types(existing_rows):
+    # Linhas lidas do CSV como texto voltam aos tipos do scraper antes de serem gravadas de novo
+    rows = existing_rows.reindex(columns=BOOK_COLUMNS)
+    return rows.assign(
+        id=rows['id'].astype(int),
+        price=pd.to_numeric(rows['price'], errors='coerce').fillna(0.0),
+        rating=pd.to_numeric(rows['rating'], errors='coerce').fillna(0).astype(int),
+        availability=rows['availability'] == 'True',
+        stock_count=pd.to_numeric(rows['stock_count'], errors='coerce').fillna(0).astype(int),
+    ).fillna("")
+
+def apply_incremental_changes(existing_df, crawled_books, complete):
+    """Aplica ao dataset existente só o que mudou, com ids estáveis por `detail_url`.
+
+    Livros já conhecidos mantêm o id; novos recebem ids após o maior existente; livros que
+    sumiram do site são removidos, mas só se o scraping foi completo (uma página que falhou
+    não pode ser confundida com livros removidos). Páginas com algum detalhe que falhou não
+    chegam em `crawled_books`: seus livros mantêm a linha existente e não contam como
+    alterados. Retorna (DataFrame, resumo).
+    """
+    crawled_df = pd.DataFrame(crawled_books)
+    if existing_df.empty:
+        return crawled_df, {'added': len(crawled_df), 'changed': 0, 'removed': 0}
+
+    existing_by_url = existing_df.set_index('detail_url', drop=False)
+    existing_ids = existing_by_url['id'].astype(int)
+    next_id = int(existing_ids.max()) + 1 if len(existing_ids) else 1
+
+    new_ids = []
+    for detail_url in crawled_df['detail_url']:
+        if detail_url in existing_ids.index:
+            new_ids.append(int(existing_ids[detail_url]))
+        else:
+            new_ids.append(next_id)
+            next_id += 1
+    crawled_df['id'] = new_ids
+
+    # Compara como texto, do mesmo jeito que os valores ficam gravados no CSV
+    columns = [column for column in crawled_df.columns if column != 'detail_url']
+    known = crawled_df['detail_url'].isin(existing_ids.index)
+    previous = existing_by_url.reindex(crawled_df.loc[known, 'detail_url'])
+    previous = previous.reindex(columns=columns).fillna("").astype(str).reset_index(drop=True)
+    current = crawled_df.loc[known, columns].astype(str).reset_index(drop=True)
+    changed = int((previous != current).any(axis=1).sum())
+
+    missing = _restore_types(existing_df[~existing_df['detail_url'].isin(crawled_df['detail_url'])])
+    if complete:
+        removed = len(missing)
+        merged = crawled_df
+    else:
+        removed = 0
+        print(f"Scraping incompleto: {len(missing)} livros não vistos foram mantidos.")
+        merged = pd.concat([crawled_df, missing], ignore_index=True)
+
+    summary = {'added': int((~known).sum()), 'changed': changed, 'removed': removed}
+    return merged, summary
+
+
+def _run_crawl(mode, base_url, on_page, crawler_options, with_details, parse_pool, parse_workers, cache_dir,
+               revalidate_details, parser, pages_done=0, resume_url=None):
+    if mode == "sequential":
+        if pages_done and not resume_url:
+            return True # A execução anterior já gravou a última página
+        return scrape_sequentially(resume_url or base_url, on_page, with_details, parser, start_page=pages_done + 1)
+    return scrape_concurrently(base_url, on_page, crawler_options, with_details, parse_pool, parse_workers,
+                               cache_dir, revalidate_details, parser, pages_done)
+
+def scrape_books_to_csv(base_url="https://books.toscrape.com/", output_dir="data",
+                        mode="concurrent", crawler_options=None, with_details=True,
+                        parse_pool="process", parse_workers=None, incremental=False,
+                        cache_dir=None, revalidate_details=False, parser=None,
+                        formats=("csv", "feather"), resume=False, batch_size=200):
+    print("Iniciando scraping...")
+    parser = get_parser(parser).name # Falha cedo se o backend pedido não estiver instalado
+    # Garante que a pasta 'data' exista
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    sink = make_sink(formats, output_dir)
+    if incremental and cache_dir is None:
+        cache_dir = os.path.join(output_dir, HTTP_CACHE_DIRNAME)
+    crawl_args = (crawler_options, with_details, parse_pool, parse_workers, cache_dir, revalidate_details, parser)
+
+    started = time.perf_counter()
+    if incremental:
+        # O diff precisa do catálogo inteiro; a gravação continua atômica via sinks
+        pages = {}
+        complete = _run_crawl(mode, base_url, lambda number, books, _: pages.__setitem__(number, books),
+                              *crawl_args)
+        all_books_data = assign_ids([pages[number] for number in sorted(pages)])
+        csv_path = os.path.join(output_dir, 'books.csv')
+        existing_df = (pd.read_csv(csv_path, dtype=str, keep_default_na=False) if os.path.exists(csv_path)
+                       else pd.DataFrame())
+        df, summary = apply_incremental_changes(existing_df, all_books_data, complete)
+        print(f"Incremental: {summary['added']} novos, {summary['changed']} alterados, "
+              f"{summary['removed']} removidos.")
+        if not existing_df.empty and not any(summary.values()):
+            print(f"Nada mudou; arquivos mantidos ({time.perf_counter() - started:.1f}s)")
+            return
+        write_all(sink, df.to_dict(orient='records'))
+        print(f"Scraping concluído! {len(df)} livros salvos em {output_dir} ({', '.join(formats)}) "
+              f"({time.perf_counter() - started:.1f}s)")
+        return
+
+    checkpoint = CrawlCheckpoint(output_dir)
+    run_config = {'base_url': base_url, 'formats': list(formats), 'with_details': with_details}
+    state = checkpoint.load() if resume else None
+    if resume and state is None:
+        print("Nenhum checkpoint encontrado; começando do zero.")
+    elif state is not None and ({key: state.get(key) for key in run_config} != run_config or not sink.can_resume()):
+        print("Checkpoint incompatível com esta execução; começando do zero.")
+        state = None
+    if state is not None:
+        print(f"Retomando após {state['pages_written']} páginas ({state['next_id'] - 1} livros já gravados).")
+
+    writer = OrderedBookWriter(sink, checkpoint, batch_size, run_config, state)
+    try:
+        complete = _run_crawl(mode, base_url, writer.add_page, *crawl_args,
+                              pages_done=writer.pages_written, resume_url=writer.next_page_url)
+    except BaseException:
+        writer.abort()
+        print(f"Scraping interrompido após {writer.pages_written} páginas gravadas; "
+              "execute novamente com --resume para continuar.")
+        raise
+
+    if writer.finish(complete):
+        print(f"Scraping concluído! {writer.books_written} livros salvos em {output_dir} ({', '.join(formats)}) "
+              f"({time.perf_counter() - started:.1f}s)")
+    else:
+        print(f"Scraping incompleto: {writer.pages_written} páginas gravadas no arquivo parcial; "
+              "execute novamente com --resume para buscar o restante.")
 
-    df = pd.DataFrame(all_books_data)
-    output_path = os.path.join(output_dir, 'books.csv')
-    df.to_csv(output_path, index=False, encoding='utf-8')
-    print(f"Scraping concluído! {len(all_books_data)} livros salvos em {output_path}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Raspa books.toscrape.com para data/books.csv (e outros formatos)")
+    parser.add_argument('--base-url', default="https://books.toscrape.com/")
+    parser.add_argument('--output-dir', default="data")
+    parser.add_argument('--mode', choices=['concurrent', 'sequential'], default='concurrent',
+                        help="concurrent: páginas em paralelo; sequential: segue o 'next' com pausa de 1s")
+    parser.add_argument('--workers', type=int, default=16, help="Tamanho do pool de workers")
+    parser.add_argument('--per-host', type=int, default=8, help="Requisições simultâneas por host")
+    parser.add_argument('--rate', type=float, default=25.0, help="Máximo de requisições por segundo por host")
+    parser.add_argument('--retries', type=int, default=3, help="Novas tentativas por URL (backoff exponencial)")
+    parser.add_argument('--no-details', action='store_true',
+                        help="Não visita as páginas de detalhes (categoria, UPC, descrição e estoque ficam vazios)")
+    parser.add_argument('--parse-pool', choices=['process', 'thread'], default='process',
+                        help="Pool usado para interpretar o HTML em paralelo ao download")
+    parser.add_argument('--parse-workers', type=int, default=None, help="Tamanho do pool de parsing")
+    parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS), default=DEFAULT_PARSER,
+                        help="Backend de parsing do HTML")
+    parser.add_argument('--format', dest='formats', action='append', choices=sorted(SINK_TYPES),
+                        help="Formato de saída; repita para gravar vários (padrão: csv e feather)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continua uma execução interrompida a partir do checkpoint em <output-dir>")
+    parser.add_argument('--batch-size', type=int, default=200, help="Linhas por lote gravado (e por checkpoint)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Requisições condicionais com cache em disco; aplica só as mudanças ao books.csv")
+    parser.add_argument('--cache-dir', default=None, help=f"Cache HTTP (padrão: <output-dir>/{HTTP_CACHE_DIRNAME})")
+    parser.add_argument('--revalidate-details', action='store_true',
+                        help="No modo incremental, revalida também os detalhes de listagens que não mudaram")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    scrape_books_to_csv()
\ No newline at end of file
+    args = parse_args()
+    scrape_books_to_csv(
+        base_url=args.base_url,
+        output_dir=args.output_dir,
+        mode=args.mode,
+        crawler_options={
+            'max_workers': args.workers,
+            'per_host_concurrency': args.per_host,
+            'per_host_rate': args.rate,
+            'max_retries': args.retries,
+        },
+        with_details=not args.no_details,
+        parse_pool=args.parse_pool,
+        parse_workers=args.parse_workers,
+        incremental=args.incremental,
+        cache_dir=args.cache_dir,
+        revalidate_details=args.revalidate_details,
+        parser=args.parser,
+        formats=args.formats or ['csv', 'feather'],
+        resume=args.resume,
+        batch_size=args.batch_size,
+    )
@@ -0,0 +1,431 @@
+# scripts/sinks.py
+#
+# Saída em streaming do scraper. As linhas são gravadas em lotes num arquivo parcial conforme as
+# páginas terminam; só no fim o parcial substitui o arquivo final (rename atômico). Um checkpoint
+# registra o que já foi gravado, para que uma execução interrompida possa continuar (--resume).
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+CHECKPOINT_FILENAME = '.crawl_checkpoint.json'
+MISSING_CATEGORY = "N/A" # Placeholder do scraper quando a categoria não foi obtida
+OPTIONAL_TEXT_COLUMNS = ('upc', 'description') # Ficam "" quando o estágio de detalhes é desligado
+BOOK_COLUMNS = ['id', 'title', 'price', 'rating', 'availability', 'category', 'image_url', 'detail_url',
+                'upc', 'description', 'stock_count']
+
+
+def atomic_write_text(path, text):
+    """Grava via arquivo temporário + rename, para nunca deixar um arquivo pela metade."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class BookSink:
+    """Destino das linhas do scraper.
+
+    Ciclo de vida: open(resume_state) -> write_batch(rows)... -> flush() -> commit() ou close().
+    `flush` torna os lotes duráveis e devolve o estado a guardar no checkpoint; `open` recebe
+    esse estado de volta ao retomar uma execução.
+    """
+
+    extension = None
+
+    def __init__(self, output_dir, basename='books'):
+        self.final_path = os.path.join(output_dir, f"{basename}.{self.extension}")
+        self.partial_path = self.final_path + '.partial'
+
+    def can_resume(self):
+        return os.path.exists(self.partial_path)
+
+    def open(self, resume_state=None):
+        raise NotImplementedError
+
+    def write_batch(self, rows):
+        raise NotImplementedError
+
+    def flush(self):
+        raise NotImplementedError
+
+    def commit(self):
+        """Finaliza o arquivo parcial e o move atomicamente para o caminho final."""
+        raise NotImplementedError
+
+    def close(self):
+        """Fecha sem publicar, mantendo o parcial para uma retomada."""
+        raise NotImplementedError
+
+
+class CsvSink(BookSink):
+    extension = 'csv'
+
+    def open(self, resume_state=None):
+        if resume_state and os.path.exists(self.partial_path):
+            # Descarta o que foi escrito depois do último checkpoint
+            os.truncate(self.partial_path, resume_state['offset'])
+            self.header_written = resume_state['header_written']
+            self.file = open(self.partial_path, 'a', encoding='utf-8', newline='')
+        else:
+            self.header_written = False
+            self.file = open(self.partial_path, 'w', encoding='utf-8', newline='')
+
+    def write_batch(self, rows):
+        if not rows:
+            return
+        # Mesma formatação do df.to_csv usado antes do streaming
+        pd.DataFrame(rows).to_csv(self.file, index=False, header=not self.header_written)
+        self.header_written = True
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'offset': self.file.tell(), 'header_written': self.header_written}
+
+    def commit(self):
+        if not self.header_written:
+            pd.DataFrame(columns=BOOK_COLUMNS).to_csv(self.file, index=False)
+        self.flush()
+        self.file.close()
+        os.replace(self.partial_path, self.final_path)
+
+    def close(self):
+        self.file.close()
+
+
+class _ArrowPartsSink(BookSink):
+    """Cada lote vira um arquivo Parquet de partes; o commit de cada formato junta as partes."""
+
+    def open(self, resume_state=None):
+        import pyarrow as pa # Dependência opcional, só necessária para os formatos colunares
+
+        self.schema = pa.schema([
+            ('id', pa.int64()), ('title', pa.string()), ('price', pa.float64()), ('rating', pa.int64()),
+            ('availability', pa.bool_()), ('category', pa.string()), ('image_url', pa.string()),
+            ('detail_url', pa.string()), ('upc', pa.string()), ('description', pa.string()),
+            ('stock_count', pa.int64()),
+        ])
+        self.parts_dir = self.final_path + '.parts'
+        self.parts = resume_state['parts'] if resume_state else 0
+        if not resume_state:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+        os.makedirs(self.parts_dir, exist_ok=True)
+        for name in os.listdir(self.parts_dir):
+            if not name.startswith('part-') or int(name[5:10]) >= self.parts:
+                os.remove(os.path.join(self.parts_dir, name))
+
+    def can_resume(self):
+        return os.path.isdir(self.final_path + '.parts')
+
+    def _part_path(self, index):
+        return os.path.join(self.parts_dir, f"part-{index:05d}.parquet")
+
+    def _read_parts(self, columns=None):
+        import pyarrow.parquet as pq
+
+        for index in range(self.parts):
+            yield pq.read_table(self._part_path(index), columns=columns)
+
+    def write_batch(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not rows:
+            return
+        table = pa.Table.from_pylist([{column: row.get(column) for column in BOOK_COLUMNS} for row in rows],
+                                     schema=self.schema)
+        tmp_path = self._part_path(self.parts) + '.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self._part_path(self.parts))
+        self.parts += 1
+
+    def flush(self):
+        return {'parts': self.parts} # Cada parte já é gravada de forma atômica
+
+    def commit(self):
+        self._merge_parts()
+        os.replace(self.partial_path, self.final_path)
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+
+    def _merge_parts(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ParquetSink(_ArrowPartsSink):
+    extension = 'parquet'
+
+    def _merge_parts(self):
+        import pyarrow.parquet as pq
+
+        # Junta as partes uma de cada vez: a memória fica limitada ao tamanho de um lote
+        with pq.ParquetWriter(self.partial_path, self.schema) as writer:
+            for table in self._read_parts():
+                writer.write_table(table)
+
+
+class FeatherSink(_ArrowPartsSink):
+    """Arquivo Arrow IPC (Feather v2) tipado e sem compressão, pensado para memory-map na API.
+
+    `category` vira dictionary (categórica), `rating`/`stock_count` inteiros pequenos e
+    `availability` bool. Valores-placeholder ("N/A" na categoria, "" em UPC/descrição) são
+    gravados como nulos, que é como quem lê o books.csv com pandas os enxerga.
+    """
+
+    extension = 'feather'
+
+    def _merge_parts(self):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        # 1ª passada: o dicionário de categorias precisa ser o mesmo em todos os record batches
+        categories = set()
+        for table in self._read_parts(columns=['category']):
+            categories.update(value for value in table['category'].unique().to_pylist() if value is not None)
+        categories.discard(MISSING_CATEGORY)
+        dictionary = pa.array(sorted(categories), pa.string())
+
+        schema = pa.schema([
+            ('id', pa.int64()), ('title', pa.string()), ('price', pa.float64()), ('rating', pa.int8()),
+            ('availability', pa.bool_()), ('category', pa.dictionary(pa.int32(), pa.string())),
+            ('image_url', pa.string()), ('detail_url', pa.string()), ('upc', pa.string()),
+            ('description', pa.string()), ('stock_count', pa.int32()),
+        ])
+        # 2ª passada: converte e grava parte a parte
+        with pa.OSFile(self.partial_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            for table in self._read_parts():
+                columns = {}
+                for field in schema:
+                    column = table[field.name].combine_chunks()
+                    if field.name == 'category':
+                        column = pa.DictionaryArray.from_arrays(pc.index_in(column, value_set=dictionary),
+                                                                dictionary)
+                    elif field.name in OPTIONAL_TEXT_COLUMNS:
+                        column = pc.if_else(pc.equal(column, ""), pa.scalar(None, pa.string()), column)
+                    else:
+                        column = column.cast(field.type)
+                    columns[field.name] = column
+                writer.write_table(pa.table(columns, schema=schema))
+
+
+class SqliteSink(BookSink):
+    """Banco SQLite servido pela API com BOOKS_BACKEND=sqlite (api/books_sqlite.py).
+
+    Ao publicar, os placeholders viram NULL (como no Feather) e são criados os índices das consultas da
+    API: id, preço, rating+preço, categoria (sem diferenciar maiúsculas) e uma tabela FTS5 de trigramas
+    sobre o título para a busca por substring.
+    """
+
+    extension = 'sqlite'
+
+    def open(self, resume_state=None):
+        if not resume_state and os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+        self.connection = sqlite3.connect(self.partial_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS books ("
+            "id INTEGER PRIMARY KEY, title TEXT, price REAL, rating INTEGER, availability INTEGER, "
+            "category TEXT, image_url TEXT, detail_url TEXT, upc TEXT, description TEXT, stock_count INTEGER)"
+        )
+        if resume_state:
+            # Remove lotes confirmados no banco mas posteriores ao último checkpoint
+            self.connection.execute("DELETE FROM books WHERE id > ?", (resume_state['max_id'],))
+        self.connection.commit()
+        self.max_id = resume_state['max_id'] if resume_state else 0
+
+    def write_batch(self, rows):
+        if not rows:
+            return
+        placeholders = ', '.join('?' for _ in BOOK_COLUMNS)
+        with self.connection: # Um lote = uma transação
+            self.connection.executemany(
+                f"INSERT INTO books ({', '.join(BOOK_COLUMNS)}) VALUES ({placeholders})",
+                [tuple(row.get(column) for column in BOOK_COLUMNS) for row in rows],
+            )
+        self.max_id = max(self.max_id, max(int(row['id']) for row in rows))
+
+    def flush(self):
+        return {'max_id': self.max_id}
+
+    def _create_indexes(self):
+        connection = self.connection
+        with connection:
+            connection.execute("UPDATE books SET category = NULL WHERE category = ?", (MISSING_CATEGORY,))
+            for column in OPTIONAL_TEXT_COLUMNS:
+                connection.execute(f"UPDATE books SET {column} = NULL WHERE {column} = ''")
+            # Índice só com os ids (a tabela em si guarda as linhas inteiras): paginação por OFFSET sem ler as linhas
+            connection.execute("CREATE INDEX IF NOT EXISTS books_id ON books (id)")
+            connection.execute("CREATE INDEX IF NOT EXISTS books_price ON books (price)")
+            connection.execute("CREATE INDEX IF NOT EXISTS books_rating_price ON books (rating, price)")
+            connection.execute("CREATE INDEX IF NOT EXISTS books_category ON books (category COLLATE NOCASE)")
+            try:
+                connection.execute("DROP TABLE IF EXISTS books_fts")
+                connection.execute("CREATE VIRTUAL TABLE books_fts USING fts5("
+                                   "title, content='books', content_rowid='id', tokenize='trigram')")
+                connection.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+            except sqlite3.OperationalError as e:
+                # SQLite sem FTS5/trigram (< 3.34): a API cai para a varredura do título
+                print(f"Aviso: índice de texto do título não criado ({e}).")
+        connection.execute("ANALYZE")
+
+    def commit(self):
+        self.connection.commit()
+        self._create_indexes()
+        self.connection.close()
+        os.replace(self.partial_path, self.final_path)
+
+    def close(self):
+        self.connection.close()
+
+
+SINK_TYPES = {'csv': CsvSink, 'feather': FeatherSink, 'parquet': ParquetSink, 'sqlite': SqliteSink}
+
+
+class MultiSink(BookSink):
+    """Envia o mesmo fluxo de linhas para vários formatos."""
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+    def can_resume(self):
+        return all(sink.can_resume() for sink in self.sinks.values())
+
+    def open(self, resume_state=None):
+        for name, sink in self.sinks.items():
+            sink.open(resume_state[name] if resume_state else None)
+
+    def write_batch(self, rows):
+        for sink in self.sinks.values():
+            sink.write_batch(rows)
+
+    def flush(self):
+        return {name: sink.flush() for name, sink in self.sinks.items()}
+
+    def commit(self):
+        for sink in self.sinks.values():
+            sink.commit()
+
+    def close(self):
+        for sink in self.sinks.values():
+            sink.close()
+
+
+def make_sink(formats, output_dir):
+    """Cria o sink para os formatos pedidos (ex.: ['csv', 'parquet'])."""
+    unknown = [name for name in formats if name not in SINK_TYPES]
+    if unknown:
+        raise ValueError(f"Formato(s) de saída desconhecido(s): {', '.join(unknown)}")
+    return MultiSink({name: SINK_TYPES[name](output_dir) for name in formats})
+
+
+def write_all(sink, rows, batch_size=10000):
+    """Grava um conjunto completo de linhas (ex.: resultado do modo incremental) e publica."""
+    sink.open()
+    try:
+        for start in range(0, len(rows), batch_size):
+            sink.write_batch(rows[start:start + batch_size])
+        sink.commit()
+    except BaseException:
+        sink.close()
+        raise
+
+
+class CrawlCheckpoint:
+    """Fronteira do scraping gravada em JSON: páginas já persistidas, próximo id e estado dos sinks."""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, CHECKPOINT_FILENAME)
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state):
+        atomic_write_text(self.path, json.dumps(state))
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class OrderedBookWriter:
+    """Recebe páginas fora de ordem e as grava em ordem, numerando os livros como o modo sequencial.
+
+    Páginas que chegam antes das anteriores ficam num buffer até a sequência ficar contígua; cada
+    lote gravado é seguido de um checkpoint com a fronteira, então só o buffer se perde numa queda.
+    """
+
+    def __init__(self, sink, checkpoint=None, batch_size=200, run_config=None, resume_state=None):
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.run_config = run_config or {}
+        self.pages_written = resume_state['pages_written'] if resume_state else 0
+        self.next_id = resume_state['next_id'] if resume_state else 1
+        self.next_page_url = resume_state.get('next_page_url') if resume_state else None
+        self.books_written = self.next_id - 1
+        self.pending_pages = {} # page_number -> (livros, URL da página seguinte)
+        self.batch = []
+        self.batch_pages = 0
+        self.sink.open(resume_state['sinks'] if resume_state else None)
+
+    def add_page(self, page_number, books, next_page_url=None):
+        """Recebe uma página concluída (o scraper não entrega páginas com detalhes que falharam).
+
+        Tudo o que é gravado entra no checkpoint e é pulado por --resume, então uma página
+        incompleta aqui nunca mais seria corrigida; ela fica de fora e a execução não publica.
+        """
+        self.pending_pages[page_number] = (books, next_page_url)
+        while self.pages_written + self.batch_pages + 1 in self.pending_pages:
+            page_books, page_next_url = self.pending_pages.pop(self.pages_written + self.batch_pages + 1)
+            for book in page_books:
+                self.batch.append({'id': self.next_id, **book}) # Adiciona o ID único
+                self.next_id += 1
+            self.batch_pages += 1
+            self.next_page_url = page_next_url
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if not self.batch_pages:
+            return
+        self.sink.write_batch(self.batch)
+        sinks_state = self.sink.flush()
+        self.pages_written += self.batch_pages
+        self.books_written += len(self.batch)
+        self.batch, self.batch_pages = [], 0
+        if self.checkpoint:
+            self.checkpoint.save({**self.run_config, 'pages_written': self.pages_written, 'next_id': self.next_id,
+                                  'next_page_url': self.next_page_url, 'sinks': sinks_state})
+
+    def finish(self, complete):
+        """Publica os arquivos se o scraping terminou; senão mantém parcial + checkpoint. Retorna se publicou."""
+        self.flush()
+        if complete and not self.pending_pages:
+            self.sink.commit()
+            if self.checkpoint:
+                self.checkpoint.clear()
+            return True
+        self.sink.close()
+        return False
+
+    def abort(self):
+        """Fecha sem publicar após uma interrupção; o checkpoint aponta para o último lote gravado."""
+        self.sink.close()
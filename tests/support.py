@@ -0,0 +1,64 @@
+# tests/support.py
+#
+# Base dos testes da API: grava catálogos em pastas temporárias com os mesmos sinks do scraper (scripts/sinks.py)
+# e carrega api/app.py sobre eles, no backend pandas (Feather) ou SQLite.
+# Uso: python -m pytest -q   (ou python -m unittest discover tests)
+
+import atexit
+import base64
+import os
+import shutil
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('api', 'scripts', 'benchmarks'):
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, folder))
+
+from sinks import make_sink, write_all # noqa: E402
+from synthetic import generate_books # noqa: E402
+
+def basic_auth_headers(username, password):
+    return {'Authorization': 'Basic ' + base64.b64encode(f'{username}:{password}'.encode()).decode()}
+
+
+AUTH_HEADERS = basic_auth_headers('admin', 'adminpass')
+BACKENDS = ('pandas', 'sqlite')
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def write_books(books, formats=('csv', 'feather', 'sqlite')):
+    """Grava `books` (dicts no esquema de data/books.csv) numa pasta temporária; retorna a pasta."""
+    data_dir = tempfile.mkdtemp(prefix='books-test-')
+    atexit.register(shutil.rmtree, data_dir, True)
+    write_all(make_sink(formats, data_dir), books)
+    return data_dir
+
+
+SYNTHETIC_DIR = write_books(generate_books(500))
+
+
+def load_app():
+    """Importa a API (uma vez por processo) sobre o catálogo sintético de 500 livros."""
+    os.environ.setdefault('BOOKS_DATA_DIR', SYNTHETIC_DIR)
+    os.environ.setdefault('BOOKS_DATA_FORMAT', 'feather')
+    # Profiler ligado (só roda em requisições com X-Profile), gravando numa pasta temporária
+    os.environ.setdefault('PROFILER_ENABLED', '1')
+    profile_dir = tempfile.mkdtemp(prefix='books-test-profiles-')
+    atexit.register(shutil.rmtree, profile_dir, True)
+    os.environ.setdefault('PROFILE_DIR', profile_dir)
+    import app
+    from werkzeug.security import generate_password_hash
+    # Uma iteração de PBKDF2: o hash padrão custa centenas de ms por requisição
+    app.USERS['admin'] = generate_password_hash('adminpass', method='pbkdf2:sha256:1')
+    app.USERS['user'] = generate_password_hash('userpass', method='pbkdf2:sha256:1')
+    return app
+
+
+def use_catalogue(app, backend, data_dir=SYNTHETIC_DIR):
+    """Troca o snapshot da API pelo catálogo de `data_dir` no `backend` ('pandas' ou 'sqlite')."""
+    os.environ['BOOKS_DATA_DIR'] = data_dir
+    app.BACKEND = backend
+    if not app.load_books_data():
+        raise RuntimeError(f"Falha ao carregar {data_dir} no backend {backend}")
+    return app.app.test_client()
@@ -0,0 +1,63 @@
+# tests/test_asgi.py
+#
+# Modo ASGI (api/asgi.py): as requisições passam pelo PooledWsgiToAsgi e rodam no pool WSGI_EXECUTOR, com as mesmas
+# respostas do app Flask.
+
+import asyncio
+import threading
+import unittest
+
+from support import AUTH_HEADERS, load_app, use_catalogue
+
+app = load_app()
+import asgi # noqa: E402 (depois do load_app, que aponta a API para o catálogo sintético)
+
+
+def call_asgi(path, query_string=b''):
+    """Envia um GET ao asgi_app; retorna (status, headers, corpo, mensagens de corpo recebidas)."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http', 'path': path, 'root_path': '',
+             'query_string': query_string, 'server': ('testserver', 80), 'client': ('127.0.0.1', 12345),
+             'headers': [(b'authorization', AUTH_HEADERS['Authorization'].encode('latin-1'))]}
+    asyncio.run(asgi.asgi_app(scope, receive, send))
+    start, bodies = messages[0], messages[1:]
+    assert start['type'] == 'http.response.start' and not bodies[-1].get('more_body')
+    return start['status'], dict(start['headers']), b''.join(body.get('body', b'') for body in bodies), len(bodies)
+
+
+class AsgiTest(unittest.TestCase):
+    def setUp(self):
+        self.client = use_catalogue(app, 'pandas')
+
+    def test_get_book_through_the_pool(self):
+        expected = self.client.get('/api/v1/books/1', headers=AUTH_HEADERS)
+        threads = set()
+        probe = lambda: threads.add(threading.current_thread().name)
+        app.app.before_request_funcs.setdefault(None, []).append(probe)
+        self.addCleanup(app.app.before_request_funcs[None].remove, probe)
+
+        status, headers, body, _ = call_asgi('/api/v1/books/1')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b'content-type'], b'application/json')
+        self.assertEqual(body, expected.get_data())
+        self.assertTrue(threads and all(name.startswith('asgi-wsgi') for name in threads), threads)
+
+    def test_streamed_export(self):
+        self.addCleanup(setattr, app, 'EXPORT_CHUNK_ROWS', app.EXPORT_CHUNK_ROWS)
+        app.EXPORT_CHUNK_ROWS = 100 # Cinco lotes, cada um numa mensagem
+        status, _, body, messages = call_asgi('/api/v1/books/export', b'format=arrow&fields=id,title')
+        expected = self.client.get('/api/v1/books/export?format=arrow&fields=id,title', headers=AUTH_HEADERS)
+        self.assertEqual(status, 200)
+        self.assertEqual(body, expected.get_data())
+        self.assertGreater(messages, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
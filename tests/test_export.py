@@ -0,0 +1,51 @@
+# tests/test_export.py
+#
+# /api/v1/books/export: o schema Arrow/Parquet é o mesmo nos dois backends e não depende do tamanho do catálogo.
+
+import io
+import unittest
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from support import AUTH_HEADERS, BACKENDS, load_app, use_catalogue, write_books
+from synthetic import generate_books
+
+app = load_app()
+
+
+def read_export(client, export_format, query=''):
+    response = client.get(f'/api/v1/books/export?format={export_format}{query}', headers=AUTH_HEADERS)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    if export_format == 'parquet':
+        return pq.read_table(io.BytesIO(response.get_data()))
+    return pa.ipc.open_stream(response.get_data()).read_all()
+
+
+class ExportSchemaTest(unittest.TestCase):
+    def test_pandas_and_sqlite_exports_have_identical_schemas(self):
+        for export_format in ('arrow', 'parquet'):
+            tables = {backend: read_export(use_catalogue(app, backend), export_format) for backend in BACKENDS}
+            with self.subTest(export_format=export_format):
+                self.assertEqual(tables['pandas'].schema.remove_metadata(), tables['sqlite'].schema.remove_metadata())
+                self.assertEqual(tables['pandas'].to_pylist(), tables['sqlite'].to_pylist())
+
+    def test_schema_does_not_depend_on_catalogue_size(self):
+        # Com 20 livros os tipos compactos em memória ficam menores (id int8, poucas categorias)
+        small_dir = write_books(generate_books(20), formats=('feather', 'sqlite'))
+        schemas = set()
+        for backend in BACKENDS:
+            for data_dir in (small_dir, None):
+                client = use_catalogue(app, backend, data_dir) if data_dir else use_catalogue(app, backend)
+                schemas.add(read_export(client, 'arrow', '&fields=id,price,rating,category,stock_count')
+                            .schema.remove_metadata())
+        self.assertEqual(len(schemas), 1)
+        schema = schemas.pop()
+        self.assertEqual(schema.field('id').type, pa.int64())
+        self.assertEqual(schema.field('stock_count').type, pa.int64())
+        self.assertEqual(schema.field('rating').type, pa.int8())
+        self.assertEqual(schema.field('category').type, pa.dictionary(pa.int32(), pa.string()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+# tests/test_health.py
+#
+# /api/v1/health como readiness probe: 200 só com livros carregados; 503 durante a carga e depois de uma carga
+# que falhou.
+
+import os
+import tempfile
+import unittest
+
+from support import AUTH_HEADERS, load_app, use_catalogue
+
+app = load_app()
+
+
+class HealthCheckTest(unittest.TestCase):
+    def tearDown(self):
+        use_catalogue(app, 'pandas') # Volta ao catálogo sintético para os demais testes
+
+    def get_health(self):
+        return app.app.test_client().get('/api/v1/health', headers=AUTH_HEADERS)
+
+    def test_ready_with_books_loaded(self):
+        use_catalogue(app, 'pandas')
+        response = self.get_health()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"status": "UP", "ready": True, "data_loaded": True, "num_books": 500})
+
+    def test_not_ready_while_loading(self):
+        app.BOOKS_INDEX = None
+        response = self.get_health()
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.get_json()['ready'])
+
+    def test_not_ready_after_a_failed_load(self):
+        app.BOOKS_INDEX = None
+        with tempfile.TemporaryDirectory() as empty_dir:
+            os.environ['BOOKS_DATA_DIR'] = empty_dir
+            self.assertFalse(app.load_books_data())
+        response = self.get_health()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json(), {"status": "UP", "ready": False, "data_loaded": False, "num_books": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# tests/test_metrics.py
+#
+# Profiler por amostragem (header X-Profile): só liga depois que um administrador se autentica.
+
+import unittest
+from unittest import mock
+
+from support import AUTH_HEADERS, basic_auth_headers, load_app, use_catalogue
+import metrics # noqa: E402 (api/ entra no sys.path pelo support)
+
+app = load_app()
+
+PROFILE_HEADERS = {'X-Profile': '1'}
+
+
+class ProfilerAuthTest(unittest.TestCase):
+    def setUp(self):
+        self.client = use_catalogue(app, 'pandas')
+
+    def get_profiled(self, headers):
+        with mock.patch.object(metrics.SamplingProfiler, 'start', autospec=True,
+                               side_effect=metrics.SamplingProfiler.start) as start:
+            response = self.client.get('/api/v1/books/search?title=the', headers={**PROFILE_HEADERS, **headers})
+        return response, start.call_count
+
+    def test_admin_request_is_profiled(self):
+        response, started = self.get_profiled(AUTH_HEADERS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(started, 1)
+        self.assertIn('X-Profile-File', response.headers)
+
+    def test_unauthenticated_and_non_admin_requests_do_not_start_the_profiler(self):
+        for name, headers in (('anonymous', {}), ('wrong password', basic_auth_headers('admin', 'wrong')),
+                              ('non-admin', basic_auth_headers('user', 'userpass'))):
+            with self.subTest(name):
+                response, started = self.get_profiled(headers)
+                self.assertEqual(started, 0)
+                self.assertNotIn('X-Profile-File', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# tests/test_parsers.py
+#
+# Paridade dos backends de scripts/parsers.py nas páginas salvas em benchmarks/fixtures: cada backend extrai, campo a
+# campo, os mesmos valores de make_book/make_details que o backend original (bs4).
+
+import itertools
+import unittest
+
+import support # noqa: F401 (coloca scripts/ e benchmarks/ no sys.path)
+from bench_parsers import CATALOGUE_FIXTURES, load_fixtures
+from parsers import PARSER_BACKENDS
+
+REFERENCE_BACKEND = 'bs4'
+BACKENDS = ('bs4', 'bs4-strainer', 'lxml')
+CATALOGUE, DETAIL = load_fixtures()
+
+
+class ParserParityTest(unittest.TestCase):
+    def get_backend(self, name):
+        if name not in PARSER_BACKENDS: # lxml é opcional
+            self.skipTest(f"backend {name} não instalado")
+        return PARSER_BACKENDS[name]
+
+    def test_fixtures_are_present(self):
+        self.assertEqual(set(CATALOGUE), set(CATALOGUE_FIXTURES))
+        self.assertTrue(DETAIL)
+
+    def test_catalogue_pages(self):
+        reference = PARSER_BACKENDS[REFERENCE_BACKEND]
+        for backend_name, (name, html) in itertools.product(BACKENDS, CATALOGUE.items()):
+            with self.subTest(backend=backend_name, fixture=name):
+                backend = self.get_backend(backend_name)
+                url = CATALOGUE_FIXTURES[name]
+                expected_books, expected_next, expected_total = reference.parse_catalogue(html, url)
+                books, next_page_url, total_pages = backend.parse_catalogue(html, url)
+                self.assertEqual(len(expected_books), 20, name)
+                self.assertEqual((next_page_url, total_pages), (expected_next, expected_total), name)
+                self.assertEqual(len(books), len(expected_books), name)
+                for position, (book, expected) in enumerate(zip(books, expected_books)):
+                    self.assertEqual(book.keys(), expected.keys(), f"{name} livro {position}")
+                    for field, value in expected.items():
+                        self.assertEqual(book[field], value, f"{name} livro {position}, campo {field}")
+
+    def test_detail_pages(self):
+        reference = PARSER_BACKENDS[REFERENCE_BACKEND]
+        for backend_name, (name, html) in itertools.product(BACKENDS, DETAIL.items()):
+            with self.subTest(backend=backend_name, fixture=name):
+                backend = self.get_backend(backend_name)
+                expected = reference.parse_detail(html)
+                details = backend.parse_detail(html)
+                self.assertNotEqual(expected['category'], "N/A", name)
+                self.assertTrue(expected['upc'], name)
+                self.assertEqual(details.keys(), expected.keys(), name)
+                for field, value in expected.items():
+                    self.assertEqual(details[field], value, f"{name}, campo {field}")
+
+
+if __name__ == '__main__':
+    unittest.main()
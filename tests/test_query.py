@@ -0,0 +1,67 @@
+# tests/test_query.py
+#
+# /api/v1/books/query (e /books/export, que usa os mesmos filtros) e /books/search nos dois backends.
+
+import re
+import unittest
+
+from support import AUTH_HEADERS, BACKENDS, load_app, use_catalogue
+
+app = load_app()
+
+
+class InvalidTitlePatternTest(unittest.TestCase):
+    def test_invalid_regex_title_is_a_400(self):
+        for backend in BACKENDS:
+            client = use_catalogue(app, backend)
+            for url in ('/api/v1/books/query?title=(', '/api/v1/books/export?title=(&format=ndjson'):
+                with self.subTest(backend=backend, url=url):
+                    response = client.get(url, headers=AUTH_HEADERS)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("'title'", response.get_json()['message'])
+
+    def test_invalid_regex_title_is_a_400_in_search(self):
+        for backend in BACKENDS:
+            client = use_catalogue(app, backend)
+            for query in ('title=(', 'title=(&rank=true', 'title=[a-&category=poetry'):
+                with self.subTest(backend=backend, query=query):
+                    response = client.get(f'/api/v1/books/search?{query}', headers=AUTH_HEADERS)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("'title'", response.get_json()['message'])
+
+    def test_valid_regex_title_matches_in_search(self):
+        pattern = re.compile('^[a-m].*(ed|es)[ ]')
+        for backend in BACKENDS:
+            client = use_catalogue(app, backend)
+            with self.subTest(backend=backend):
+                books = client.get('/api/v1/books?fields=id,title', headers=AUTH_HEADERS).get_json()
+                expected = [book for book in books if pattern.search(book['title'].lower())]
+                response = client.get('/api/v1/books/search', headers=AUTH_HEADERS,
+                                      query_string={'title': pattern.pattern, 'fields': 'id,title'})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(expected)
+                self.assertEqual(response.get_json(), expected)
+
+    def test_valid_regex_title_matches_on_both_backends(self):
+        pattern = re.compile('^[a-m].*(ed|es)[ ]')
+        for backend in BACKENDS:
+            client = use_catalogue(app, backend)
+            with self.subTest(backend=backend):
+                books = client.get('/api/v1/books?fields=id,title', headers=AUTH_HEADERS).get_json()
+                expected = [book for book in books if pattern.search(book['title'].lower())]
+                response = client.get('/api/v1/books/query', query_string={'title': pattern.pattern, 'fields': 'id,title'},
+                                      headers=AUTH_HEADERS)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(expected)
+                self.assertEqual(response.get_json(), expected)
+
+    def test_prefix_match_is_not_a_regex(self):
+        for backend in BACKENDS:
+            client = use_catalogue(app, backend)
+            with self.subTest(backend=backend):
+                response = client.get('/api/v1/books/query?title=(&match=prefix', headers=AUTH_HEADERS)
+                self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
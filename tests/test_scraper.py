@@ -0,0 +1,144 @@
+# tests/test_scraper.py
+#
+# Scraper (scripts/scrape_books.py) contra o servidor local (benchmarks/standin_server.py): uma página de detalhes
+# que falha não pode ser publicada como scraping completo.
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import pandas as pd
+
+import support # noqa: F401 (coloca scripts/ e benchmarks/ no sys.path)
+from standin_server import StandinCatalogue, StandinServer, load_catalogue, make_handler
+import scrape_books
+from sinks import CrawlCheckpoint
+
+BOOKS = 45 # Primeiros livros de data/books.csv: três páginas de listagem (20 livros por página)
+CRAWLER_OPTIONS = {'max_workers': 8, 'per_host_concurrency': 8, 'per_host_rate': 0, 'max_retries': 1,
+                   'backoff_base': 0.01}
+
+
+class StandinSite:
+    """Servidor local numa thread; `break_detail(n)` faz a página de detalhes do livro n responder 404."""
+
+    def __init__(self, books):
+        self.catalogue = StandinCatalogue(books)
+        self.server = StandinServer(('127.0.0.1', 0), make_handler(self.catalogue))
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.broken = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def break_detail(self, position):
+        path = self.catalogue.books[position]['detail_path']
+        self.broken[path] = self.catalogue.books_by_path.pop(path)
+        return self.broken[path]
+
+    def repair(self):
+        self.catalogue.books_by_path.update(self.broken)
+        self.broken.clear()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def scrape(site, output_dir, **options):
+    scrape_books.scrape_books_to_csv(base_url=site.base_url, output_dir=output_dir, crawler_options=CRAWLER_OPTIONS,
+                                     parse_pool='thread', parse_workers=2, formats=('csv',), **options)
+
+
+class ScraperTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.site = StandinSite(load_catalogue()[:BOOKS])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.site.close()
+
+    def setUp(self):
+        self.output_dir = self.make_output_dir()
+        self.addCleanup(self.site.repair)
+
+    def make_output_dir(self):
+        output_dir = tempfile.mkdtemp(prefix='books-scrape-test-')
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        return output_dir
+
+    def csv_path(self):
+        return os.path.join(self.output_dir, 'books.csv')
+
+
+class DetailFailureTest(ScraperTestCase):
+    def test_failed_detail_page_is_not_published_as_complete(self):
+        for mode in ('concurrent', 'sequential'):
+            with self.subTest(mode=mode):
+                self.output_dir = self.make_output_dir()
+                self.site.break_detail(3) # Primeira página: o modo sequencial para nela, sem a pausa de 1s
+                scrape(self.site, self.output_dir, mode=mode)
+                self.site.repair()
+                self.assertFalse(os.path.exists(self.csv_path()))
+                self.assertTrue(os.path.exists(self.csv_path() + '.partial'))
+
+    def test_failed_detail_page_makes_the_crawl_incomplete(self):
+        self.site.break_detail(25) # Segunda página
+        pages = {}
+        complete = scrape_books.scrape_concurrently(self.site.base_url, lambda number, books, _: pages.__setitem__(
+            number, books), CRAWLER_OPTIONS, parse_pool='thread', parse_workers=2)
+        self.assertFalse(complete)
+        self.assertEqual(sorted(pages), [1, 3]) # A página com o detalhe que falhou não é entregue
+        for books in pages.values():
+            self.assertTrue(all(book['category'] and book['upc'] for book in books))
+
+
+class ResumeAfterDetailFailureTest(ScraperTestCase):
+    def test_page_with_failed_detail_is_not_checkpointed(self):
+        for mode in ('concurrent', 'sequential'):
+            with self.subTest(mode=mode):
+                self.output_dir = self.make_output_dir()
+                self.site.break_detail(25) # Segunda página
+                scrape(self.site, self.output_dir, mode=mode, batch_size=20)
+                self.site.repair()
+                checkpoint = CrawlCheckpoint(self.output_dir).load()
+                self.assertEqual(checkpoint['pages_written'], 1)
+
+                scrape(self.site, self.output_dir, mode=mode, batch_size=20, resume=True)
+                books = pd.read_csv(self.csv_path(), dtype=str, keep_default_na=False)
+                self.assertEqual(list(books['id']), [str(n) for n in range(1, BOOKS + 1)])
+                self.assertTrue((books['category'] != 'N/A').all())
+                self.assertTrue((books['upc'] != '').all())
+                self.assertIsNone(CrawlCheckpoint(self.output_dir).load())
+
+
+class IncrementalDetailFailureTest(ScraperTestCase):
+    def read_rows(self):
+        return pd.read_csv(self.csv_path(), dtype=str, keep_default_na=False).set_index('detail_url')
+
+    def test_failed_detail_keeps_the_existing_row(self):
+        scrape(self.site, self.output_dir, incremental=True)
+        before = self.read_rows()
+        # Mudanças reais nas páginas 1 e 2: a listagem da página 2 muda (sem isso o 304 reaproveitaria os
+        # detalhes do cache) e o detalhe do livro 25, na mesma página, falha
+        for position in (0, 26):
+            book = self.site.catalogue.books[position]
+            self.addCleanup(book.__setitem__, 'price', book['price'])
+            book['price'] = '99.99'
+        broken_book = self.site.break_detail(25)
+
+        scrape(self.site, self.output_dir, incremental=True)
+        after = self.read_rows()
+        broken_url = f"{self.site.base_url}{broken_book['detail_path']}"
+        self.assertEqual(after.loc[broken_url].to_dict(), before.loc[broken_url].to_dict())
+        self.assertNotEqual(after.loc[broken_url, 'upc'], '')
+        self.assertEqual(len(after), BOOKS) # Scraping incompleto: nenhum livro é removido
+        # Só o livro da página 1 muda; a página 2 fica como estava até uma execução sem falhas
+        differences = (after.reindex(before.index) != before).any(axis=1)
+        self.assertEqual(list(differences[differences].index),
+                         [f"{self.site.base_url}{self.site.catalogue.books[0]['detail_path']}"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# tests/test_stats.py
+#
+# /api/v1/stats/*: os valores são os da versão original da API (tests/fixtures/stats_baseline.json, gerado por ela
+# sobre tests/fixtures/books_stats.csv) nos dois backends. Os preços do fixture foram escolhidos para que uma média
+# somada em outra ordem (groupby().mean(), AVG do SQLite) mude o centavo arredondado.
+
+import json
+import os
+import unittest
+
+import pandas as pd
+
+from support import AUTH_HEADERS, BACKENDS, FIXTURES_DIR, load_app, use_catalogue, write_books
+
+app = load_app()
+
+
+def read_fixture_books():
+    books = pd.read_csv(os.path.join(FIXTURES_DIR, 'books_stats.csv'))
+    return [{key: (None if pd.isna(value) else value) for key, value in book.items()}
+            for book in books.to_dict('records')]
+
+
+class StatsBaselineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data_dir = write_books(read_fixture_books(), formats=('feather', 'sqlite'))
+        with open(os.path.join(FIXTURES_DIR, 'stats_baseline.json')) as file:
+            cls.baseline = json.load(file)
+
+    def test_stats_match_the_original_api(self):
+        for backend in BACKENDS:
+            client = use_catalogue(app, backend, self.data_dir)
+            for name in ('categories', 'overview'):
+                with self.subTest(backend=backend, endpoint=name):
+                    response = client.get(f'/api/v1/stats/{name}', headers=AUTH_HEADERS)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.get_json(), self.baseline[f'stats_{name}'])
+
+
+if __name__ == '__main__':
+    unittest.main()